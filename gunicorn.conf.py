@@ -1,3 +1,27 @@
+import os
+import shutil
+import tempfile
+
+from v3data.config import RESPONSE_CACHE_PATH
+
 bind = "0.0.0.0:8080"
 worker_class = "uvicorn.workers.UvicornWorker"
 workers = 3
+
+# Workers share prometheus metrics through files in this directory
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "v3data-metrics")
+)
+shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+# Start with an empty shared response cache, its entries may predate a deploy
+for suffix in ["", "-wal", "-shm"]:
+    if os.path.exists(RESPONSE_CACHE_PATH + suffix):
+        os.remove(RESPONSE_CACHE_PATH + suffix)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,84 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+
+import v3data
+from v3data import blocks
+from v3data.blocks import BlockIndex, block_from_timestamp
+from v3data.hype_fees.schema import Time
+
+
+def test_block_index_interpolates_between_observations(tmp_path):
+    index = BlockIndex(str(tmp_path / "blocks.sqlite"))
+    assert asyncio.run(index.estimate("mainnet", 1_000)) is None
+
+    index.observe("mainnet", [(100, 1_000), ("200", "2000")])
+
+    assert asyncio.run(index.estimate("mainnet", 1_000)) == (100, 0)
+    assert asyncio.run(index.estimate("mainnet", 1_500)) == (150, 1_000)
+    # Beyond the last observation the rate of the nearest pair is extrapolated
+    assert asyncio.run(index.estimate("mainnet", 2_100)) == (210, 100)
+    assert asyncio.run(index.estimate("polygon", 1_500)) is None
+
+    # Observations persist for other workers sharing the file
+    other = BlockIndex(str(tmp_path / "blocks.sqlite"))
+    assert asyncio.run(other.estimate("mainnet", 1_250)) == (125, 1_000)
+
+
+def test_block_from_timestamp_refines_wide_gaps_remotely(monkeypatch, tmp_path):
+    lookups = []
+
+    def llama(request):
+        lookups.append(request.url.path)
+        return httpx.Response(200, json={"height": 160, "timestamp": 1_590})
+
+    monkeypatch.setattr(
+        v3data,
+        "async_client",
+        httpx.AsyncClient(transport=httpx.MockTransport(llama)),
+    )
+    monkeypatch.setattr(blocks, "block_index", BlockIndex(str(tmp_path / "b.sqlite")))
+    monkeypatch.setattr(blocks, "BLOCK_INDEX_MAX_GAP_SECONDS", 500)
+    blocks.block_index.observe("mainnet", [(100, 1_000), (200, 2_000)])
+
+    # Gap of 1000s is too wide, so DefiLlama is asked and its answer kept
+    assert asyncio.run(block_from_timestamp("mainnet", 1_600)) == Time(160, 1_590)
+    assert len(lookups) == 1
+
+    # Now within 410s of observations, answered locally
+    assert asyncio.run(block_from_timestamp("mainnet", 1_800)) == Time(180, 1_800)
+    assert len(lookups) == 1
+
+
+def test_block_index_reloads_new_pairs_and_prunes_old_ones(monkeypatch, tmp_path):
+    path = str(tmp_path / "blocks.sqlite")
+    index = BlockIndex(path, retention_days=1)
+    other = BlockIndex(path, retention_days=1)
+    index.observe("mainnet", [(100, 1_000), (200, 2_000)])
+    assert asyncio.run(other.estimate("mainnet", 1_500)) == (150, 1_000)
+
+    # Pairs inserted since the last reload are read back, older blocks too
+    index.observe("mainnet", [(140, 1_400)])
+    monkeypatch.setattr(blocks, "RELOAD_SECONDS", -1)
+    assert asyncio.run(other.estimate("mainnet", 1_400)) == (140, 0)
+
+    # Observations over a day older than the latest one are dropped
+    index.observe("mainnet", [(8_800, 88_000), (9_000, 90_000)])
+    assert asyncio.run(other.estimate("mainnet", 89_000)) == (8_900, 2_000)
+    assert asyncio.run(other.estimate("mainnet", 1_400)) == (140, 86_600)
+    rows = other.connection.execute("SELECT block FROM block_timestamps").fetchall()
+    assert rows == [(8_800,), (9_000,)]
+
+
+def test_observations_are_persisted_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "blocks.sqlite")
+    index = BlockIndex(path)
+
+    async def run():
+        index.observe("mainnet", [(100, 1_000), (200, 2_000)])
+        await index.flush()
+
+    asyncio.run(run())
+    other = BlockIndex(path)
+    assert asyncio.run(other.estimate("mainnet", 1_500)) == (150, 1_000)
@@ -0,0 +1,101 @@
+import asyncio
+
+from v3data import cache_backend
+from v3data.cache_backend import (
+    CacheSettings,
+    LRUBackend,
+    SQLiteBackend,
+    cache,
+    normalized_key_builder,
+)
+
+
+def test_sqlite_backend_is_shared_and_expires(monkeypatch, tmp_path):
+    now = [1000.0]
+    monkeypatch.setattr(cache_backend.time, "time", lambda: now[0])
+    path = str(tmp_path / "cache.sqlite")
+    worker_1, worker_2 = SQLiteBackend(path), SQLiteBackend(path)
+
+    async def run():
+        await worker_1.set("fastapi-cache:/dashboard", '{"tvl": 1}', expire=600)
+        await worker_1.set("fastapi-cache:/allData", '{"a": 1}', expire=60)
+        await worker_1.set("other:/allData", '{"a": 2}', expire=60)
+
+        # Values written by one worker are served by the others
+        assert await worker_2.get_with_ttl("fastapi-cache:/dashboard") == (
+            600,
+            '{"tvl": 1}',
+        )
+
+        now[0] += 120
+        assert await worker_2.get("fastapi-cache:/allData") is None
+        assert await worker_2.get_with_ttl("fastapi-cache:/dashboard") == (
+            480,
+            '{"tvl": 1}',
+        )
+
+        assert await worker_2.clear(namespace="fastapi-cache") == 2
+        assert await worker_1.get("fastapi-cache:/dashboard") is None
+        assert await worker_1.get("other:/allData") is None
+
+    asyncio.run(run())
+
+
+def test_sqlite_backend_evicts_entries_closest_to_expiry(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache_backend, "PURGE_INTERVAL_SECONDS", 0)
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite"), max_bytes=30)
+
+    async def run():
+        for key, expire in [("a", 60), ("b", 10), ("c", 30)]:
+            await backend.set(key, "x" * 9, expire=expire)
+        # Over 30 bytes, "b" and then "c" expire soonest
+        await backend.set("d", "x" * 19, expire=60)
+        return [await backend.get(key) for key in "abcd"]
+
+    assert asyncio.run(run()) == ["x" * 9, None, None, "x" * 19]
+
+
+def test_lru_backend_evicts_least_recently_used_over_budget():
+    backend = LRUBackend(max_bytes=30)
+
+    async def run():
+        await backend.set("a", "x" * 9, expire=60)
+        await backend.set("b", "x" * 9, expire=60)
+        await backend.set("c", "x" * 9, expire=60)
+        assert await backend.get("a") == "x" * 9
+
+        # Over 30 bytes, "b" is the least recently used
+        await backend.set("d", "x" * 9, expire=60)
+        assert await backend.get("b") is None
+        assert [await backend.get(key) for key in "acd"] == ["x" * 9] * 3
+        assert backend.size == 30
+
+    asyncio.run(run())
+
+
+def test_cache_keys_normalize_addresses_and_bounded_parameters():
+    async def base_range_chart(protocol, chain, hypervisor_address, days=20):
+        pass
+
+    address = "0xF874d4957861E193AEC9937223062679C14f9Aca"
+    key = normalized_key_builder(
+        base_range_chart, args=("uniswap_v3", "mainnet", address, 365)
+    )
+
+    assert key == normalized_key_builder(
+        base_range_chart,
+        args=("uniswap_v3", "mainnet"),
+        kwargs={"hypervisor_address": address.lower(), "days": 10**9},
+    )
+    assert key != normalized_key_builder(
+        base_range_chart, args=("uniswap_v3", "mainnet", address, 30)
+    )
+
+
+def test_cache_records_its_settings():
+    @cache(expire=600, namespace="charts")
+    async def route(days: int = 20):
+        return days
+
+    assert route.cache_settings == CacheSettings(expire=600, namespace="charts")
+    assert route.__wrapped__.__name__ == "route"
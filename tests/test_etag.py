@@ -0,0 +1,121 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi_cache import FastAPICache
+from fastapi_cache.decorator import cache
+from fastapi_cache.key_builder import default_key_builder
+
+from v3data.cache_backend import LRUBackend
+from v3data.etag import (
+    SourceBlocks,
+    SourceBlocksJsonCoder,
+    conditional_response,
+    record_source,
+    source_blocks,
+    tracks_source_blocks,
+)
+from v3data.precompressed import PrecompressedJsonCoder
+
+
+def test_responses_are_tagged_with_source_blocks(monkeypatch):
+    for name, value in {
+        "_backend": LRUBackend(),
+        "_prefix": "",
+        "_coder": SourceBlocksJsonCoder,
+        "_key_builder": default_key_builder,
+        "_enable": True,
+        "_init": True,
+    }.items():
+        monkeypatch.setattr(FastAPICache, name, value)
+
+    # Block the gamma subgraph serves responses at
+    head = {"https://gamma": 200}
+    calls = []
+
+    @cache(expire=600)
+    @tracks_source_blocks
+    async def stats(days: int):
+        calls.append(days)
+        record_source("https://dex", 100)
+        record_source("https://gamma", head["https://gamma"])
+        return {"days": days}
+
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def request_context(request: Request, call_next):
+        token = source_blocks.set(SourceBlocks())
+        try:
+            response = await call_next(request)
+            return await conditional_response(request, response, source_blocks.get())
+        finally:
+            source_blocks.reset(token)
+
+    @app.get("/stats")
+    async def stats_route(days: int = 1):
+        return await stats(days=days)
+
+    async def run():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            first = await client.get("/stats")
+            etag = first.headers["ETag"]
+            # Served from the response cache with the blocks stored alongside
+            cached = await client.get("/stats", headers={"If-None-Match": etag})
+            head["https://gamma"] = 201
+            other = await client.get("/stats?days=2", headers={"If-None-Match": etag})
+        return first, cached, other
+
+    first, cached, other = asyncio.run(run())
+    assert first.status_code == 200 and first.json() == {"days": 1}
+    assert first.headers["ETag"].startswith('W/"')
+    assert first.headers["Last-Modified"].endswith("GMT")
+    assert cached.status_code == 304 and cached.content == b""
+    assert cached.headers["ETag"] == first.headers["ETag"]
+    assert calls == [1, 2]
+    # Data served at a newer block changes the tag
+    assert other.status_code == 200
+    assert other.headers["ETag"] != first.headers["ETag"]
+
+
+def test_untold_source_blocks_leave_responses_untagged():
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def request_context(request: Request, call_next):
+        token = source_blocks.set(SourceBlocks())
+        try:
+            response = await call_next(request)
+            return await conditional_response(request, response, source_blocks.get())
+        finally:
+            source_blocks.reset(token)
+
+    @app.get("/stats")
+    async def stats_route():
+        record_source("https://dex", 100)
+        # Served at its latest block, without telling which
+        record_source("https://gamma")
+        return {}
+
+    async def run():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            return await client.get("/stats", headers={"If-None-Match": "*"})
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+    assert "Last-Modified" not in response.headers
+
+
+def test_precompressed_coder_keeps_source_blocks():
+    async def run():
+        source_blocks.set(SourceBlocks({"https://dex": 100}, modified=1.0))
+        value = PrecompressedJsonCoder.encode({"a": 1})
+        sources = SourceBlocks()
+        source_blocks.set(sources)
+        PrecompressedJsonCoder.decode(value)
+        return sources
+
+    sources = asyncio.run(run())
+    assert sources.blocks == {"https://dex": 100}
+    assert sources.etag() == SourceBlocks({"https://dex": 100}).etag()
@@ -0,0 +1,150 @@
+import random
+
+import pytest
+
+from v3data.constants import DAY_SECONDS, YEAR_SECONDS
+from v3data.hype_fees.fees import Fees, FeesBatch
+from v3data.hype_fees.fees_yield import fee_snapshots, fee_yields
+from v3data.hype_fees.schema import (
+    FeesData,
+    FeesDataColumns,
+    FeesSnapshot,
+    FeeYield,
+    HypervisorStaticInfo,
+    _PositionData,
+    _TickData,
+    _TokenPair,
+    _TokenPairDecimals,
+)
+
+
+def random_fees_data(rng: random.Random) -> FeesData:
+    def uint256():
+        return rng.choice([0, 2**256 - 1, rng.getrandbits(rng.randint(1, 256))])
+
+    def position():
+        return _PositionData(
+            liquidity=rng.choice([0, 2**128 - 1, rng.getrandbits(100)]),
+            tokens_owed=_TokenPair(0, 0),
+            fee_growth_inside=_TokenPair(uint256(), uint256()),
+            tick_lower=_TickData(
+                rng.randint(-100, 0), _TokenPair(uint256(), uint256())
+            ),
+            tick_upper=_TickData(rng.randint(0, 100), _TokenPair(uint256(), uint256())),
+        )
+
+    return FeesData(
+        block=1,
+        timestamp=1,
+        hypervisor="0xhypervisor",
+        symbol="USDC-WETH",
+        currentTick=rng.randint(-150, 150),
+        price=_TokenPairDecimals(1, 1500),
+        decimals=_TokenPair(6, 18),
+        tvl=_TokenPair(0, 0),
+        tvl_usd=0,
+        fee_growth_global=_TokenPair(uint256(), uint256()),
+        base_position=position(),
+        limit_position=position(),
+    )
+
+
+def test_batch_fees_match_scalar_fees():
+    rng = random.Random(7)
+    data = [random_fees_data(rng) for _ in range(500)]
+
+    batch = FeesBatch(data, "uniswap_v3", "polygon")
+    assert batch.fee_amounts() == [
+        Fees(entry, "uniswap_v3", "polygon").fee_amounts() for entry in data
+    ]
+    assert batch.fee_usd() == [
+        Fees(entry, "uniswap_v3", "polygon").fee_usd() for entry in data
+    ]
+
+
+def subgraph_entity(data: FeesData) -> dict:
+    """Hypervisor entity of the fee growth subgraph that data was read from"""
+
+    def tick(tick):
+        return {
+            "tickIdx": tick.tick_index,
+            "feeGrowthOutside0X128": tick.fee_growth_outside.value0,
+            "feeGrowthOutside1X128": tick.fee_growth_outside.value1,
+        }
+
+    def position(position):
+        return {
+            "liquidity": str(position.liquidity),
+            "tokensOwed0": position.tokens_owed.value0,
+            "tokensOwed1": position.tokens_owed.value1,
+            "feeGrowthInside0X128": str(position.fee_growth_inside.value0),
+            "feeGrowthInside1X128": position.fee_growth_inside.value1,
+            "tickLower": tick(position.tick_lower),
+            "tickUpper": tick(position.tick_upper),
+        }
+
+    return {
+        "tvl0": data.tvl.value0,
+        "tvl1": str(data.tvl.value1),
+        "tvlUSD": str(data.tvl_usd),
+        "basePosition": position(data.base_position),
+        "limitPosition": position(data.limit_position),
+    }
+
+
+def test_columns_match_fees_data():
+    rng = random.Random(11)
+    data = [random_fees_data(rng) for _ in range(200)]
+
+    columns = FeesDataColumns()
+    rows = [
+        columns.append(
+            hypervisor=subgraph_entity(entry),
+            hypervisor_id=entry.hypervisor,
+            static_info=HypervisorStaticInfo(entry.symbol, entry.decimals),
+            block=entry.block,
+            timestamp=str(entry.timestamp),
+            current_tick=entry.currentTick,
+            price_0=entry.price.value0,
+            price_1=str(entry.price.value1),
+            fee_growth_global_0=entry.fee_growth_global.value0,
+            fee_growth_global_1=entry.fee_growth_global.value1,
+        )
+        for entry in data
+    ]
+
+    assert len(columns) == len(data)
+    assert [row.to_fees_data() for row in rows] == data
+    assert columns[-1].to_fees_data() == data[-1]
+    assert FeesBatch(rows, "uniswap_v3", "polygon").fee_usd() == (
+        FeesBatch(data, "uniswap_v3", "polygon").fee_usd()
+    )
+    assert fee_snapshots(rows, "uniswap_v3", "polygon") == fee_snapshots(
+        data, "uniswap_v3", "polygon"
+    )
+
+
+def test_fee_yields_are_computed_per_group():
+    def snapshots(*total_fees):
+        return [
+            FeesSnapshot(
+                block=day,
+                timestamp=day * DAY_SECONDS,
+                tvl_usd=1,
+                total_fees_0=fees,
+                total_fees_1=0,
+                price_0=1,
+                price_1=1,
+            )
+            for day, fees in enumerate(total_fees)
+        ]
+
+    good, outlier, single = fee_yields(
+        [snapshots(0, 0.01), snapshots(0, 0.01, 100.01), snapshots(0)]
+    )
+
+    assert good.apr == pytest.approx(0.01 * YEAR_SECONDS / DAY_SECONDS)
+    assert good.apy == pytest.approx(1.01 ** (YEAR_SECONDS / DAY_SECONDS) - 1)
+    assert good.status == "Good"
+    assert outlier == FeeYield(apr=good.apr, apy=good.apy, status="Outlier removed")
+    assert single.status == "Insufficient Data"
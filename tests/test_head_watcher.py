@@ -0,0 +1,87 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+from v3data import cache_backend, head_watcher as head_watcher_module, prewarm
+from v3data.cache_backend import LRUBackend, SQLiteBackend
+from v3data.config import DEX_SUBGRAPH_URLS, HEAD_ADVANCE_BLOCKS
+from v3data.etag import SourceBlocks, source_blocks
+from v3data.head_watcher import HeadWatcher
+
+
+def test_entries_are_current_until_the_head_advances(monkeypatch, tmp_path):
+    now = [1000.0]
+    monkeypatch.setattr(cache_backend.time, "time", lambda: now[0])
+    monkeypatch.setattr(head_watcher_module.time, "time", lambda: now[0])
+    monkeypatch.setattr(head_watcher_module.time, "monotonic", lambda: now[0])
+
+    celo = DEX_SUBGRAPH_URLS["uniswap_v3"]["celo"]
+
+    async def run(backend_class, *args):
+        now[0] = 1000.0
+        heads = HeadWatcher(interval=15)
+        heads.observe("celo", 1000)
+        backend = backend_class(*args, heads=heads)
+
+        source_blocks.set(SourceBlocks({celo: 990}))
+        await backend.set("celo", "{}", expire=600)
+        source_blocks.set(None)
+        await backend.set("untagged", "{}", expire=600)
+
+        # Past the TTL, only entries whose chain head did not advance are served
+        now[0] += 900
+        heads.observe("celo", 1000 + HEAD_ADVANCE_BLOCKS["celo"] - 1)
+        assert await backend.get("celo") == "{}"
+        assert await backend.get("untagged") is None
+
+        heads.observe("celo", 1000 + HEAD_ADVANCE_BLOCKS["celo"])
+        assert await backend.get("celo") is None
+
+        # Without fresh heads entries fall back to their TTL
+        source_blocks.set(SourceBlocks({celo: 1060}))
+        await backend.set("celo", "{}", expire=600)
+        now[0] += 300
+        assert await backend.get("celo") == "{}"
+        now[0] += 300
+        assert await backend.get("celo") is None
+
+    asyncio.run(run(LRUBackend))
+    asyncio.run(run(SQLiteBackend, str(tmp_path / "cache.sqlite")))
+
+
+def test_prewarmed_entries_wait_for_refresh(monkeypatch, tmp_path):
+    now = [1000.0]
+    monkeypatch.setattr(cache_backend.time, "time", lambda: now[0])
+    monkeypatch.setattr(head_watcher_module.time, "time", lambda: now[0])
+    monkeypatch.setattr(head_watcher_module.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(prewarm.time, "monotonic", lambda: now[0])
+
+    celo = DEX_SUBGRAPH_URLS["uniswap_v3"]["celo"]
+    heads = HeadWatcher(interval=15)
+    heads.observe("celo", 1000)
+
+    async def sleep(seconds):
+        now[0] += seconds
+        heads.observe("celo", heads.heads["celo"] + 30)
+
+    monkeypatch.setattr(prewarm.asyncio, "sleep", sleep)
+
+    async def run():
+        backend = LRUBackend(heads=heads)
+        backend.refreshed_keys = {"prewarmed"}
+        source_blocks.set(SourceBlocks({celo: 990}))
+        for key in ["prewarmed", "requested"]:
+            await backend.set(key, "{}", expire=600)
+
+        # The prewarmer is woken up by the advancing head well before its
+        # interval, while its entry is still served until replaced
+        prewarmer = prewarm.Prewarmer(FastAPI(), heads=heads)
+        prewarmer._tags["/route"] = heads.tags()
+        route = APIRoute("/route", lambda: None)
+        await prewarmer._wait(route, 480)
+        assert now[0] - 1000 < 480
+        assert heads.advanced(prewarmer._tags["/route"])
+        return await backend.get("prewarmed"), await backend.get("requested")
+
+    assert asyncio.run(run()) == ("{}", None)
@@ -0,0 +1,125 @@
+import asyncio
+
+import httpx
+
+import v3data
+from v3data import limiter as limiter_module
+from v3data.limiter import AdaptiveLimiter
+
+
+def request(status_code=200, delay=0.0):
+    async def send():
+        await asyncio.sleep(delay)
+        return httpx.Response(status_code)
+
+    return send
+
+
+def test_concurrency_is_capped_at_limit():
+    limiter = AdaptiveLimiter("test", initial=2, maximum=2)
+    peak = 0
+
+    async def send():
+        nonlocal peak
+        peak = max(peak, limiter.in_flight)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200)
+
+    async def run():
+        await asyncio.gather(*[limiter.request(send) for _ in range(10)])
+
+    asyncio.run(run())
+    assert peak == 2
+    assert limiter.in_flight == 0
+    assert limiter.queued == 0
+
+
+def test_limit_grows_additively_when_healthy():
+    limiter = AdaptiveLimiter("test", initial=4, maximum=32)
+
+    async def run():
+        for _ in range(4):
+            await limiter.request(request())
+
+    asyncio.run(run())
+    assert 4.9 < limiter.limit < 5.1
+
+
+def test_limit_halves_on_throttling():
+    limiter = AdaptiveLimiter("test", initial=16, minimum=1)
+
+    async def run():
+        await limiter.request(request(429))
+        # Immediate repeats within one round trip count as the same overload
+        limiter.latency = 60
+        await limiter.request(request(503))
+
+    asyncio.run(run())
+    assert limiter.limit == 8
+    assert limiter.decreases == 1
+
+
+def test_limit_halves_on_latency_spike():
+    limiter = AdaptiveLimiter("test", initial=8, spike_factor=4)
+    limiter.latencies[""] = 0.001
+
+    asyncio.run(limiter.request(request(delay=0.05)))
+
+    assert limiter.limit == 4
+    assert limiter.stats()["decreases"] == 1
+
+
+def test_heavy_queries_are_not_spikes_of_cheap_ones(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(limiter_module.time, "monotonic", lambda: clock[0])
+    limiter = AdaptiveLimiter("test", initial=8, minimum=1, spike_factor=4)
+
+    for _ in range(200):
+        clock[0] += 1
+        limiter.on_success(0.05, "_meta")
+        limiter.on_success(2.0, "poolSnapshots")
+
+    assert limiter.decreases == 0
+    assert limiter.limit > 16
+
+
+def test_limit_recovers_under_steady_heavy_workload(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(limiter_module.time, "monotonic", lambda: clock[0])
+    limiter = AdaptiveLimiter("test", initial=8, minimum=1, spike_factor=4)
+    for _ in range(20):
+        limiter.on_success(0.1, "pools")
+
+    # The query becomes twenty times slower for good
+    for _ in range(200):
+        clock[0] += 1
+        limiter.on_success(2.0, "pools")
+
+    assert 0 < limiter.decreases <= 5
+    assert limiter.limit > 8
+
+
+def test_timeouts_back_off_and_release_slot():
+    limiter = AdaptiveLimiter("test", initial=4)
+
+    async def send():
+        raise httpx.ReadTimeout("timed out")
+
+    async def run():
+        try:
+            await limiter.request(send)
+        except httpx.ReadTimeout:
+            pass
+
+    asyncio.run(run())
+    assert limiter.limit == 2
+    assert limiter.in_flight == 0
+
+
+def test_rpc_limiter_name_hides_api_key(monkeypatch):
+    monkeypatch.setitem(
+        v3data.ALCHEMY_URLS, "mainnet", "https://eth-mainnet.g.alchemy.com/v2/secret"
+    )
+    client = v3data.RpcClient("mainnet")
+    assert client.limiter_name == "eth-mainnet.g.alchemy.com/mainnet"
+    assert "secret" not in client.limiter_name
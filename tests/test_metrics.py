@@ -0,0 +1,48 @@
+import asyncio
+
+import httpx
+from prometheus_client import REGISTRY
+
+import v3data
+from v3data import SubgraphClient
+from v3data.metrics import current_route, query_name
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_query_name():
+    assert query_name("query hypervisor($id: String!){ a { id } }") == "hypervisor"
+    assert query_name("{ static: hypervisors { id } }") == "hypervisors"
+    assert query_name('{ b17_pool: pool(id: "0x1") { id } b18_pool: pool') == "pool"
+    assert query_name("{\n  _meta { block { number } } }") == "_meta"
+
+
+def test_subgraph_requests_are_recorded(monkeypatch):
+    def handler(request):
+        return httpx.Response(200, json={"data": {"pools": []}})
+
+    monkeypatch.setattr(
+        v3data,
+        "async_client",
+        httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    client = SubgraphClient("http://subgraph.test", "polygon", "quickswap")
+    labels = {
+        "service": "subgraph",
+        "chain": "polygon",
+        "protocol": "quickswap",
+        "query": "metricsPools",
+        "route": "/test/route",
+    }
+    before = sample("upstream_request_seconds_count", **labels)
+
+    async def run():
+        current_route.set("/test/route")
+        await client.query("query metricsPools { pools { id } }")
+
+    asyncio.run(run())
+
+    assert sample("upstream_request_seconds_count", **labels) == before + 1
+    assert sample("upstream_response_bytes_total", **labels) > 0
@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+import httpx
+from eth_abi import decode_abi, encode_abi
+
+import v3data
+from v3data import masterchef
+from v3data.multicall import MULTICALL3_ADDRESS, TRY_AGGREGATE_SELECTOR
+from v3data.masterchef import UserRewards
+
+USER = "0x" + "ab" * 20
+MASTERCHEF = "0x" + "11" * 20
+
+
+def rpc_node(pending):
+    """JSON-RPC stand-in executing Multicall3 tryAggregate over pendingSushi"""
+    requests = []
+
+    def handler(request):
+        payload = json.loads(request.content)
+        requests.append(payload)
+        call = payload["params"][0]
+        assert call["to"] == MULTICALL3_ADDRESS
+
+        data = bytes.fromhex(call["data"][2:])
+        assert data[:4] == TRY_AGGREGATE_SELECTOR
+        _, calls = decode_abi(["bool", "(address,bytes)[]"], data[4:])
+
+        returns = []
+        for _, call_data in calls:
+            pool_id, user = decode_abi(["uint256", "address"], call_data[4:])
+            assert user == USER
+            if pool_id in pending:
+                returns.append((True, encode_abi(["uint256"], [pending[pool_id]])))
+            else:
+                returns.append((False, b""))
+
+        result = encode_abi(["(bool,bytes)[]"], [returns])
+        return httpx.Response(
+            200, json={"jsonrpc": "2.0", "id": 1, "result": "0x" + result.hex()}
+        )
+
+    return handler, requests
+
+
+def test_pending_rewards_are_read_in_one_multicall(monkeypatch):
+    handler, requests = rpc_node({0: 5 * 10**18, 1: 10**17})
+    monkeypatch.setattr(
+        v3data,
+        "async_client",
+        httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    def account(pool_id, hypervisor):
+        return {
+            "amount": str(10**18),
+            "masterChefPool": {
+                "poolId": str(pool_id),
+                "masterChef": {
+                    "id": MASTERCHEF,
+                    "rewardToken": {"id": "0xreward", "symbol": "RWD", "decimals": 18},
+                },
+                "hypervisor": {"id": hypervisor, "symbol": hypervisor.upper()},
+            },
+        }
+
+    async def user_data(self, user_address):
+        self.data = {
+            "masterChefPoolAccounts": [
+                account(0, "0xa"),
+                account(1, "0xb"),
+                account(2, "0xc"),
+            ]
+        }
+
+    monkeypatch.setattr(masterchef.MasterchefData, "_get_user_data", user_data)
+    info = asyncio.run(UserRewards(USER, "uniswap_v3").output())
+
+    assert len(requests) == 1
+    assert info["0xa"]["0xreward"]["pendingRewards"] == 5
+    assert info["0xb"]["0xreward"]["pendingRewards"] == 0.1
+    # Reverted reads do not fail the whole batch
+    assert info["0xc"]["0xreward"]["pendingRewards"] is None
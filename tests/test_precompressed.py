@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi_cache import FastAPICache
+from fastapi_cache.coder import JsonCoder
+from fastapi_cache.decorator import cache
+
+from v3data.cache_backend import LRUBackend, normalized_key_builder
+from v3data.precompressed import (
+    PrecompressedJsonCoder,
+    accepted_encodings,
+    parse_accept_encoding,
+)
+
+
+def test_cached_responses_are_served_precompressed(monkeypatch):
+    for name, value in {
+        "_backend": LRUBackend(),
+        "_prefix": "",
+        "_coder": JsonCoder,
+        "_key_builder": normalized_key_builder,
+        "_enable": True,
+        "_init": True,
+    }.items():
+        monkeypatch.setattr(FastAPICache, name, value)
+
+    calls = []
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def request_context(request: Request, call_next):
+        accepted_encodings.set(request.headers.get("accept-encoding", ""))
+        return await call_next(request)
+
+    @app.get("/hypervisors/allData")
+    @cache(expire=600, coder=PrecompressedJsonCoder)
+    async def hypervisors_all():
+        calls.append(1)
+        return {"0xabc": {"tvlUSD": 1.5, "symbol": "WETH-USDC"}}
+
+    async def run():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            headers = {"Accept-Encoding": "identity"}
+            miss = await client.get("/hypervisors/allData", headers=headers)
+            plain = await client.get("/hypervisors/allData", headers=headers)
+            gzipped = await client.get(
+                "/hypervisors/allData", headers={"Accept-Encoding": "gzip, br;q=0"}
+            )
+        return miss, plain, gzipped
+
+    miss, plain, gzipped = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert plain.content == miss.content
+    assert "content-encoding" not in plain.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert json.loads(gzipped.content) == miss.json()
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, deflate, br") == {"gzip", "deflate", "br"}
+    assert parse_accept_encoding("br;q=0, gzip;q=0.5") == {"gzip"}
+    assert parse_accept_encoding("") == set()
@@ -0,0 +1,56 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from fastapi_cache import FastAPICache
+from fastapi_cache.coder import JsonCoder
+from fastapi_cache.key_builder import default_key_builder
+
+from v3data.cache_backend import SQLiteBackend, cache
+from v3data.prewarm import Prewarmer
+
+
+def test_prewarmed_routes_are_served_from_cache(monkeypatch, tmp_path):
+    for name, value in {
+        "_backend": SQLiteBackend(str(tmp_path / "cache.sqlite")),
+        "_prefix": "",
+        "_coder": JsonCoder,
+        "_key_builder": default_key_builder,
+        "_enable": True,
+        "_init": True,
+    }.items():
+        monkeypatch.setattr(FastAPICache, name, value)
+
+    calls = []
+    app = FastAPI()
+
+    @app.get("/polygon/charts/baseRange/all")
+    @cache(expire=600)
+    async def base_range_chart_all(days: int = 20):
+        calls.append(days)
+        return {"days": days, "call": len(calls)}
+
+    @app.get("/polygon/hypervisors/recentFees")
+    @cache(expire=600)
+    async def recent_fees():
+        return {}
+
+    prewarmer = Prewarmer(app, lock_path=str(tmp_path / "prewarm.lock"))
+    assert [route.path for route in prewarmer.routes()] == [
+        "/polygon/charts/baseRange/all"
+    ]
+
+    async def run():
+        await prewarmer.refresh(prewarmer.routes()[0])
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/polygon/charts/baseRange/all")
+        return response.json()
+
+    assert asyncio.run(run()) == {"days": 20, "call": 1}
+    # The user request did not recompute the route
+    assert calls == [20]
+    assert prewarmer.stats["/polygon/charts/baseRange/all"]["error"] is None
+
+    # Only one worker leads refreshes of a shared cache
+    assert prewarmer._acquire_leadership()
+    assert not Prewarmer(app, str(tmp_path / "prewarm.lock"))._acquire_leadership()
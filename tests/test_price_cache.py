@@ -0,0 +1,71 @@
+import asyncio
+
+from v3data import price_cache as price_cache_module
+from v3data.price_cache import PriceCache
+
+
+def test_price_cache_coalesces_and_revalidates_stale_prices(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(price_cache_module.time, "time", lambda: now[0])
+    fetches = []
+
+    async def fetch():
+        fetches.append(now[0])
+        await asyncio.sleep(0.01)
+        return {"token_in_usdc": len(fetches)}
+
+    cache = PriceCache(ttl=60, max_stale=600)
+    key = ("mainnet", "GAMMA")
+
+    async def run():
+        # Concurrent misses share one fetch
+        first = await asyncio.gather(*(cache.get(key, fetch) for _ in range(5)))
+        assert first == [({"token_in_usdc": 1}, 0)] * 5
+
+        now[0] += 30
+        assert await cache.get(key, fetch) == ({"token_in_usdc": 1}, 30)
+
+        # Stale prices are served while one refresh runs in the background
+        now[0] += 60
+        assert await cache.get(key, fetch) == ({"token_in_usdc": 1}, 90)
+        assert await cache.get(key, fetch) == ({"token_in_usdc": 1}, 90)
+        await asyncio.sleep(0.05)
+        assert await cache.get(key, fetch) == ({"token_in_usdc": 2}, 0)
+
+        # Too old to serve, fetched before returning
+        now[0] += 1000
+        assert await cache.get(key, fetch) == ({"token_in_usdc": 3}, 0)
+
+    asyncio.run(run())
+    assert len(fetches) == 3
+
+
+def test_fallback_prices_are_kept_briefly(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(price_cache_module.time, "time", lambda: now[0])
+    fetches = []
+
+    async def fetch():
+        fetches.append(now[0])
+        return {"gamma-token": {"usd": len(fetches)}}
+
+    cache = PriceCache(ttl=60, max_stale=600)
+    key = ("coingecko", "gamma-token", "usd")
+
+    async def run():
+        assert await cache.get(key, fetch, ttl=10, max_stale=0) == (
+            {"gamma-token": {"usd": 1}},
+            0,
+        )
+        now[0] += 5
+        assert (await cache.get(key, fetch, ttl=10, max_stale=0))[1] == 5
+
+        # Past the short ttl the price is fetched again, not served stale
+        now[0] += 10
+        assert await cache.get(key, fetch, ttl=10, max_stale=0) == (
+            {"gamma-token": {"usd": 2}},
+            0,
+        )
+
+    asyncio.run(run())
+    assert len(fetches) == 2
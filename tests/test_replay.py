@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+import httpx
+
+import v3data
+from v3data import SubgraphClient
+from v3data.fixtures import FixtureStore
+from v3data.replay import create_app
+
+QUERY = "query($ts: Int!){ hypervisors(where: {created_gt: $ts}) { id } }"
+
+
+def test_recorded_responses_replay_locally(monkeypatch, tmp_path):
+    def live(request):
+        return httpx.Response(200, json={"data": {"hypervisors": [{"id": "0x1"}]}})
+
+    monkeypatch.setattr(
+        v3data,
+        "async_client",
+        httpx.AsyncClient(transport=httpx.MockTransport(live)),
+    )
+    monkeypatch.setattr(v3data, "recorder", FixtureStore(str(tmp_path)))
+    recorded = asyncio.run(
+        SubgraphClient("https://api.thegraph.com/subgraphs/name/a/b").query(
+            QUERY, {"ts": 1}
+        )
+    )
+
+    # Replay from the stand-in server, with no live endpoint available
+    monkeypatch.setattr(v3data, "recorder", None)
+    monkeypatch.setattr(
+        v3data,
+        "async_client",
+        httpx.AsyncClient(app=create_app(str(tmp_path), latency_ms=1)),
+    )
+    client = SubgraphClient("http://replay.local/subgraphs/name/a/b")
+
+    assert asyncio.run(client.query(QUERY, {"ts": 1})) == recorded
+    # Other variables fall back to the latest recording of the same query
+    assert asyncio.run(client.query(QUERY, {"ts": 2})) == recorded
+
+
+def test_unrecorded_query_is_not_found(tmp_path):
+    async def run():
+        async with httpx.AsyncClient(app=create_app(str(tmp_path))) as client:
+            return await client.post(
+                "http://replay.local/subgraphs/name/a/b",
+                content=json.dumps({"query": "{ pools { id } }"}),
+            )
+
+    response = asyncio.run(run())
+    assert response.status_code == 404
+    assert response.json()["errors"]
+
+
+def test_fallback_keeps_the_page_of_paginated_queries(tmp_path):
+    store = FixtureStore(str(tmp_path))
+    query = "query($paginate: String!, $ts: Int!){ hypervisors(where: {id_gt: $paginate created_gt: $ts}) { id } }"
+    url = "https://api.thegraph.com/subgraphs/name/a/b"
+    first_page = {"data": {"hypervisors": [{"id": "0x1"}]}}
+    store.save(url, query, {"paginate": "", "ts": 1}, json.dumps(first_page).encode())
+    store.save(
+        url,
+        query,
+        {"paginate": "0x1", "ts": 1},
+        json.dumps({"data": {"hypervisors": []}}).encode(),
+    )
+
+    assert store.load(url, query, {"paginate": "", "ts": 2}) == first_page
+    assert store.load(url, query, {"paginate": "0x9", "ts": 2}) is None
@@ -0,0 +1,248 @@
+import asyncio
+
+import pytest
+
+import v3data
+from v3data.constants import DAY_SECONDS
+from v3data.hype_fees import data as fee_data
+from v3data.hype_fees.data import FeeGrowthSnapshotData, FeeGrowthSnapshotLogData
+from v3data.hype_fees.fees_yield import fee_yields, window_snapshots
+from v3data.hype_fees.schema import FeesSnapshot, Time
+from v3data.hype_fees.snapshot_store import FeeSnapshotStore, SnapshotLog
+
+
+def daily_snapshots(days: int) -> list[FeesSnapshot]:
+    return [
+        FeesSnapshot(
+            block=(day + 1) * 100,
+            timestamp=day * DAY_SECONDS,
+            tvl_usd=1000 + day,
+            total_fees_0=day * (1 + day % 3),
+            total_fees_1=day * 0.5,
+            price_0=1,
+            price_1=2 + day % 5,
+        )
+        for day in range(days)
+    ]
+
+
+def test_rolling_windows_match_full_recomputation():
+    snapshots = daily_snapshots(45)
+    now = snapshots[-1].timestamp
+
+    incremental = SnapshotLog()
+    for start in range(0, len(snapshots), 4):
+        incremental.extend(snapshots[start : start + 4])
+        incremental.advance(snapshots[min(start + 3, len(snapshots) - 1)].timestamp)
+
+    for days in [1, 7, 30]:
+        window = [
+            snapshot
+            for snapshot in snapshots
+            if snapshot.timestamp >= now - days * DAY_SECONDS
+        ]
+        (expected,) = fee_yields([window])
+        returns = incremental.returns(days)
+        assert returns.apr == pytest.approx(expected.apr)
+        assert returns.apy == pytest.approx(expected.apy)
+        assert returns.status == expected.status
+
+
+def test_windows_of_longest_snapshots_match_rolling_windows():
+    # Window starts fall between snapshots taken every 17 hours
+    snapshots = [
+        FeesSnapshot(
+            block=(hour + 1) * 100,
+            timestamp=hour * 3600,
+            tvl_usd=1000 + hour % 7,
+            total_fees_0=hour * 0.3,
+            total_fees_1=hour * (0.1 + hour % 4 / 10),
+            price_0=1,
+            price_1=2,
+        )
+        for hour in range(0, 45 * 24, 17)
+    ]
+    now = snapshots[-1].timestamp
+
+    log = SnapshotLog()
+    log.extend(snapshots)
+    log.advance(now)
+
+    windows = [
+        window_snapshots(snapshots, now - days * DAY_SECONDS) for days in [1, 7, 30]
+    ]
+    for days, expected in zip([1, 7, 30], fee_yields(windows)):
+        returns = log.returns(days)
+        assert returns.apr == pytest.approx(expected.apr)
+        assert returns.apy == pytest.approx(expected.apy)
+        assert returns.status == expected.status
+
+
+def test_window_starts_at_an_interpolated_snapshot():
+    snapshots = daily_snapshots(3)
+    start, *rest = window_snapshots(snapshots, DAY_SECONDS // 4)
+
+    assert rest == snapshots[1:]
+    assert start.timestamp == DAY_SECONDS // 4
+    assert start.block == 125
+    assert start.total_fees_0 == pytest.approx(0.5)
+    assert start.total_fees_1 == pytest.approx(0.125)
+
+
+def test_snapshots_are_shared_through_the_store(tmp_path):
+    path = str(tmp_path / "fee_snapshots.sqlite")
+    snapshots = daily_snapshots(10)
+
+    worker_1 = FeeSnapshotStore(path)
+    worker_1._store("uniswap_v3", "celo", {"0xhype": snapshots})
+
+    worker_2 = FeeSnapshotStore(path)
+    logs = {}
+    asyncio.run(worker_2._load("uniswap_v3", "celo", logs))
+    assert logs["0xhype"].last == snapshots[-1]
+    assert logs["0xhype"].block == 1000
+    assert len(logs["0xhype"].periods) == 9
+
+
+class FakeSnapshotSubgraph:
+    """Fee growth subgraph with one hypervisor, serving snapshots by page"""
+
+    def __init__(self, snapshot_blocks: list[int]):
+        self.snapshot_blocks = snapshot_blocks
+        self.head = max(snapshot_blocks) + 10
+        self.block_after = []
+
+    def state(self, block: int) -> dict:
+        position = {
+            "liquidity": 10**18,
+            "tokensOwed0": 0,
+            "tokensOwed1": 0,
+            "feeGrowthInside0X128": 0,
+            "feeGrowthInside1X128": 0,
+            "tickLower": {
+                "tickIdx": -10,
+                "feeGrowthOutside0X128": 0,
+                "feeGrowthOutside1X128": 0,
+            },
+            "tickUpper": {
+                "tickIdx": 10,
+                "feeGrowthOutside0X128": 0,
+                "feeGrowthOutside1X128": 0,
+            },
+        }
+        return {
+            "tick": 0,
+            "feeGrowthGlobal0X128": block * 2**128,
+            "feeGrowthGlobal1X128": block * 2**127,
+            "price0": 1.0,
+            "price1": 2.0,
+            "tvl0": 10**24,
+            "tvl1": 10**24,
+            "tvlUSD": 3 * 10**6,
+            "basePosition": position,
+            "limitPosition": position,
+        }
+
+    def page(self, variables: dict) -> dict:
+        block_after = variables.get("blockAfter", 0)
+        self.block_after.append(block_after)
+        blocks = sorted(block for block in self.snapshot_blocks if block > block_after)
+        return {
+            "id": "0xhype",
+            "feeSnapshots": [
+                {
+                    "blockNumber": block,
+                    "timestamp": self.timestamp(block),
+                    "currentBlock": self.state(block),
+                    "previousBlock": self.state(block - 1),
+                }
+                for block in blocks[: variables["pageSize"]]
+            ],
+        }
+
+    def timestamp(self, block: int) -> int:
+        return 10 * DAY_SECONDS + block
+
+    async def query_stream(self, query, variables=None, converters=None):
+        if "SnapshotPage" not in query:
+            head = {"number": self.head, "timestamp": self.timestamp(self.head)}
+            yield "_meta", {"block": head}
+            yield "static", {
+                "id": "0xhype",
+                "symbol": "USDC-WETH",
+                "pool": {"token0": {"decimals": 6}, "token1": {"decimals": 18}},
+            }
+            latest = self.state(self.head)
+            yield "latest", {
+                "id": "0xhype",
+                "tvl0": latest["tvl0"],
+                "tvl1": latest["tvl1"],
+                "tvlUSD": latest["tvlUSD"],
+                "pool": {
+                    "currentTick": latest["tick"],
+                    "feeGrowthGlobal0X128": latest["feeGrowthGlobal0X128"],
+                    "feeGrowthGlobal1X128": latest["feeGrowthGlobal1X128"],
+                    "token0": {"priceUSD": latest["price0"]},
+                    "token1": {"priceUSD": latest["price1"]},
+                },
+                "basePosition": latest["basePosition"],
+                "limitPosition": latest["limitPosition"],
+            }
+        yield "snapshots", self.page(variables)
+
+
+def test_refresh_pages_through_snapshots(tmp_path, monkeypatch):
+    subgraph = FakeSnapshotSubgraph(list(range(100, 25100, 10)))
+
+    async def current_time(data):
+        return Time(block=subgraph.head, timestamp=subgraph.timestamp(subgraph.head))
+
+    monkeypatch.setattr(
+        v3data.SubgraphClient,
+        "query_stream",
+        lambda client, *args, **kwargs: subgraph.query_stream(*args, **kwargs),
+    )
+    monkeypatch.setattr(FeeGrowthSnapshotLogData, "_query_current_time", current_time)
+    monkeypatch.setattr(fee_data.block_index, "observe", lambda *args: None)
+
+    store = FeeSnapshotStore(str(tmp_path / "fee_snapshots.sqlite"))
+    asyncio.run(store.refresh("uniswap_v3", "polygon"))
+
+    # Every snapshot is stored with the block before it, across three pages
+    assert subgraph.block_after == [0, 10090, 20090]
+    (stored,) = store.connection.execute(
+        "SELECT COUNT(*) FROM fee_snapshots"
+    ).fetchone()
+    assert stored == 2 * 2500
+    assert store._logs[("uniswap_v3", "polygon")]["0xhype"].block == 25090
+
+    # Later refreshes only query snapshots after the stored ones
+    subgraph.snapshot_blocks.append(25100)
+    subgraph.head = 25110
+    subgraph.block_after = []
+    asyncio.run(store.refresh("uniswap_v3", "polygon"))
+    assert subgraph.block_after == [25090]
+    assert store._logs[("uniswap_v3", "polygon")]["0xhype"].block == 25100
+
+
+def test_snapshot_data_pages_through_snapshots(monkeypatch):
+    subgraph = FakeSnapshotSubgraph(list(range(100, 25100, 10)))
+
+    async def start_time(data):
+        data.end_time = Time(block=subgraph.head, timestamp=subgraph.timestamp(subgraph.head))
+        data.initial_time = Time(block=0, timestamp=subgraph.timestamp(0))
+
+    monkeypatch.setattr(
+        v3data.SubgraphClient,
+        "query_stream",
+        lambda client, *args, **kwargs: subgraph.query_stream(*args, **kwargs),
+    )
+    monkeypatch.setattr(FeeGrowthSnapshotData, "_init_start_time", start_time)
+    monkeypatch.setattr(fee_data.block_index, "observe", lambda *args: None)
+
+    data = FeeGrowthSnapshotData(365, "uniswap_v3", "polygon")
+    asyncio.run(data.get_data())
+
+    assert subgraph.block_after == [0, 10090, 20090]
+    # The latest row, then every snapshot with the block before it
+    assert len(data.data["0xhype"]) == 1 + 2 * 2500
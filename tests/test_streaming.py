@@ -0,0 +1,121 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import v3data
+from v3data import SubgraphClient, streaming
+from v3data.streaming import GraphQLStreamDecoder, IncompleteDocument
+
+RESPONSE = {
+    "data": {
+        "_meta": {"block": {"number": 100, "timestamp": 1650000000}},
+        "hypervisors": [
+            {
+                "id": f"0x{i:02x}",
+                "tvlUSD": "1234.5",
+                "rebalances": [{"timestamp": str(1650000000 + j)} for j in range(3)],
+            }
+            for i in range(20)
+        ],
+        "empty": [],
+        "missing": None,
+    }
+}
+
+
+def decode(content, chunk_size, converters=None):
+    decoder = GraphQLStreamDecoder(converters)
+    events = []
+    for start in range(0, len(content), chunk_size):
+        events += decoder.feed(content[start : start + chunk_size])
+    events += decoder.close()
+    return decoder, events
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_decoded_events_match_full_decode(chunk_size):
+    content = json.dumps(RESPONSE, indent=1).encode()
+    _, events = decode(content, chunk_size)
+
+    assert events[0] == ("_meta", RESPONSE["data"]["_meta"])
+    assert [entity for field, entity in events if field == "hypervisors"] == RESPONSE[
+        "data"
+    ]["hypervisors"]
+    assert ("missing", None) in events
+    assert not [event for event in events if event[0] == "empty"]
+
+
+def test_converters_apply_at_any_depth():
+    content = json.dumps(RESPONSE).encode()
+    _, events = decode(content, 13, {"tvlUSD": float, "timestamp": int})
+
+    hypervisor = events[1][1]
+    assert hypervisor["tvlUSD"] == 1234.5
+    assert hypervisor["rebalances"][0]["timestamp"] == 1650000000
+
+
+def test_entities_are_decoded_once_complete(monkeypatch):
+    calls = []
+    decoder = streaming._decoder
+
+    def raw_decode(text, pos):
+        calls.append(pos)
+        value, end = decoder.raw_decode(text, pos)
+        calls[-1] = value
+        return value, end
+
+    monkeypatch.setattr(streaming, "_decoder", SimpleNamespace(raw_decode=raw_decode))
+    content = json.dumps(RESPONSE).encode()
+    _, events = decode(content, 1)
+
+    # Failed decodes would leave their position behind, so each entity is
+    # decoded once however many chunks it spans
+    entities = [value for value in calls if isinstance(value, dict)]
+    assert not any(isinstance(value, int) for value in calls)
+    assert len(entities) == len(RESPONSE["data"]["hypervisors"]) + 1
+
+
+def test_numbers_split_across_chunks():
+    decoder = GraphQLStreamDecoder()
+    assert decoder.feed(b'{"data": {"count": 12') == []
+    assert decoder.feed(b"34}}") == [("count", 1234)]
+    assert decoder.close() == []
+
+
+def test_errors_are_collected():
+    content = json.dumps({"errors": [{"message": "bad"}], "data": None}).encode()
+    decoder, events = decode(content, 5)
+    assert events == []
+    assert decoder.errors == [{"message": "bad"}]
+
+
+def test_truncated_response_raises():
+    with pytest.raises(IncompleteDocument):
+        decode(json.dumps(RESPONSE).encode()[:-10], 64)
+
+
+def test_query_stream(monkeypatch):
+    def handler(request):
+        return httpx.Response(200, content=json.dumps(RESPONSE).encode())
+
+    monkeypatch.setattr(
+        v3data,
+        "async_client",
+        httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    client = SubgraphClient("http://subgraph.test")
+
+    async def run():
+        return [
+            event
+            async for event in client.query_stream(
+                "{ hypervisors { id } }", converters={"tvlUSD": float}
+            )
+        ]
+
+    events = asyncio.run(run())
+    assert len([field for field, _ in events if field == "hypervisors"]) == 20
+    assert events[1][1]["tvlUSD"] == 1234.5
@@ -0,0 +1,416 @@
+import asyncio
+import json
+import os
+import time
+
+import httpx
+import pytest
+
+import v3data
+from v3data import SubgraphClient
+from v3data.etag import SourceBlocks, source_blocks
+from v3data.hypes.fees_yield_data import YieldData
+
+
+@pytest.fixture
+def swaps():
+    return [{"id": f"0x{i:04x}", "timestamp": str(i)} for i in range(0, 65536, 97)]
+
+
+@pytest.fixture
+def mock_subgraph(monkeypatch, swaps):
+    """Serve swaps paginated by id, honouring id_gt/id_lt and first"""
+    requests = []
+
+    def handler(request):
+        variables = json.loads(request.content).get("variables", {})
+        requests.append(variables)
+        start = variables.get("paginate", "")
+        end = variables.get("paginateEnd")
+        page = [
+            swap
+            for swap in swaps
+            if swap["id"] > start and (end is None or swap["id"] < end)
+        ][:100]
+        return httpx.Response(200, json={"data": {"swaps": page}})
+
+    monkeypatch.setattr(
+        v3data, "async_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    return requests
+
+
+QUERY = (
+    "query($paginate: String!, $paginateEnd: String!)"
+    "{ swaps(where: {id_gt: $paginate id_lt: $paginateEnd}) { id } }"
+)
+
+
+def test_id_shards_cover_id_space():
+    shards = SubgraphClient.id_shards(16)
+    assert len(shards) == 16
+    assert shards[0][0] == ""
+    assert shards[-1][1] == "0xg"
+    for (_, end), (start, _) in zip(shards, shards[1:]):
+        assert end == start
+
+
+def test_range_shards_cover_range():
+    shards = SubgraphClient.range_shards(100, 200, 4)
+    assert shards == [(99, 125), (124, 150), (149, 175), (174, 200)]
+
+
+def test_sharded_pagination_matches_sequential(mock_subgraph, swaps):
+    client = SubgraphClient("http://subgraph.test")
+
+    sequential = asyncio.run(
+        client.paginate_query(QUERY, "id", {"paginate": ""})
+    )
+    sharded = asyncio.run(
+        client.paginate_query(QUERY, "id", shards=SubgraphClient.id_shards(16))
+    )
+
+    assert sequential == swaps
+    assert sharded == swaps
+
+
+def test_sharded_pagination_requires_end_cursor():
+    client = SubgraphClient("http://subgraph.test")
+    with pytest.raises(ValueError):
+        asyncio.run(
+            client.paginate_query(
+                "{ swaps(where: {id_gt: $paginate}) { id } }",
+                "id",
+                shards=SubgraphClient.id_shards(4),
+            )
+        )
+
+
+def test_identical_concurrent_queries_are_coalesced(monkeypatch):
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"data": {"hypervisors": [{"id": "0x1"}]}})
+
+    monkeypatch.setattr(
+        v3data, "async_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    client = SubgraphClient("http://subgraph.test")
+
+    async def run():
+        return await asyncio.gather(
+            client.query("{ hypervisors { id } }"),
+            client.query("{\n    hypervisors { id }\n}"),
+            client.query("{ hypervisors { id } }", {"block": 1}),
+        )
+
+    first, second, third = asyncio.run(run())
+
+    assert len(calls) == 2
+    assert first == second == third
+    # Each caller gets its own copy of the response
+    first["data"]["hypervisors"].clear()
+    assert second["data"]["hypervisors"]
+
+
+def test_final_pinned_block_responses_are_cached(monkeypatch, tmp_path):
+    calls = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        calls.append(body)
+        if "_meta" in body["query"]:
+            return httpx.Response(200, json={"data": {"_meta": {"block": {"number": 1000}}}})
+        return httpx.Response(200, json={"data": {"pool": {"block": body["variables"]["block"]}}})
+
+    monkeypatch.setattr(
+        v3data, "async_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    monkeypatch.setattr(v3data, "block_cache", v3data.BlockCache(str(tmp_path / "cache.sqlite")))
+    monkeypatch.setattr(v3data, "_latest_blocks", {})
+    client = SubgraphClient("http://subgraph.test")
+    query = "query($block: Int!){ pool(block: {number: $block}) { id } }"
+
+    async def run(block):
+        return await client.query(query, {"block": block}, pinned_block=block)
+
+    assert asyncio.run(run(100)) == {"data": {"pool": {"block": 100}}}
+    assert asyncio.run(run(100)) == {"data": {"pool": {"block": 100}}}
+    assert len([call for call in calls if "_meta" not in call["query"]]) == 1
+
+    # Blocks within the finality depth of the head are not cached
+    asyncio.run(run(990))
+    asyncio.run(run(990))
+    assert len([call for call in calls if "_meta" not in call["query"]]) == 3
+
+
+def test_unconfigured_chains_use_a_conservative_finality_depth(monkeypatch):
+    latest_blocks = {"http://subgraph.test": (10_000, time.monotonic())}
+    monkeypatch.setattr(v3data, "_latest_blocks", latest_blocks)
+
+    mainnet = SubgraphClient("http://subgraph.test")
+    unconfigured = SubgraphClient("http://subgraph.test", "newchain")
+    assert asyncio.run(mainnet.is_final(9_900))
+    assert not asyncio.run(unconfigured.is_final(9_900))
+
+
+def test_block_cache_evicts_oldest_responses(tmp_path):
+    cache = v3data.BlockCache(str(tmp_path / "cache.sqlite"), max_bytes=64 << 10)
+    for block in range(100):
+        asyncio.run(cache.set(str(block), "http://subgraph.test", block, os.urandom(4096)))
+
+    assert cache.size() <= 64 << 10
+    assert asyncio.run(cache.get("0")) is None
+    assert len(asyncio.run(cache.get("99"))) == 4096
+
+
+def test_batch_query_scatters_aliased_results(monkeypatch):
+    documents = []
+
+    def handler(request):
+        query = json.loads(request.content)["query"]
+        documents.append(query)
+        # Echo each aliased pool lookup back with its inlined id
+        data = {}
+        for selection in query.strip("{} ").split("} "):
+            alias, rest = selection.split(":", 1)
+            pool_id = rest.split('"')[1]
+            data[alias.strip()] = {"id": pool_id}
+        return httpx.Response(200, json={"data": data})
+
+    monkeypatch.setattr(
+        v3data, "async_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    client = SubgraphClient("http://subgraph.test")
+    pools = [f"0x{i:040x}" for i in range(7)]
+
+    responses = asyncio.run(
+        client.batch_query(
+            "${prefix}pool: pool(id: $poolAddress) { id }",
+            [{"poolAddress": pool} for pool in pools],
+            batch_size=3,
+        )
+    )
+
+    assert len(documents) == 3
+    assert [response["data"]["pool"]["id"] for response in responses] == pools
+
+
+def test_batch_query_fails_entries_by_error_path(monkeypatch):
+    documents = []
+
+    def handler(request):
+        query = json.loads(request.content)["query"]
+        documents.append(query)
+        # The "bad" pool stands for an invalid literal, failing its whole document
+        if '"bad"' in query:
+            return httpx.Response(200, json={"errors": [{"message": "invalid"}]})
+        data, errors = {}, []
+        for selection in query.strip("{} ").split("} "):
+            alias, rest = selection.split(":", 1)
+            pool_id = rest.split('"')[1]
+            if pool_id.endswith("5"):
+                data[alias.strip()] = None
+                errors.append({"message": "indexing", "path": [alias.strip()]})
+            else:
+                data[alias.strip()] = {"id": pool_id}
+        return httpx.Response(200, json={"data": data, "errors": errors})
+
+    monkeypatch.setattr(
+        v3data, "async_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    client = SubgraphClient("http://subgraph.test")
+    pools = [f"0x{i:040x}" for i in range(7)]
+    pools[3] = "bad"
+
+    responses = asyncio.run(
+        client.batch_query(
+            "${prefix}pool: pool(id: $poolAddress) { id }",
+            [{"poolAddress": pool} for pool in pools],
+            batch_size=4,
+        )
+    )
+
+    failed = [index for index, response in enumerate(responses) if "errors" in response]
+    assert failed == [0, 1, 2, 3, 5]
+    assert responses[0]["errors"] == [{"message": "invalid"}]
+    assert responses[5]["errors"] == [{"message": "indexing", "path": ["b5_pool"]}]
+    assert [responses[index]["data"]["pool"]["id"] for index in [4, 6]] == [pools[4], pools[6]]
+    # A document error fails its batch once, without retrying it in parts
+    assert len(documents) == 2
+
+
+def test_graphql_literal():
+    assert SubgraphClient._graphql_literal("0xab") == '"0xab"'
+    assert SubgraphClient._graphql_literal(-887220) == "-887220"
+    assert SubgraphClient._graphql_literal(["a", "b"]) == '["a", "b"]'
+    assert SubgraphClient._graphql_literal(True) == "true"
+    assert (
+        SubgraphClient._graphql_literal({"pool": "0xab", "tickIdx_in": [1, 2]})
+        == '{pool: "0xab", tickIdx_in: [1, 2]}'
+    )
+    with pytest.raises(ValueError):
+        SubgraphClient._graphql_literal({"pool: 1) { id } x": 1})
+
+
+PRIMARY = "http://primary.test"
+ALTERNATE = "http://alternate.test"
+
+
+@pytest.fixture
+def hedged_subgraphs(monkeypatch):
+    """Primary that stalls on pool queries and an alternate at a given head,
+    with the requests made to either"""
+    calls = []
+    heads = {PRIMARY: 1000, ALTERNATE: 1000}
+
+    async def handler(request):
+        url = f"{request.url.scheme}://{request.url.host}"
+        query = json.loads(request.content)["query"]
+        calls.append((url, query))
+        if "_meta" in query:
+            return httpx.Response(
+                200, json={"data": {"_meta": {"block": {"number": heads[url]}}}}
+            )
+        if url == PRIMARY:
+            await asyncio.sleep(1)
+        return httpx.Response(200, json={"data": {"pool": {"source": url}}})
+
+    monkeypatch.setattr(
+        v3data, "async_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    monkeypatch.setattr(v3data, "_latest_blocks", {})
+    monkeypatch.setattr(v3data, "block_cache", None)
+    monkeypatch.setattr(v3data, "SUBGRAPH_HEDGE_ENABLED", True)
+    monkeypatch.setattr(v3data, "SUBGRAPH_ALTERNATE_URLS", {PRIMARY: [ALTERNATE]})
+    monkeypatch.setattr(v3data.latencies, "hedge_delay", lambda url: 0.05)
+    return heads, calls
+
+
+def test_slow_query_is_hedged_to_alternate(hedged_subgraphs):
+    client = SubgraphClient(PRIMARY)
+    start = time.monotonic()
+    response = asyncio.run(client.query("{ pool { source } }"))
+    assert response == {"data": {"pool": {"source": ALTERNATE}}}
+    assert time.monotonic() - start < 0.5
+    # The stalled primary is not asked for its head before hedging
+    _, calls = hedged_subgraphs
+    assert (PRIMARY, "{ _meta { block { number } } }") not in calls
+
+
+def test_hedge_skips_alternate_behind_primary(hedged_subgraphs):
+    heads, _ = hedged_subgraphs
+    heads[ALTERNATE] = 900
+    v3data._latest_blocks[PRIMARY] = (1000, time.monotonic())
+    client = SubgraphClient(PRIMARY)
+    response = asyncio.run(client.query("{ pool { source } }"))
+    assert response == {"data": {"pool": {"source": PRIMARY}}}
+
+
+def test_pinned_query_hedges_to_alternate_past_block(hedged_subgraphs):
+    heads, _ = hedged_subgraphs
+    heads[ALTERNATE] = 900
+    client = SubgraphClient(PRIMARY)
+    query = "query($block: Int!){ pool(block: {number: $block}) { source } }"
+
+    async def run(block):
+        return await client.query(query, {"block": block}, pinned_block=block)
+
+    assert asyncio.run(run(800))["data"]["pool"]["source"] == ALTERNATE
+    v3data._latest_blocks.clear()
+    assert asyncio.run(run(950))["data"]["pool"]["source"] == PRIMARY
+
+
+def test_iter_entities_streams_pages(mock_subgraph, swaps):
+    client = SubgraphClient("http://subgraph.test")
+    query = "query($paginate: String!){ swaps(where: {id_gt: $paginate}) { id } }"
+
+    async def run():
+        pages = []
+        async for page in client.iter_entities(query):
+            pages.append(page)
+        return pages
+
+    pages = asyncio.run(run())
+
+    assert [len(page) for page in pages] == [100] * 6 + [76]
+    assert [swap for page in pages for swap in page] == swaps
+    # Pages are requested lazily, one after the other
+    assert [request["paginate"] for request in mock_subgraph][:2] == [
+        "",
+        swaps[99]["id"],
+    ]
+
+
+def test_iter_entities_stream_decodes_with_converters(mock_subgraph, swaps):
+    client = SubgraphClient("http://subgraph.test")
+    query = "query($paginate: String!){ swaps(where: {id_gt: $paginate}) { id } }"
+
+    async def run():
+        return [
+            swap
+            async for page in client.iter_entities(query, converters={"timestamp": int})
+            for swap in page
+        ]
+
+    assert asyncio.run(run()) == [
+        {"id": swap["id"], "timestamp": int(swap["timestamp"])} for swap in swaps
+    ]
+
+
+def test_iter_entities_records_oldest_page_block(monkeypatch):
+    blocks = iter([105, 103, 104])
+
+    def handler(request):
+        query = json.loads(request.content)["query"]
+        assert "_meta" in query
+        paginate = json.loads(request.content)["variables"]["paginate"]
+        page = [] if paginate == "0x2" else [{"id": "0x1" if not paginate else "0x2"}]
+        meta = {"block": {"number": next(blocks)}}
+        return httpx.Response(200, json={"data": {"swaps": page, "_meta": meta}})
+
+    monkeypatch.setattr(
+        v3data, "async_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    client = SubgraphClient("http://subgraph.test")
+    query = "query($paginate: String!){ swaps(where: {id_gt: $paginate}) { id } }"
+
+    async def run():
+        sources = SourceBlocks()
+        source_blocks.set(sources)
+        pages = [page async for page in client.iter_entities(query)]
+        return pages, sources
+
+    pages, sources = asyncio.run(run())
+    assert pages == [[{"id": "0x1"}], [{"id": "0x2"}]]
+    assert sources.blocks == {"http://subgraph.test": 103}
+    assert not sources.pending
+
+
+def test_yield_data_pages_through_hypervisor_transactions(monkeypatch):
+    hypervisors = [{"id": f"0x{i:04x}", "feeUpdates": []} for i in range(2500)]
+
+    def handler(request):
+        body = json.loads(request.content)
+        if body["query"] == "{ _meta { block { number } } }":
+            return httpx.Response(
+                200, json={"data": {"_meta": {"block": {"number": 9}}}}
+            )
+        paginate = body["variables"]["paginate"]
+        page = [hypervisor for hypervisor in hypervisors if hypervisor["id"] > paginate]
+        meta = {"block": {"number": 9}}
+        return httpx.Response(
+            200, json={"data": {"uniswapV3Hypervisors": page[:1000], "_meta": meta}}
+        )
+
+    monkeypatch.setattr(
+        v3data, "async_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    monkeypatch.setattr(v3data, "_latest_blocks", {})
+    yield_data = YieldData(1, "quickswap", "polygon")
+    asyncio.run(yield_data._get_fee_update_data(1))
+
+    assert yield_data._transition_data["uniswapV3Hypervisors"] == hypervisors
+    assert yield_data._transition_data["_meta"] == {"block": {"number": 9}}
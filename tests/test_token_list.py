@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+import httpx
+
+import v3data
+from v3data import simulator
+from v3data.constants import PROTOCOL_UNISWAP_V3
+from v3data.simulator import SimulatorInfo
+from v3data.token_list import TokenList
+
+TOKENS = [
+    {"symbol": "USDC", "address": "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"},
+    {"symbol": "USDT", "address": "0xdAC17F958D2ee523a2206206994597C13D831ec7"},
+    {"symbol": "usdc", "address": "0x0000000000000000000000000000000000000001"},
+    {"symbol": "WETH", "address": "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"},
+]
+
+
+def test_token_list_refreshes_conditionally_and_indexes(monkeypatch):
+    requests = []
+
+    def coingecko(request):
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"tokens": TOKENS}, headers={"ETag": '"v1"'})
+
+    monkeypatch.setattr(
+        v3data,
+        "async_client",
+        httpx.AsyncClient(transport=httpx.MockTransport(coingecko)),
+    )
+    tokens = TokenList(refresh_seconds=0)
+
+    async def lookups():
+        return await asyncio.gather(
+            tokens.addresses("usdc"),
+            tokens.search("us"),
+            tokens.search("0xc02"),
+            tokens.token("0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"),
+        )
+
+    usdc, us, weth_prefix, weth = asyncio.run(lookups())
+
+    # Concurrent lookups share one download
+    assert len(requests) == 1
+    assert usdc == [TOKENS[0]["address"], TOKENS[2]["address"]]
+    assert [token["symbol"] for token in us] == ["usdc", "USDC", "USDT"]
+    assert weth_prefix == [TOKENS[3]] and weth == TOKENS[3]
+
+    # An unchanged list is revalidated without downloading it again
+    assert asyncio.run(tokens.addresses("WETH")) == [TOKENS[3]["address"]]
+    assert requests[-1].headers["If-None-Match"] == '"v1"'
+
+
+def test_failed_refresh_is_retried_after_an_interval(monkeypatch):
+    requests = []
+
+    def coingecko(request):
+        requests.append(request)
+        return httpx.Response(503)
+
+    monkeypatch.setattr(
+        v3data,
+        "async_client",
+        httpx.AsyncClient(transport=httpx.MockTransport(coingecko)),
+    )
+    tokens = TokenList(refresh_seconds=0, retry_seconds=60)
+
+    assert asyncio.run(tokens.addresses("usdc")) == []
+    assert asyncio.run(tokens.addresses("usdc")) == []
+    assert len(requests) == 1
+
+    tokens.retry_seconds = 0
+    asyncio.run(tokens.addresses("usdc"))
+    assert len(requests) == 2
+
+
+def test_invalid_list_keeps_the_previous_one(monkeypatch):
+    bodies = [{"tokens": TOKENS}, {"name": "no tokens"}]
+
+    def coingecko(request):
+        return httpx.Response(200, json=bodies.pop(0))
+
+    monkeypatch.setattr(
+        v3data,
+        "async_client",
+        httpx.AsyncClient(transport=httpx.MockTransport(coingecko)),
+    )
+    tokens = TokenList(refresh_seconds=0, retry_seconds=60)
+
+    assert asyncio.run(tokens.addresses("weth")) == [TOKENS[3]["address"]]
+    assert asyncio.run(tokens.addresses("weth")) == [TOKENS[3]["address"]]
+    assert tokens._failed_at is not None
+
+
+def test_simulator_token_search_is_served_from_the_token_list(monkeypatch):
+    listed = [{**token, "name": token["symbol"], "decimals": 6} for token in TOKENS]
+    tokens = TokenList()
+    tokens._index(listed)
+    tokens._fetched_at = time.monotonic()
+    monkeypatch.setattr(simulator, "token_list", tokens)
+    info = SimulatorInfo(PROTOCOL_UNISWAP_V3, "mainnet")
+
+    assert asyncio.run(info.token_search("WE")) == [
+        {
+            "id": TOKENS[3]["address"].lower(),
+            "name": "WETH",
+            "symbol": "WETH",
+            "decimals": 6,
+        }
+    ]
@@ -1,8 +1,29 @@
+import asyncio
+import json
+import logging
+import re
+import time
+from string import Template
+from typing import Any, AsyncIterator
+from urllib.parse import urlsplit
+
 import httpx
 from web3 import Web3
 
 from v3data.config import (
     ALCHEMY_URLS,
+    BLOCK_CACHE_ENABLED,
+    BLOCK_CACHE_MAX_MB,
+    BLOCK_CACHE_PATH,
+    PRICE_CACHE_FALLBACK_TTL,
+    SUBGRAPH_ALTERNATE_URLS,
+    SUBGRAPH_BATCH_SIZE,
+    SUBGRAPH_HEDGE_ENABLED,
+    SUBGRAPH_HEDGE_MAX_BLOCK_LAG,
+    SUBGRAPH_FIXTURE_DIR,
+    SUBGRAPH_PAGINATE_CONCURRENCY,
+    SUBGRAPH_RECORD,
+    TOKEN_LIST_URL,
     VISOR_SUBGRAPH_URL,
     GAMMA_SUBGRAPH_URLS,
     UNI_V2_SUBGRAPH_URL,
@@ -15,48 +36,539 @@ from v3data.config import (
 )
 
 from v3data import abi
+from v3data.block_cache import BlockCache
+from v3data.constants import BLOCK_FINALITY_DEPTH, DEFAULT_BLOCK_FINALITY_DEPTH
+from v3data.etag import record_source
+from v3data.fixtures import FixtureStore
+from v3data.hedging import latencies
+from v3data.limiter import limiter_for
+from v3data.metrics import (
+    SUBGRAPH_PAGES,
+    labels,
+    query_name,
+    record_error,
+    record_request,
+)
+from v3data.price_cache import prices
+from v3data.singleflight import SingleFlight
+from v3data.streaming import GraphQLStreamDecoder
+
+logger = logging.getLogger(__name__)
 
 async_client = httpx.AsyncClient(timeout=180)
+subgraph_requests = SingleFlight()
+block_cache = (
+    BlockCache(BLOCK_CACHE_PATH, BLOCK_CACHE_MAX_MB << 20)
+    if BLOCK_CACHE_ENABLED
+    else None
+)
+recorder = FixtureStore(SUBGRAPH_FIXTURE_DIR) if SUBGRAPH_RECORD else None
+
+LATEST_BLOCK_TTL_SECONDS = 30
+_latest_blocks = {}
+_graphql_name = re.compile(r"[_A-Za-z][_0-9A-Za-z]*")
+_web3_providers = {}
+
+
+def web3_for(chain: str) -> Web3:
+    """Web3 instance per chain, reusing its HTTP provider's connection pool"""
+    if chain not in _web3_providers:
+        _web3_providers[chain] = Web3(Web3.HTTPProvider(ALCHEMY_URLS[chain]))
+    return _web3_providers[chain]
 
 
 class SubgraphClient:
-    def __init__(self, url: str, chain: str = "mainnet"):
+    def __init__(self, url: str, chain: str = "mainnet", protocol: str = ""):
         self._url = url
         self.chain = chain
+        self.protocol = protocol
 
-    async def query(self, query: str, variables=None) -> dict:
-        """Make graphql query to subgraph"""
+    async def query(
+        self, query: str, variables=None, pinned_block: int | None = None
+    ) -> dict:
+        """Make graphql query to subgraph
+
+        pinned_block marks a time-travel query whose result only depends on that
+        block. Once the block is final the response is kept in the block cache.
+        """
         if variables:
             params = {"query": query, "variables": variables}
         else:
             params = {"query": query}
-        response = await async_client.post(self._url, json=params)
-        return response.json()
 
-    async def paginate_query(self, query, paginate_variable, variables={}):
+        request_key = self._request_key(params)
+
+        cache_key = None
+        if pinned_block is not None and block_cache:
+            cache_key = block_cache.key(*request_key)
+            content = await block_cache.get(cache_key)
+            if content:
+                record_source(self._url, pinned_block)
+                return json.loads(content)
+
+        # Identical concurrent queries share one request. The raw body is shared
+        # and decoded per caller, as callers modify the returned data in place.
+        content = await subgraph_requests.do(
+            request_key, lambda: self._fetch(params, pinned_block)
+        )
+        response = json.loads(content)
+        if response.get("errors"):
+            record_error(self._labels(params["query"]), "graphql")
+
+        if (
+            cache_key
+            and response.get("data")
+            and not response.get("errors")
+            and await self.is_final(pinned_block)
+        ):
+            await block_cache.set(cache_key, self._url, pinned_block, content)
+
+        record_source(self._url, self._response_block(response, pinned_block))
+        return response
+
+    @staticmethod
+    def _response_block(response: dict, pinned_block: int | None) -> int | None:
+        """Block the response was served at, when it tells or was pinned"""
+        try:
+            return int(response["data"]["_meta"]["block"]["number"])
+        except (KeyError, TypeError, ValueError):
+            return pinned_block
+
+    async def query_stream(
+        self, query: str, variables=None, converters: dict | None = None
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """Make graphql query, yielding results while the response downloads
+
+        Yields (field, entity) for every entity of list fields and (field, value)
+        for other fields, in document order, with converters applied by field
+        name. Meant for multi-megabyte responses that are reduced as they are
+        read, so it bypasses in-flight coalescing and hedging. Select
+        _meta { block { number } } to record the block the data was served at.
+        """
+        block = None
+        try:
+            async for field, value in self._stream(query, variables, converters):
+                if field == "_meta":
+                    block = self._response_block({"data": {"_meta": value}}, None)
+                yield field, value
+        finally:
+            record_source(self._url, block)
+
+    async def _stream(
+        self, query: str, variables=None, converters: dict | None = None
+    ) -> AsyncIterator[tuple[str, Any]]:
+        params = {"query": query}
+        if variables:
+            params["variables"] = variables
+
+        decoder = GraphQLStreamDecoder(converters)
+        recorded = [] if recorder else None
+        request_labels = self._labels(query)
+        start = time.monotonic()
+        size = 0
+        try:
+            async with limiter_for(self._url).stream(
+                async_client,
+                "POST",
+                self._url,
+                query=request_labels["query"],
+                json=params,
+            ) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    if recorded is not None:
+                        recorded.append(chunk)
+                    for event in decoder.feed(chunk):
+                        yield event
+
+            for event in decoder.close():
+                yield event
+        except (httpx.HTTPError, ValueError) as e:
+            record_request(
+                request_labels, time.monotonic() - start, size, type(e).__name__
+            )
+            raise
+        record_request(request_labels, time.monotonic() - start, size)
+
+        if recorded is not None:
+            recorder.save(self._url, query, variables, b"".join(recorded))
+
+        if decoder.errors:
+            record_error(request_labels, "graphql")
+            raise ValueError(f"Subgraph {self._url} returned errors: {decoder.errors}")
+
+    async def batch_query(
+        self,
+        template: str,
+        variables_list: list[dict],
+        pinned_blocks: list[int] | None = None,
+        batch_size: int = SUBGRAPH_BATCH_SIZE,
+    ) -> list[dict]:
+        """Run many lookups sharing one selection template as aliased batches
+
+        template holds the top level selections of a single lookup, each alias
+        starting with ${prefix}, and $name placeholders for its variables, which
+        are inlined as literals. Returns one {"data": ...} response per entry
+        of variables_list, in the same order, as if queried individually.
+        Errors with a path are only returned with the entries whose aliases
+        they concern, errors of the whole document with every entry of its batch.
+        """
+        template = Template(" ".join(template.split()))
+        responses = [None] * len(variables_list)
+
+        # Serve lookups pinned to a final block from the block cache
+        cache_keys = [None] * len(variables_list)
+        if pinned_blocks and block_cache:
+            for index, variables in enumerate(variables_list):
+                cache_keys[index] = block_cache.key(
+                    self._url,
+                    template.template,
+                    json.dumps(variables, sort_keys=True),
+                )
+                content = await block_cache.get(cache_keys[index])
+                if content:
+                    record_source(self._url, pinned_blocks[index])
+                    responses[index] = json.loads(content)
+
+        pending = [index for index, response in enumerate(responses) if not response]
+        batches = [
+            pending[start : start + batch_size]
+            for start in range(0, len(pending), batch_size)
+        ]
+
+        async def run_batch(batch):
+            selections = [
+                template.substitute(
+                    prefix=f"b{index}_",
+                    **{
+                        name: self._graphql_literal(value)
+                        for name, value in variables_list[index].items()
+                    },
+                )
+                for index in batch
+            ]
+            response = await self.query(f"{{ {' '.join(selections)} }}")
+            errors = response.get("errors") or []
+            # Errors of the whole document, such as rate limits or an invalid
+            # literal, fail every entry of the batch. Retrying them in smaller
+            # batches would only add load to an endpoint already failing.
+            unplaced = [error for error in errors if not self._error_alias(error)]
+
+            data = response.get("data") or {}
+            for index in batch:
+                prefix = f"b{index}_"
+                item = {"data": {}}
+                for key, value in data.items():
+                    if key.startswith(prefix):
+                        item["data"][key[len(prefix) :]] = value
+                item_errors = unplaced + [
+                    error
+                    for error in errors
+                    if (self._error_alias(error) or "").startswith(prefix)
+                ]
+                if item_errors:
+                    item["errors"] = item_errors
+                responses[index] = item
+
+        await asyncio.gather(*[run_batch(batch) for batch in batches])
+
+        for index in pending:
+            if (
+                cache_keys[index]
+                and not responses[index].get("errors")
+                and await self.is_final(pinned_blocks[index])
+            ):
+                await block_cache.set(
+                    cache_keys[index],
+                    self._url,
+                    pinned_blocks[index],
+                    json.dumps(responses[index]).encode(),
+                )
+
+        return responses
+
+    @staticmethod
+    def _error_alias(error: dict) -> str | None:
+        """Top level alias a GraphQL error is about, None for the document"""
+        path = error.get("path") if isinstance(error, dict) else None
+        return path[0] if path and isinstance(path[0], str) else None
+
+    @classmethod
+    def _graphql_literal(cls, value) -> str:
+        if value is None:
+            return "null"
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, (list, tuple)):
+            return f"[{', '.join(cls._graphql_literal(item) for item in value)}]"
+        if isinstance(value, dict):
+            # Input objects, such as where filters
+            for key in value:
+                if not _graphql_name.fullmatch(key):
+                    raise ValueError(f"Invalid GraphQL input field {key!r}")
+            fields = ", ".join(
+                f"{key}: {cls._graphql_literal(item)}" for key, item in value.items()
+            )
+            return f"{{{fields}}}"
+        if isinstance(value, str):
+            return json.dumps(value)
+        return str(value)
+
+    async def latest_block(self, url: str | None = None) -> int | None:
+        """Latest block indexed by the subgraph, or by another deployment at url,
+        cached for a few seconds"""
+        url = url or self._url
+        block, checked_at = _latest_blocks.get(url, (None, 0))
+        if time.monotonic() - checked_at < LATEST_BLOCK_TTL_SECONDS:
+            return block
+
+        try:
+            content = await self._post({"query": "{ _meta { block { number } } }"}, url)
+            block = int(json.loads(content)["data"]["_meta"]["block"]["number"])
+        except (httpx.HTTPError, ValueError, KeyError, TypeError):
+            block = None
+
+        _latest_blocks[url] = (block, time.monotonic())
+        return block
+
+    async def is_final(self, block: int) -> bool:
+        latest_block = await self.latest_block()
+        if latest_block is None:
+            return False
+        depth = BLOCK_FINALITY_DEPTH.get(self.chain, DEFAULT_BLOCK_FINALITY_DEPTH)
+        return int(block) <= latest_block - depth
+
+    async def _fetch(self, params: dict, pinned_block: int | None = None) -> bytes:
+        """Post to the subgraph, hedging to another deployment if it is slow
+
+        When hedging is enabled and the primary has not answered within its
+        recent latency percentile, the query is also sent to an alternate
+        deployment indexed at a compatible block and the first valid answer wins.
+        """
+        alternates = SUBGRAPH_ALTERNATE_URLS.get(self._url)
+        if not SUBGRAPH_HEDGE_ENABLED or not alternates:
+            return await self._post(params)
+
+        primary = asyncio.ensure_future(self._post(params))
+        done, _ = await asyncio.wait({primary}, timeout=latencies.hedge_delay(self._url))
+        alternate = None if done else await self._hedge_target(alternates, pinned_block)
+        if not alternate:
+            return await primary
+
+        logger.info(f"Hedging slow query to {self._url} with {alternate}")
+        pending = {primary, asyncio.ensure_future(self._post(params, alternate))}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if not task.exception() and self._is_valid(task.result()):
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        # Neither answer was valid, surface the primary's
+        return primary.result()
+
+    async def _hedge_target(
+        self, alternates: list[str], pinned_block: int | None
+    ) -> str | None:
+        """First alternate deployment indexed far enough to answer the query
+
+        The primary is not asked for its head, as it is the endpoint being
+        slow. Unpinned queries are compared to its last known head instead, or
+        sent to the first alternate when there is none.
+        """
+        if pinned_block is None:
+            primary_block, _ = _latest_blocks.get(self._url, (None, 0))
+            if primary_block is None:
+                return alternates[0]
+            required_block = primary_block - SUBGRAPH_HEDGE_MAX_BLOCK_LAG
+        else:
+            required_block = pinned_block
+
+        for alternate in alternates:
+            alternate_block = await self.latest_block(alternate)
+            if alternate_block is not None and alternate_block >= required_block:
+                return alternate
+
+        return None
+
+    @staticmethod
+    def _is_valid(content: bytes) -> bool:
+        try:
+            response = json.loads(content)
+        except ValueError:
+            return False
+        return (
+            isinstance(response, dict)
+            and bool(response.get("data"))
+            and not response.get("errors")
+        )
+
+    async def _post(self, params: dict, url: str | None = None) -> bytes:
+        url = url or self._url
+        request_labels = self._labels(params["query"])
+        start = time.monotonic()
+        try:
+            response = await limiter_for(url).request(
+                async_client.post, url, query=request_labels["query"], json=params
+            )
+        except httpx.HTTPError as e:
+            record_request(
+                request_labels, time.monotonic() - start, 0, type(e).__name__
+            )
+            raise
+        record_request(
+            request_labels,
+            time.monotonic() - start,
+            len(response.content),
+            None if response.is_success else f"HTTP {response.status_code}",
+        )
+        if response.is_success:
+            latencies.record(url, time.monotonic() - start)
+            if recorder:
+                recorder.save(
+                    url, params["query"], params.get("variables"), response.content
+                )
+        return response.content
+
+    def _labels(self, query: str) -> dict:
+        return labels("subgraph", self.chain, self.protocol, query_name(query))
+
+    def _request_key(self, params: dict) -> tuple[str, str, str]:
+        return (
+            self._url,
+            " ".join(params["query"].split()),
+            json.dumps(params.get("variables"), sort_keys=True),
+        )
 
-        # if not variables:
-        #     variables = {}
+    async def paginate_query(
+        self, query, paginate_variable, variables=None, shards=None
+    ):
+        """Paginate query using paginate_variable as cursor
 
+        If shards is given as a list of (start, end) tuples, each shard is paginated
+        independently and concurrently, with $paginate as the exclusive start and
+        $paginateEnd as the exclusive end of the shard. Results are merged in shard
+        order, so shards must be sorted and non-overlapping.
+        """
         if f"{paginate_variable}_gt" not in query:
             raise ValueError("Paginate variable missing in query")
 
+        variables = dict(variables or {})
         variables["orderBy"] = paginate_variable
         variables["orderDirection"] = "asc"
 
+        if not shards:
+            return await self._paginate(query, paginate_variable, variables)
+
+        if f"{paginate_variable}_lt" not in query:
+            raise ValueError("Paginate end variable missing in query")
+
+        semaphore = asyncio.Semaphore(SUBGRAPH_PAGINATE_CONCURRENCY)
+
+        async def paginate_shard(start, end):
+            async with semaphore:
+                return await self._paginate(
+                    query,
+                    paginate_variable,
+                    {**variables, "paginate": start, "paginateEnd": end},
+                )
+
+        shard_data = await asyncio.gather(
+            *[paginate_shard(start, end) for start, end in shards]
+        )
+        return [item for data in shard_data for item in data]
+
+    async def _paginate(self, query, paginate_variable, variables):
         all_data = []
-        has_data = True
-        params = {"query": query, "variables": variables}
-        while has_data:
-            response = await async_client.post(self._url, json=params)
-            data = next(iter(response.json()["data"].values()))
-            has_data = bool(data)
-            if has_data:
-                all_data += data
-                params["variables"]["paginate"] = data[-1][paginate_variable]
+        async for page in self.iter_entities(query, paginate_variable, variables):
+            all_data += page
 
         return all_data
 
+    async def iter_entities(
+        self,
+        query: str,
+        paginate_variable: str = "id",
+        variables=None,
+        converters: dict | None = None,
+    ) -> AsyncIterator[list[dict]]:
+        """Yield pages of a query paginated with paginate_variable as cursor
+
+        The query orders its single top level list by paginate_variable and
+        filters on {paginate_variable}_gt: $paginate, which starts at "" unless
+        given in variables. Pages are fetched one at a time as they are
+        consumed, so results past the first 1000 never need to be held at once.
+        The oldest block the pages were served at is recorded as the source
+        block of the subgraph. With converters, each page is stream decoded as
+        in query_stream.
+        """
+        if f"{paginate_variable}_gt" not in query:
+            raise ValueError("Paginate variable missing in query")
+
+        # Pages may be served at different blocks, the data is only as recent
+        # as the oldest of them
+        paged_query = query.rstrip()[:-1] + " _meta { block { number } } }"
+        params = {
+            "query": paged_query,
+            "variables": {"paginate": "", **(variables or {})},
+        }
+        oldest_block = None
+        try:
+            while True:
+                data = await self._page(params, converters)
+                SUBGRAPH_PAGES.labels(**self._labels(query)).inc()
+                block = self._response_block({"data": data}, None)
+                if block is not None:
+                    oldest_block = min(block, oldest_block or block)
+                data.pop("_meta", None)
+                page = next(iter(data.values()), [])
+                if not page:
+                    return
+
+                yield page
+                params["variables"]["paginate"] = page[-1][paginate_variable]
+        finally:
+            record_source(self._url, oldest_block)
+
+    async def _page(self, params: dict, converters: dict | None) -> dict:
+        if converters is None:
+            return dict(json.loads(await self._post(params))["data"])
+
+        data = {}
+        async for field, value in self._stream(
+            params["query"], params["variables"], converters
+        ):
+            if field == "_meta":
+                data[field] = value
+            else:
+                data.setdefault(field, []).append(value)
+        return data
+
+    @staticmethod
+    def id_shards(count: int) -> list[tuple[str, str]]:
+        """Split the hex id space ("0x..." ids) into count contiguous shards"""
+        count = max(1, min(count, 256))
+        prefixes = [f"0x{i * 256 // count:02x}" for i in range(count)]
+        # "" sorts before and "0xg" after every hex id
+        starts = [""] + prefixes[1:]
+        ends = prefixes[1:] + ["0xg"]
+        return list(zip(starts, ends))
+
+    @staticmethod
+    def range_shards(start: int, end: int, count: int) -> list[tuple[int, int]]:
+        """Split [start, end) into count contiguous shards for numeric cursors
+        such as timestamp or block number"""
+        count = max(1, min(count, end - start))
+        bounds = [start + (end - start) * i // count for i in range(count + 1)]
+        # Shard start is exclusive, so shift it one below the range boundary
+        return [(bounds[i] - 1, bounds[i + 1]) for i in range(count)]
+
 
 class VisorClient(SubgraphClient):
     def __init__(self):
@@ -102,7 +614,7 @@ class VisorClient(SubgraphClient):
 
 class GammaClient(SubgraphClient):
     def __init__(self, protocol: str, chain: str):
-        super().__init__(GAMMA_SUBGRAPH_URLS[protocol][chain], chain)
+        super().__init__(GAMMA_SUBGRAPH_URLS[protocol][chain], chain, protocol)
 
 
 class UniswapV2Client(SubgraphClient):
@@ -112,17 +624,17 @@ class UniswapV2Client(SubgraphClient):
 
 class UniswapV3Client(SubgraphClient):
     def __init__(self, protocol: str, chain: str):
-        super().__init__(DEX_SUBGRAPH_URLS[protocol][chain], chain)
+        super().__init__(DEX_SUBGRAPH_URLS[protocol][chain], chain, protocol)
 
 
 class DexFeeGrowthClient(SubgraphClient):
     def __init__(self, protocol: str, chain: str):
-        super().__init__(DEX_FEEGROWTH_SUBGRAPH_URLS[protocol][chain], chain)
+        super().__init__(DEX_FEEGROWTH_SUBGRAPH_URLS[protocol][chain], chain, protocol)
 
 
 class HypePoolClient(SubgraphClient):
     def __init__(self, protocol: str, chain: str):
-        super().__init__(DEX_HYPEPOOL_SUBGRAPH_URLS[protocol][chain], chain)
+        super().__init__(DEX_HYPEPOOL_SUBGRAPH_URLS[protocol][chain], chain, protocol)
 
 
 class EthBlocksClient(SubgraphClient):
@@ -196,17 +708,64 @@ class CoingeckoClient:
         self.base = "https://api.coingecko.com/api/v3/"
 
     async def get_price(self, ids, vs_currencies):
+        price, _ = await prices.get(
+            ("coingecko", ids, vs_currencies),
+            lambda: self._get_price(ids, vs_currencies),
+            ttl=PRICE_CACHE_FALLBACK_TTL,
+            max_stale=0,
+        )
+        return price
+
+    async def _get_price(self, ids, vs_currencies):
         endpoint = f"{self.base}/simple/price"
 
         params = {"ids": ids, "vs_currencies": vs_currencies}
 
+        request_labels = labels("coingecko", query="simple/price")
+        start = time.monotonic()
         response = await async_client.get(endpoint, params=params)
+        record_request(
+            request_labels,
+            time.monotonic() - start,
+            len(response.content),
+            None if response.status_code == 200 else f"HTTP {response.status_code}",
+        )
         if response.status_code == 200:
             return response.json()
         else:
             return {"gamma-strategies": {"usd": 0.623285, "eth": 0.00016391}}
 
 
+class TokenListClient:
+    def __init__(self, url: str = TOKEN_LIST_URL):
+        self.url = url
+
+    async def get_tokens(
+        self, etag: str | None = None, last_modified: str | None = None
+    ) -> httpx.Response:
+        """Conditional GET of the token list, 304 when unchanged"""
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        request_labels = labels("tokenlist", query="tokens")
+        start = time.monotonic()
+        response = await async_client.get(self.url, headers=headers)
+        record_request(
+            request_labels,
+            time.monotonic() - start,
+            len(response.content),
+            (
+                None
+                if response.status_code in (200, 304)
+                else f"HTTP {response.status_code}"
+            ),
+        )
+        return response
+
+
 class LlamaClient:
     def __init__(self, chain):
         self.base = "https://coins.llama.fi/"
@@ -219,7 +778,15 @@ class LlamaClient:
     async def block_from_timestamp(self, timestamp, return_timestamp=False):
         endpoint = f"{self.base}/block/{self.chain}/{timestamp}"
 
+        request_labels = labels("llama", self.chain, query="block")
+        start = time.monotonic()
         response = await async_client.get(endpoint)
+        record_request(
+            request_labels,
+            time.monotonic() - start,
+            len(response.content),
+            None if response.status_code == 200 else f"HTTP {response.status_code}",
+        )
         if response.status_code == 200:
             if return_timestamp:
                 return response.json()
@@ -228,9 +795,46 @@ class LlamaClient:
         return None
 
 
+class RpcClient:
+    """Async JSON-RPC client for chain node reads"""
+
+    def __init__(self, chain: str):
+        self.chain = chain
+        self.url = ALCHEMY_URLS[chain]
+        # The URL holds the API key, keep it out of limiter stats and logs
+        self.limiter_name = f"{urlsplit(self.url).hostname}/{chain}"
+
+    async def call(self, method: str, params: list) -> Any:
+        payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+
+        request_labels = labels("rpc", self.chain, query=method)
+        start = time.monotonic()
+        try:
+            response = await limiter_for(self.limiter_name).request(
+                async_client.post, self.url, query=method, json=payload
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            record_request(
+                request_labels, time.monotonic() - start, 0, type(e).__name__
+            )
+            raise
+        record_request(request_labels, time.monotonic() - start, len(response.content))
+
+        content = response.json()
+        if content.get("error"):
+            record_error(request_labels, "rpc")
+            raise ValueError(f"{method} failed: {content['error']}")
+
+        return content["result"]
+
+    async def eth_call(self, to: str, data: str, block: str = "latest") -> str:
+        return await self.call("eth_call", [{"to": to, "data": data}, block])
+
+
 class MasterChefContract:
     def __init__(self, address, chain: str):
-        w3 = Web3(Web3.HTTPProvider(ALCHEMY_URLS[chain]))
+        w3 = web3_for(chain)
         self.contract = w3.eth.contract(
             address=Web3.toChecksumAddress(address), abi=abi.MASTERCHEF_ABI
         )
@@ -243,7 +847,7 @@ class MasterChefContract:
 
 class RewarderContract:
     def __init__(self, address, chain: str):
-        w3 = Web3(Web3.HTTPProvider(ALCHEMY_URLS[chain]))
+        w3 = web3_for(chain)
         self.contract = w3.eth.contract(
             address=Web3.toChecksumAddress(address), abi=abi.REWARDER_ABI
         )
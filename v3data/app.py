@@ -1,10 +1,8 @@
 import logging
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_cache import FastAPICache
-from fastapi_cache.backends.inmemory import InMemoryBackend
-from fastapi_cache.decorator import cache
 
 from v3data.routers import mainnet, polygon, arbitrum, optimism, celo, simulator
 from v3data.routers.quickswap import polygon as quickswap_polygon
@@ -12,9 +10,33 @@ from v3data.routers.quickswap import polygon as quickswap_polygon
 from v3data.bollingerbands import BollingerBand
 
 from v3data.charts.daily import DailyChart
-from v3data.config import CHARTS_CACHE_TIMEOUT
+from v3data.cache_backend import (
+    LRUBackend,
+    SQLiteBackend,
+    cache,
+    normalize_parameter,
+    normalized_key_builder,
+)
+from v3data.etag import (
+    SourceBlocks,
+    SourceBlocksJsonCoder,
+    conditional_response,
+    source_blocks,
+)
+from v3data.config import (
+    CHARTS_CACHE_TIMEOUT,
+    HEAD_WATCH_ENABLED,
+    PREWARM_ENABLED,
+    RESPONSE_CACHE_BACKEND,
+    RESPONSE_CACHE_PATH,
+)
 
+from v3data.head_watcher import head_watcher
 from v3data.pools import pools_from_symbol
+from v3data.limiter import limiter_stats
+from v3data.metrics import current_route, latest_metrics, route_template
+from v3data.precompressed import accepted_encodings
+from v3data.prewarm import Prewarmer
 
 logging.basicConfig(
     format="[%(asctime)s:%(levelname)s:%(name)s]:%(message)s",
@@ -38,6 +60,29 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    """Label upstream metrics recorded while serving a request with its route,
+    let cached responses pick the encoding the client accepts, and tag them
+    with the subgraph blocks they were computed from"""
+    route_token = current_route.set(route_template(app, request.scope))
+    encoding_token = accepted_encodings.set(request.headers.get("accept-encoding", ""))
+    sources_token = source_blocks.set(SourceBlocks())
+    try:
+        response = await call_next(request)
+        return await conditional_response(request, response, source_blocks.get())
+    finally:
+        source_blocks.reset(sources_token)
+        accepted_encodings.reset(encoding_token)
+        current_route.reset(route_token)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    content, content_type = latest_metrics()
+    return Response(content, headers={"Content-Type": content_type})
+
+
 @app.get("/bollingerBandsLatest/{poolAddress}")
 async def bollingerbands_latest(poolAddress: str, periodHours: int = 24):
     bband = BollingerBand(poolAddress, periodHours)
@@ -47,7 +92,7 @@ async def bollingerbands_latest(poolAddress: str, periodHours: int = 24):
 @app.get("/charts/dailyTvl")
 @cache(expire=CHARTS_CACHE_TIMEOUT)
 async def daily_tvl_chart_data(days: int = 24):
-    daily = DailyChart(days)
+    daily = DailyChart(normalize_parameter("days", days))
     return {"data": await daily.tvl()}
 
 
@@ -68,6 +113,52 @@ async def uniswap_pools(token: str):
     return {"pools": await pools_from_symbol(token)}
 
 
+@app.get("/status/subgraphLimits")
+async def subgraph_limits():
+    return limiter_stats()
+
+
+@app.get("/status/subgraphHeads")
+async def subgraph_heads():
+    return head_watcher.heads
+
+
+@app.get("/status/prewarm")
+async def prewarm_status():
+    return prewarmer.stats
+
+
+# Only one worker refreshes a cache shared by all of them
+prewarmer = Prewarmer(
+    app,
+    lock_path=(
+        RESPONSE_CACHE_PATH + ".prewarm.lock"
+        if RESPONSE_CACHE_BACKEND == "sqlite"
+        else None
+    ),
+    heads=head_watcher if HEAD_WATCH_ENABLED else None,
+)
+
+
 @app.on_event("startup")
 async def startup():
-    FastAPICache.init(InMemoryBackend())
+    heads = head_watcher if HEAD_WATCH_ENABLED else None
+    if RESPONSE_CACHE_BACKEND == "sqlite":
+        backend = SQLiteBackend(RESPONSE_CACHE_PATH, heads=heads)
+    else:
+        backend = LRUBackend(heads=heads)
+    FastAPICache.init(
+        backend, coder=SourceBlocksJsonCoder, key_builder=normalized_key_builder
+    )
+
+    if HEAD_WATCH_ENABLED:
+        head_watcher.start()
+    if PREWARM_ENABLED:
+        backend.refreshed_keys = prewarmer.keys()
+        prewarmer.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await prewarmer.stop()
+    await head_watcher.stop()
@@ -0,0 +1,120 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+
+class BlockCache:
+    """Persistent cache for subgraph responses pinned to a final block
+
+    Time-travel queries against a block that can no longer be reorged always
+    return the same data, so their raw responses are kept in a local SQLite
+    file that survives restarts and is shared by all workers on the host.
+    Past max_bytes of data the oldest responses are evicted first. File
+    access and compression run in a thread, one statement at a time, to keep
+    them off the event loop.
+    """
+
+    # Share of responses evicted at once when the cache is full
+    EVICT_FRACTION = 0.1
+
+    def __init__(self, path: str, max_bytes: int | None = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._connection = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    block INTEGER NOT NULL,
+                    content BLOB NOT NULL,
+                    created INTEGER NOT NULL
+                )
+                """
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_created ON responses (created)"
+            )
+        return self._connection
+
+    @staticmethod
+    def key(url: str, query: str, variables: str) -> str:
+        return hashlib.sha256("\n".join([url, query, variables]).encode()).hexdigest()
+
+    async def get(self, key: str) -> bytes | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, url: str, block: int, content: bytes) -> None:
+        await asyncio.to_thread(self._set, key, url, block, content)
+
+    def _execute(self, statement: str, parameters: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self.connection.execute(statement, parameters)
+
+    def _get(self, key: str) -> bytes | None:
+        try:
+            row = self._execute(
+                "SELECT content FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Block cache read failed: {e}")
+            return None
+
+        return zlib.decompress(row[0]) if row else None
+
+    def _set(self, key: str, url: str, block: int, content: bytes) -> None:
+        try:
+            self._execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, url, block, zlib.compress(content), int(time.time())),
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Block cache write failed: {e}")
+            return
+
+        self._evict()
+
+    def size(self) -> int:
+        """Bytes of the file in use, not counting free pages"""
+        page_size, page_count, free_pages = (
+            self._execute(f"PRAGMA {pragma}").fetchone()[0]
+            for pragma in ("page_size", "page_count", "freelist_count")
+        )
+        return page_size * (page_count - free_pages)
+
+    def _evict(self) -> None:
+        if self.max_bytes is None:
+            return
+
+        try:
+            if self.size() <= self.max_bytes:
+                return
+            (count,) = self._execute("SELECT COUNT(*) FROM responses").fetchone()
+            # Freed pages are reused by later writes, so the file stays bounded
+            self._execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY created, rowid LIMIT ?
+                )
+                """,
+                (max(1, int(count * self.EVICT_FRACTION)),),
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Block cache eviction failed: {e}")
@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from typing import Iterable
+
+from v3data import LlamaClient
+from v3data.config import (
+    BLOCK_INDEX_MAX_GAP_SECONDS,
+    BLOCK_INDEX_PATH,
+    BLOCK_INDEX_RETENTION_DAYS,
+)
+from v3data.constants import BLOCK_TIME_SECONDS, DAY_SECONDS
+from v3data.hype_fees.schema import Time
+
+logger = logging.getLogger(__name__)
+
+RELOAD_SECONDS = 300
+
+
+class BlockIndex:
+    """Per chain index of observed (block, timestamp) pairs
+
+    Pairs seen in subgraph responses are persisted to a local SQLite file shared
+    by all workers. A timestamp is answered by binary search over the observed
+    pairs and linear interpolation between the two around it, together with
+    the width of that gap in seconds as a measure of how far off it may be.
+    Only observations within retention_days of the latest one are kept. File
+    access runs in a thread, one statement at a time, to keep it off the event
+    loop.
+    """
+
+    def __init__(self, path: str, retention_days: int = BLOCK_INDEX_RETENTION_DAYS):
+        self.path = path
+        self.retention_seconds = retention_days * DAY_SECONDS
+        self._connection = None
+        self._lock = threading.Lock()
+        self._points: dict[str, dict[int, int]] = {}
+        self._sorted: dict[str, tuple[list[int], list[int]]] = {}
+        self._loaded_at: dict[str, float] = {}
+        # Insertion sequence of the last row read back, per chain
+        self._last_seq: dict[str, int] = {}
+        self._unsaved: list[tuple[str, int, int]] = []
+        self._flush_task: asyncio.Task | None = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS block_timestamps (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    chain TEXT NOT NULL,
+                    block INTEGER NOT NULL,
+                    timestamp INTEGER NOT NULL,
+                    UNIQUE (chain, block)
+                )
+                """)
+        return self._connection
+
+    def _execute(self, statement: str, parameters: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self.connection.execute(statement, parameters)
+
+    async def _load(self, chain: str) -> dict[int, int]:
+        """Observed pairs of chain, picking up pairs other workers inserted
+        since the last reload and pruning expired pairs periodically"""
+        if time.monotonic() - self._loaded_at.get(chain, 0) > RELOAD_SECONDS:
+            self._loaded_at[chain] = time.monotonic()
+            rows = await asyncio.to_thread(
+                self._read, chain, self._last_seq.get(chain, 0)
+            )
+            if rows:
+                self._last_seq[chain] = rows[-1][0]
+            points = self._points.setdefault(chain, {})
+            points.update((block, timestamp) for _, block, timestamp in rows)
+            expired = self._expire(points)
+            if expired:
+                await asyncio.to_thread(self._delete, chain, max(expired))
+            self._sorted.pop(chain, None)
+        return self._points.setdefault(chain, {})
+
+    def _read(self, chain: str, after_seq: int) -> list[tuple[int, int, int]]:
+        try:
+            # Sequence rather than block order, so pairs of older blocks
+            # inserted by other workers since the last reload are not missed
+            return self._execute(
+                """
+                SELECT seq, block, timestamp FROM block_timestamps
+                WHERE chain = ? AND seq > ? ORDER BY seq
+                """,
+                (chain, after_seq),
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Block index read failed: {e}")
+            return []
+
+    def _expire(self, points: dict[int, int]) -> list[int]:
+        """Drop and return blocks observed over the retention before the latest"""
+        if not points:
+            return []
+
+        cutoff = max(points.values()) - self.retention_seconds
+        expired = [block for block, timestamp in points.items() if timestamp < cutoff]
+        for block in expired:
+            del points[block]
+        return expired
+
+    def _delete(self, chain: str, max_block: int) -> None:
+        try:
+            # Blocks are ordered by timestamp, so this uses the unique index
+            self._execute(
+                "DELETE FROM block_timestamps WHERE chain = ? AND block <= ?",
+                (chain, max_block),
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Block index prune failed: {e}")
+
+    def observe(self, chain: str, observations: Iterable[tuple[int, int]]) -> None:
+        """Add observed pairs, persisting them in the background when called
+        from the event loop"""
+        points = self._points.setdefault(chain, {})
+        new = [
+            (int(block), int(timestamp))
+            for block, timestamp in observations
+            if int(block) not in points
+        ]
+        if not new:
+            return
+
+        points.update(new)
+        self._sorted.pop(chain, None)
+        self._unsaved += [(chain, block, timestamp) for block, timestamp in new]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(self._take_unsaved())
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self.flush())
+
+    async def flush(self) -> None:
+        """Persist pairs observed since the last flush"""
+        rows = self._take_unsaved()
+        if rows:
+            await asyncio.to_thread(self._write, rows)
+
+    def _take_unsaved(self) -> list[tuple[str, int, int]]:
+        rows, self._unsaved = self._unsaved, []
+        return rows
+
+    def _write(self, rows: list[tuple[str, int, int]]) -> None:
+        try:
+            with self._lock:
+                self.connection.executemany(
+                    """
+                    INSERT OR IGNORE INTO block_timestamps (chain, block, timestamp)
+                    VALUES (?, ?, ?)
+                    """,
+                    rows,
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Block index write failed: {e}")
+
+    async def estimate(self, chain: str, timestamp: int) -> tuple[int, int] | None:
+        """(block, gap in seconds) for timestamp, None without observations"""
+        points = await self._load(chain)
+        if not points:
+            return None
+
+        if chain not in self._sorted:
+            blocks = sorted(points)
+            self._sorted[chain] = (blocks, [points[block] for block in blocks])
+        blocks, timestamps = self._sorted[chain]
+
+        index = bisect_left(timestamps, timestamp)
+        if index < len(timestamps) and timestamps[index] == timestamp:
+            return blocks[index], 0
+
+        if 0 < index < len(timestamps):
+            lower, upper = index - 1, index
+            gap = timestamps[upper] - timestamps[lower]
+        else:
+            # Extrapolate from the two observations nearest the edge
+            lower, upper = (0, 1) if index == 0 else (-2, -1)
+            gap = abs(timestamp - timestamps[index - 1 if index else 0])
+            if len(timestamps) < 2 or timestamps[upper] == timestamps[lower]:
+                nearest = index - 1 if index else 0
+                block = blocks[nearest] + (timestamp - timestamps[nearest]) // (
+                    BLOCK_TIME_SECONDS[chain]
+                )
+                return block, gap
+
+        block = blocks[lower] + (timestamp - timestamps[lower]) * (
+            blocks[upper] - blocks[lower]
+        ) // (timestamps[upper] - timestamps[lower])
+        return block, gap
+
+
+block_index = BlockIndex(BLOCK_INDEX_PATH)
+
+
+async def block_from_timestamp(chain: str, timestamp: int) -> Time | None:
+    """Block at timestamp from the local index, asking DefiLlama only when the
+    index has no observation within BLOCK_INDEX_MAX_GAP_SECONDS of it"""
+    estimate = await block_index.estimate(chain, timestamp)
+    if estimate and estimate[1] <= BLOCK_INDEX_MAX_GAP_SECONDS:
+        return Time(block=estimate[0], timestamp=timestamp)
+
+    response = await LlamaClient(chain).block_from_timestamp(timestamp, True)
+    if response:
+        block_index.observe(chain, [(response["height"], response["timestamp"])])
+        return Time(block=response["height"], timestamp=response["timestamp"])
+
+    if estimate:
+        return Time(block=estimate[0], timestamp=timestamp)
+
+    return None
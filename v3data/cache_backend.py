@@ -0,0 +1,358 @@
+import asyncio
+import inspect
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+from fastapi_cache import decorator
+from fastapi_cache.backends import Backend
+from fastapi_cache.coder import Coder
+from fastapi_cache.key_builder import default_key_builder
+
+from v3data.config import HEAD_CACHE_TTL_FACTOR, RESPONSE_CACHE_MAX_BYTES
+from v3data.head_watcher import HeadWatcher
+from v3data.metrics import RESPONSE_CACHE_EVICTIONS, RESPONSE_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+PURGE_INTERVAL_SECONDS = 60
+
+# Bounds of numeric route parameters, so arbitrary values cannot fragment
+# the cache. Functions taking them clamp with normalize_parameter as well.
+PARAMETER_LIMITS = {
+    "days": (1, 365),
+    "hours": (1, 24 * 90),
+    "periodHours": (1, 24 * 90),
+}
+_address = re.compile(r"0x[0-9a-fA-F]{40}")
+
+
+def normalize_parameter(name: str, value):
+    """Lowercase addresses and clamp bounded numeric parameters"""
+    if isinstance(value, str) and _address.fullmatch(value):
+        return value.lower()
+    if name in PARAMETER_LIMITS and isinstance(value, int):
+        low, high = PARAMETER_LIMITS[name]
+        return min(max(value, low), high)
+    return value
+
+
+def normalized_key_builder(
+    func, namespace="", request=None, response=None, args=None, kwargs=None
+):
+    """default_key_builder over named, normalized arguments of func"""
+    try:
+        arguments = inspect.signature(func).bind_partial(
+            *(args or ()), **(kwargs or {})
+        )
+    except TypeError:
+        return default_key_builder(func, namespace, args=args, kwargs=kwargs)
+
+    normalized = {
+        name: normalize_parameter(name, value)
+        for name, value in arguments.arguments.items()
+    }
+    return default_key_builder(func, namespace, args=(), kwargs=normalized)
+
+
+@dataclass(frozen=True)
+class CacheSettings:
+    """Arguments given to the @cache decorator of a route"""
+
+    expire: int | None = None
+    coder: type[Coder] | None = None
+    key_builder: Callable | None = None
+    namespace: str = ""
+
+
+def cache(
+    expire: int = None,
+    coder: type[Coder] = None,
+    key_builder: Callable = None,
+    namespace: str = "",
+):
+    """fastapi_cache's @cache, recording its settings as cache_settings on the
+    decorated function so its entries can be written ahead of requests"""
+    settings = CacheSettings(expire, coder, key_builder, namespace)
+
+    def wrapper(func):
+        cached = decorator.cache(expire, coder, key_builder, namespace)(func)
+        cached.cache_settings = settings
+        return cached
+
+    return wrapper
+
+
+class SQLiteBackend(Backend):
+    """fastapi_cache backend shared by all workers on the host
+
+    Responses are stored in a SQLite file, by default on the /dev/shm tmpfs so
+    it never touches disk. Each set is a single atomic INSERT OR REPLACE, so
+    readers in other workers see either the previous or the new value. Expired
+    rows are ignored on read and purged periodically. File access runs in a
+    thread, one statement at a time, to keep it off the event loop.
+
+    Given a HeadWatcher, entries are tagged with the subgraph heads they were
+    computed at, kept up to HEAD_CACHE_TTL_FACTOR times their TTL and served
+    until those heads advance. Entries under refreshed_keys are served until
+    their TTL instead, as the prewarmer replaces them when the heads advance.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        heads: HeadWatcher | None = None,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.heads = heads
+        # Keys a prewarmer refreshes as soon as heads advance
+        self.refreshed_keys: set[str] = set()
+        self._connection = None
+        self._lock = threading.Lock()
+        self._purged_at = 0.0
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    expires REAL NOT NULL,
+                    stale_at REAL NOT NULL,
+                    tags TEXT NOT NULL
+                )
+                """)
+            # Purges select by expiry and evict by staleness
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_stale_at ON responses (stale_at)"
+            )
+        return self._connection
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[str]]:
+        row = await asyncio.to_thread(self._get, key)
+        if not row:
+            RESPONSE_CACHE_LOOKUPS.labels(result="miss").inc()
+            return 0, None
+        value, expires, stale_at, tags = row
+        if not _is_current(
+            self.heads, json.loads(tags), stale_at, key in self.refreshed_keys
+        ):
+            RESPONSE_CACHE_LOOKUPS.labels(result="stale").inc()
+            return 0, None
+        RESPONSE_CACHE_LOOKUPS.labels(result="hit").inc()
+        return int(expires - time.time()), value
+
+    async def get(self, key: str) -> Optional[str]:
+        _, value = await self.get_with_ttl(key)
+        return value
+
+    async def set(self, key: str, value: str, expire: int = None):
+        tags, stale_at, expires = _lifetime(self.heads, expire)
+        await asyncio.to_thread(
+            self._set, key, value, expires, stale_at, json.dumps(tags)
+        )
+
+    async def clear(self, namespace: str = None, key: str = None) -> int:
+        if namespace:
+            statement = "DELETE FROM responses WHERE substr(key, 1, ?) = ?"
+            parameters = (len(namespace), namespace)
+        elif key:
+            statement = "DELETE FROM responses WHERE key = ?"
+            parameters = (key,)
+        else:
+            return 0
+
+        try:
+            cursor = await asyncio.to_thread(self._execute, statement, parameters)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache clear failed: {e}")
+            return 0
+
+        return cursor.rowcount
+
+    def _execute(self, statement: str, parameters: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self.connection.execute(statement, parameters)
+
+    def _get(self, key: str) -> tuple | None:
+        try:
+            return self._execute(
+                "SELECT value, expires, stale_at, tags FROM responses"
+                " WHERE key = ? AND expires > ?",
+                (key, time.time()),
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Cache read failed: {e}")
+            return None
+
+    def _set(
+        self, key: str, value: str, expires: float, stale_at: float, tags: str
+    ) -> None:
+        try:
+            self._execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, value, expires, stale_at, tags),
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Cache write failed: {e}")
+            return
+
+        self._purge()
+
+    def _purge(self) -> None:
+        if time.monotonic() - self._purged_at < PURGE_INTERVAL_SECONDS:
+            return
+
+        self._purged_at = time.monotonic()
+        try:
+            expired = self._execute(
+                "DELETE FROM responses WHERE expires <= ?", (time.time(),)
+            ).rowcount
+            RESPONSE_CACHE_EVICTIONS.labels(reason="expired").inc(expired)
+
+            (size,) = self._execute(
+                "SELECT COALESCE(SUM(length(key) + length(value)), 0) FROM responses"
+            ).fetchone()
+            if size <= self.max_bytes:
+                return
+
+            # Over budget, drop the entries closest to expiring first, all the
+            # ones that must go to get back under it in one statement
+            evicted = self._execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(length(key) + length(value)) OVER (
+                            ORDER BY stale_at, key
+                            ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                        ) AS freed
+                        FROM responses
+                    )
+                    WHERE COALESCE(freed, 0) < ?
+                )
+                """,
+                (size - self.max_bytes,),
+            ).rowcount
+            RESPONSE_CACHE_EVICTIONS.labels(reason="size").inc(evicted)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache purge failed: {e}")
+
+
+class LRUBackend(Backend):
+    """Per worker fastapi_cache backend bounded by the size of its entries
+
+    Entries are evicted least recently used first once their keys and values
+    add up to more than max_bytes, and on read once expired. Entries are kept
+    while subgraph heads do not advance as in SQLiteBackend.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        heads: HeadWatcher | None = None,
+    ):
+        self.max_bytes = max_bytes
+        self.heads = heads
+        # Keys a prewarmer refreshes as soon as heads advance
+        self.refreshed_keys: set[str] = set()
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[str, float, float, dict[str, int]]] = (
+            OrderedDict()
+        )
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[str]]:
+        entry = self._entries.get(key)
+        if entry and entry[1] <= time.time():
+            self._remove(key)
+            RESPONSE_CACHE_EVICTIONS.labels(reason="expired").inc()
+            entry = None
+
+        if not entry:
+            RESPONSE_CACHE_LOOKUPS.labels(result="miss").inc()
+            return 0, None
+
+        value, expires, stale_at, tags = entry
+        if not _is_current(self.heads, tags, stale_at, key in self.refreshed_keys):
+            RESPONSE_CACHE_LOOKUPS.labels(result="stale").inc()
+            return 0, None
+
+        self._entries.move_to_end(key)
+        RESPONSE_CACHE_LOOKUPS.labels(result="hit").inc()
+        return int(expires - time.time()), value
+
+    async def get(self, key: str) -> Optional[str]:
+        _, value = await self.get_with_ttl(key)
+        return value
+
+    async def set(self, key: str, value: str, expire: int = None):
+        if key in self._entries:
+            self._remove(key)
+
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+
+        tags, stale_at, expires = _lifetime(self.heads, expire)
+        self._entries[key] = (value, expires, stale_at, tags)
+        self.size += size
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            RESPONSE_CACHE_EVICTIONS.labels(reason="size").inc()
+
+    async def clear(self, namespace: str = None, key: str = None) -> int:
+        if namespace:
+            keys = [key for key in self._entries if key.startswith(namespace)]
+        elif key in self._entries:
+            keys = [key]
+        else:
+            keys = []
+
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def _remove(self, key: str) -> None:
+        value = self._entries.pop(key)[0]
+        self.size -= len(key) + len(value)
+
+
+def _lifetime(
+    heads: HeadWatcher | None, expire: int | None
+) -> tuple[dict[str, int], float, float]:
+    """(head tags, stale_at, expires) of an entry set now with TTL expire"""
+    stale_at = time.time() + int(expire or 0)
+    tags = heads.tags() if heads else {}
+    if not tags:
+        return tags, stale_at, stale_at
+    return tags, stale_at, time.time() + int(expire or 0) * HEAD_CACHE_TTL_FACTOR
+
+
+def _is_current(
+    heads: HeadWatcher | None,
+    tags: dict[str, int],
+    stale_at: float,
+    refreshed: bool = False,
+) -> bool:
+    # Refreshed keys stay until replaced, so requests never recompute them
+    if heads is None or refreshed:
+        return time.time() < stale_at
+    return heads.is_current(tags, stale_at)
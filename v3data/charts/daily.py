@@ -11,9 +11,11 @@ class DailyChart:
     async def _get_all_flows(self):
         """Daily chart flows bar chart for hypervisors"""
         query = """
-        query hypervisorDaily($days: Int!){
+        query hypervisorDaily($days: Int!, $paginate: String!){
             uniswapV3Hypervisors(
                 first: 1000
+                orderBy: id
+                where: { id_gt: $paginate }
             ){
                 id
                 dayData(
@@ -31,11 +33,13 @@ class DailyChart:
         }
         """
         variables = {"days": self.days}
-        response = await self.gamma_client.query(query, variables)
-        hypervisors = response["data"]["uniswapV3Hypervisors"]
-
         data = [
-            day_data for hypervisor in hypervisors for day_data in hypervisor["dayData"]
+            day_data
+            async for hypervisors in self.gamma_client.iter_entities(
+                query, variables=variables
+            )
+            for hypervisor in hypervisors
+            for day_data in hypervisor["dayData"]
         ]
 
         return data
@@ -93,9 +97,11 @@ class DailyChart:
     async def tvl(self):
         """Total TVL chart broken down by hypervisor"""
         query = """
-        query hypervisorDaily($days: Int!){
+        query hypervisorDaily($days: Int!, $paginate: String!){
             uniswapV3Hypervisors(
                 first: 1000
+                orderBy: id
+                where: { id_gt: $paginate }
             ){
                 id
                 pool{
@@ -125,17 +131,20 @@ class DailyChart:
         }
         """
         variables = {"days": self.days}
-        response = await self.gamma_client.query(query, variables)
-        data = response["data"]["uniswapV3Hypervisors"]
 
-        df_all = pd.DataFrame()
-        for hypervisor in data:
-            df_hypervisor = pd.DataFrame(hypervisor["dayData"], dtype=np.float64)
-            df_hypervisor["hypervisor"] = hypervisor["id"]
-            df_hypervisor[
-                "name"
-            ] = f"{hypervisor['pool']['token0']['symbol']}-{hypervisor['pool']['token1']['symbol']}"
-            df_all = pd.concat([df_all, df_hypervisor])
+        # Build one frame per hypervisor as pages arrive and concat them once
+        frames = []
+        async for hypervisors in self.gamma_client.iter_entities(
+            query, variables=variables
+        ):
+            for hypervisor in hypervisors:
+                df_hypervisor = pd.DataFrame(hypervisor["dayData"], dtype=np.float64)
+                df_hypervisor["hypervisor"] = hypervisor["id"]
+                df_hypervisor[
+                    "name"
+                ] = f"{hypervisor['pool']['token0']['symbol']}-{hypervisor['pool']['token1']['symbol']}"
+                frames.append(df_hypervisor)
+        df_all = pd.concat(frames) if frames else pd.DataFrame()
 
         df_all.date = pd.to_datetime(df_all.date, unit="s").dt.strftime(
             "%Y-%m-%dT%H:%M:%SZ"
@@ -1,31 +1,36 @@
-from fastapi_cache.decorator import cache
 from v3data.bollingerbands import BollingerBand
 from v3data.charts.base_range import BaseLimit
+from v3data.cache_backend import cache, normalize_parameter
 from v3data.charts.benchmark import Benchmark
+from v3data.etag import tracks_source_blocks
 
 from v3data.config import CHARTS_CACHE_TIMEOUT
 from v3data.utils import parse_date
 
 
 @cache(expire=CHARTS_CACHE_TIMEOUT)
+@tracks_source_blocks
 async def bollingerbands_chart(protocol: str, chain: str, poolAddress: str, periodHours: int = 24):
+    periodHours = normalize_parameter("periodHours", periodHours)
     bband = BollingerBand(poolAddress, periodHours, protocol, chain=chain)
     return {"data": await bband.chart_data()}
 
 
-@cache(expire=CHARTS_CACHE_TIMEOUT)
+# Cached by the routes, as precompressed responses
+@tracks_source_blocks
 async def base_range_chart_all(protocol: str, chain: str, days: int = 20):
-    hours = days * 24
+    hours = normalize_parameter("days", days) * 24
     baseLimitData = BaseLimit(protocol=protocol, hours=hours, chart=True, chain=chain)
     chart_data = await baseLimitData.all_rebalance_ranges()
     return chart_data
 
 
 @cache(expire=CHARTS_CACHE_TIMEOUT)
+@tracks_source_blocks
 async def base_range_chart(
     protocol: str, chain: str, hypervisor_address: str, days: int = 20
 ):
-    hours = days * 24
+    hours = normalize_parameter("days", days) * 24
     hypervisor_address = hypervisor_address.lower()
     baseLimitData = BaseLimit(protocol=protocol, hours=hours, chart=True, chain=chain)
     chart_data = await baseLimitData.rebalance_ranges(hypervisor_address)
@@ -35,6 +40,7 @@ async def base_range_chart(
         return {}
 
 
+@tracks_source_blocks
 async def benchmark_chart(
     protocol: str,
     chain: str,
@@ -1,3 +1,5 @@
+from typing import Callable
+
 from fastapi import Response, status
 
 from v3data.hypervisor import HypervisorInfo
@@ -6,8 +8,12 @@ from v3data.hypes.fees import Fees
 from v3data.hypes.fees_yield import FeesYield
 from v3data.hype_fees.fees import fees_usd_all
 from v3data.hype_fees.fees_yield import fee_returns_all
+from v3data.hype_fees.snapshot_store import WINDOW_DAYS, fee_returns_windows
+from v3data.etag import tracks_source_blocks
+from v3data.prewarm import cache_result
 
 
+@tracks_source_blocks
 async def hypervisor_basic_stats(
     protocol: str, chain: str, hypervisor_address: str, response: Response
 ):
@@ -21,6 +27,7 @@ async def hypervisor_basic_stats(
         return "Invalid hypervisor address or not enough data"
 
 
+@tracks_source_blocks
 async def hypervisor_apy(
     protocol: str, chain: str, hypervisor_address, response: Response
 ):
@@ -34,6 +41,7 @@ async def hypervisor_apy(
         return "Invalid hypervisor address or not enough data"
 
 
+@tracks_source_blocks
 async def aggregate_stats(protocol: str, chain: str):
     top_level = TopLevelData(protocol, chain)
     top_level_data = await top_level.all_stats()
@@ -45,6 +53,7 @@ async def aggregate_stats(protocol: str, chain: str):
     }
 
 
+@tracks_source_blocks
 async def recent_fees(protocol: str, chain: str, hours: int = 24):
     top_level = TopLevelData(protocol, chain)
     recent_fees = await top_level.recent_fees(hours)
@@ -52,36 +61,54 @@ async def recent_fees(protocol: str, chain: str, hours: int = 24):
     return {"periodHours": hours, "fees": recent_fees}
 
 
+@tracks_source_blocks
 async def hypervisors_return(protocol: str, chain: str):
     hypervisor_info = HypervisorInfo(protocol, chain)
 
     return await hypervisor_info.all_returns()
 
 
+@tracks_source_blocks
 async def hypervisors_all(protocol: str, chain: str):
     hypervisor_info = HypervisorInfo(protocol, chain)
     return await hypervisor_info.all_data()
 
 
+@tracks_source_blocks
 async def uncollected_fees(protocol: str, chain: str, hypervisor_address: str):
     fees = Fees(protocol, chain)
     return await fees.output([hypervisor_address])
 
 
+@tracks_source_blocks
 async def uncollected_fees_all(protocol: str, chain: str):
     fees = Fees(protocol, chain)
     return await fees.output()
 
 
+@tracks_source_blocks
 async def uncollected_fees_all_fg(protocol: str, chain: str):
     return await fees_usd_all(protocol, chain)
 
 
+@tracks_source_blocks
 async def fee_returns(protocol: str, chain: str, days: int):
     fees_yield = FeesYield(days, protocol, chain)
     output = await fees_yield.get_fees_yield()
     return output
 
 
-async def fee_returns_fg(protocol: str, chain: str, days: int):
-    return await fee_returns_all(protocol, chain, days)
+@tracks_source_blocks
+async def fee_returns_fg(
+    protocol: str, chain: str, days: int, routes: dict[int, Callable] | None = None
+):
+    """Fee returns over days, caching those of the other windows under their
+    routes as they come from the same snapshots"""
+    if days not in WINDOW_DAYS:
+        return await fee_returns_all(protocol, chain, days)
+
+    returns = await fee_returns_windows(protocol, chain)
+    for window_days, route in (routes or {}).items():
+        if window_days != days:
+            await cache_result(route, returns[window_days])
+    return returns[days]
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 V3_FACTORY_ADDRESS = "0x1F98431c8aD98523631AE4a59f267346ea31F984"
 
@@ -218,6 +219,9 @@ XGAMMA_SUBGRAPH_URL = "https://api.thegraph.com/subgraphs/name/l0c4t0r/xgamma"
 
 
 TOKEN_LIST_URL = "https://tokens.coingecko.com/uniswap/all.json"
+TOKEN_LIST_REFRESH_SECONDS = int(os.environ.get("TOKEN_LIST_REFRESH_SECONDS", 3600))
+# Wait before retrying a failed refresh, serving the previous list meanwhile
+TOKEN_LIST_RETRY_SECONDS = int(os.environ.get("TOKEN_LIST_RETRY_SECONDS", 60))
 
 DEFAULT_BBAND_INTERVALS = 20
 DEFAULT_TIMEZONE = os.environ.get("TIMEZONE", "UTC-5")
@@ -227,6 +231,169 @@ APY_CACHE_TIMEOUT = os.environ.get("APY_CACHE_TIMEOUT", 600)
 DASHBOARD_CACHE_TIMEOUT = os.environ.get("DASHBOARD_CACHE_TIMEOUT", 600)
 ALLDATA_CACHE_TIMEOUT = os.environ.get("ALLDATA_CACHE_TIMEOUT", 120)
 
+# Token prices are served from memory for PRICE_CACHE_TTL seconds, then for up
+# to PRICE_CACHE_MAX_STALE more seconds while they are refreshed
+PRICE_CACHE_TTL = int(os.environ.get("PRICE_CACHE_TTL", 60))
+PRICE_CACHE_MAX_STALE = int(os.environ.get("PRICE_CACHE_MAX_STALE", 600))
+# Fallback prices from Coingecko are only kept briefly, and never served stale
+PRICE_CACHE_FALLBACK_TTL = int(os.environ.get("PRICE_CACHE_FALLBACK_TTL", 10))
+
+SUBGRAPH_PAGINATE_SHARDS = int(os.environ.get("SUBGRAPH_PAGINATE_SHARDS", 16))
+SUBGRAPH_PAGINATE_CONCURRENCY = int(
+    os.environ.get("SUBGRAPH_PAGINATE_CONCURRENCY", 4)
+)
+
+SUBGRAPH_BATCH_SIZE = int(os.environ.get("SUBGRAPH_BATCH_SIZE", 25))
+
+# Adaptive per-endpoint concurrency limit for subgraph requests
+SUBGRAPH_CONCURRENCY_INITIAL = int(os.environ.get("SUBGRAPH_CONCURRENCY_INITIAL", 8))
+SUBGRAPH_CONCURRENCY_MIN = int(os.environ.get("SUBGRAPH_CONCURRENCY_MIN", 1))
+SUBGRAPH_CONCURRENCY_MAX = int(os.environ.get("SUBGRAPH_CONCURRENCY_MAX", 32))
+SUBGRAPH_LATENCY_SPIKE_FACTOR = float(
+    os.environ.get("SUBGRAPH_LATENCY_SPIKE_FACTOR", 4)
+)
+
+# Hedge slow subgraph reads to another deployment of the same subgraph
+SUBGRAPH_HEDGE_ENABLED = {"true": True, "false": False}.get(
+    os.environ.get("SUBGRAPH_HEDGE_ENABLED", "false").lower(), False
+)
+SUBGRAPH_HEDGE_DEPLOYMENTS = os.environ.get(
+    "SUBGRAPH_HEDGE_DEPLOYMENTS", "prod,alt"
+).split(",")
+SUBGRAPH_HEDGE_PERCENTILE = float(os.environ.get("SUBGRAPH_HEDGE_PERCENTILE", 95))
+SUBGRAPH_HEDGE_MIN_DELAY = float(os.environ.get("SUBGRAPH_HEDGE_MIN_DELAY", 1))
+SUBGRAPH_HEDGE_MAX_BLOCK_LAG = int(os.environ.get("SUBGRAPH_HEDGE_MAX_BLOCK_LAG", 20))
+
+
+def _alternate_urls(*deployment_maps) -> dict[str, list[str]]:
+    """Map each subgraph URL to the other deployments of the same subgraph"""
+    alternates = {}
+    for deployments in deployment_maps:
+        urls = [
+            url
+            for name, url in deployments.items()
+            if name in SUBGRAPH_HEDGE_DEPLOYMENTS
+        ]
+        for url in urls:
+            alternates.setdefault(url, [])
+            alternates[url] += [
+                alternate
+                for alternate in urls
+                if alternate != url and alternate not in alternates[url]
+            ]
+    return {url: urls for url, urls in alternates.items() if urls}
+
+
+SUBGRAPH_ALTERNATE_URLS = _alternate_urls(
+    *uniswap_subgraphs.values(),
+    *uniswap_feegrowth_subgraphs.values(),
+    *quickswap_subgraphs.values(),
+    *gamma_subgraphs["uniswap_v3"].values(),
+    *gamma_subgraphs["quickswap"].values(),
+)
+
+CACHE_DIR = os.environ.get("CACHE_DIR", os.path.join(tempfile.gettempdir(), "v3data"))
+BLOCK_CACHE_ENABLED = {"true": True, "false": False}.get(
+    os.environ.get("BLOCK_CACHE_ENABLED", "true").lower(), True
+)
+BLOCK_CACHE_PATH = os.environ.get(
+    "BLOCK_CACHE_PATH", os.path.join(CACHE_DIR, "block_cache.sqlite")
+)
+# Oldest responses are evicted past this size
+BLOCK_CACHE_MAX_MB = int(os.environ.get("BLOCK_CACHE_MAX_MB", 1024))
+
+# Response cache shared by gunicorn workers, "sqlite" or per worker "memory"
+RESPONSE_CACHE_BACKEND = os.environ.get("RESPONSE_CACHE_BACKEND", "sqlite").lower()
+RESPONSE_CACHE_PATH = os.environ.get(
+    "RESPONSE_CACHE_PATH",
+    os.path.join(
+        "/dev/shm" if os.path.isdir("/dev/shm") else CACHE_DIR,
+        "v3data-response-cache.sqlite",
+    ),
+)
+RESPONSE_CACHE_MAX_BYTES = int(
+    os.environ.get("RESPONSE_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+)
+
+# Recompute slow cached routes in the background, every PREWARM_TTL_FRACTION
+# of their cache TTL
+PREWARM_ENABLED = {"true": True, "false": False}.get(
+    os.environ.get("PREWARM_ENABLED", "true").lower(), True
+)
+PREWARM_TTL_FRACTION = float(os.environ.get("PREWARM_TTL_FRACTION", 0.8))
+PREWARM_CONCURRENCY = int(os.environ.get("PREWARM_CONCURRENCY", 2))
+
+# Cached responses stay valid until the subgraph head of their chain advances
+# HEAD_ADVANCE_BLOCKS past the head they were computed at, for at most
+# HEAD_CACHE_TTL_FACTOR times their TTL. Heads are polled every
+# HEAD_WATCH_INTERVAL seconds.
+HEAD_WATCH_ENABLED = {"true": True, "false": False}.get(
+    os.environ.get("HEAD_WATCH_ENABLED", "true").lower(), True
+)
+HEAD_WATCH_INTERVAL = int(os.environ.get("HEAD_WATCH_INTERVAL", 15))
+HEAD_CACHE_TTL_FACTOR = int(os.environ.get("HEAD_CACHE_TTL_FACTOR", 6))
+# About five minutes of blocks on each chain
+HEAD_ADVANCE_BLOCKS = {
+    "mainnet": int(os.environ.get("HEAD_ADVANCE_BLOCKS_MAINNET", 25)),
+    "polygon": int(os.environ.get("HEAD_ADVANCE_BLOCKS_POLYGON", 150)),
+    "arbitrum": int(os.environ.get("HEAD_ADVANCE_BLOCKS_ARBITRUM", 1200)),
+    "optimism": int(os.environ.get("HEAD_ADVANCE_BLOCKS_OPTIMISM", 150)),
+    "celo": int(os.environ.get("HEAD_ADVANCE_BLOCKS_CELO", 60)),
+}
+
+# Local timestamp -> block index, remote lookups only for gaps wider than this
+BLOCK_INDEX_PATH = os.environ.get(
+    "BLOCK_INDEX_PATH", os.path.join(CACHE_DIR, "block_index.sqlite")
+)
+BLOCK_INDEX_MAX_GAP_SECONDS = int(os.environ.get("BLOCK_INDEX_MAX_GAP_SECONDS", 3600))
+# Observations older than this are dropped from the index
+BLOCK_INDEX_RETENTION_DAYS = int(os.environ.get("BLOCK_INDEX_RETENTION_DAYS", 90))
+
+# Fee returns over 1, 7 and 30 days from a persistent per hypervisor snapshot
+# log, extended with new subgraph snapshots only
+FEE_SNAPSHOT_STORE_ENABLED = {"true": True, "false": False}.get(
+    os.environ.get("FEE_SNAPSHOT_STORE_ENABLED", "true").lower(), True
+)
+FEE_SNAPSHOT_STORE_PATH = os.environ.get(
+    "FEE_SNAPSHOT_STORE_PATH", os.path.join(CACHE_DIR, "fee_snapshots.sqlite")
+)
+
+# Record subgraph responses to fixtures, or replay them from v3data.replay
+SUBGRAPH_FIXTURE_DIR = os.environ.get(
+    "SUBGRAPH_FIXTURE_DIR", os.path.join(CACHE_DIR, "fixtures")
+)
+SUBGRAPH_RECORD = {"true": True, "false": False}.get(
+    os.environ.get("SUBGRAPH_RECORD", "false").lower(), False
+)
+SUBGRAPH_REPLAY_URL = os.environ.get("SUBGRAPH_REPLAY_URL", "").rstrip("/")
+REPLAY_LATENCY_MS = float(os.environ.get("REPLAY_LATENCY_MS", 0))
+REPLAY_JITTER_MS = float(os.environ.get("REPLAY_JITTER_MS", 0))
+
+
+def _replay_urls(urls):
+    """Point The Graph URLs at the replay server, keeping their paths"""
+    if isinstance(urls, dict):
+        return {
+            (_replay_urls(key) if key.startswith("http") else key): _replay_urls(value)
+            for key, value in urls.items()
+        }
+    if isinstance(urls, list):
+        return [_replay_urls(url) for url in urls]
+    return urls.replace("https://api.thegraph.com", SUBGRAPH_REPLAY_URL)
+
+
+if SUBGRAPH_REPLAY_URL:
+    THEGRAPH_INDEX_NODE_URL = _replay_urls(THEGRAPH_INDEX_NODE_URL)
+    ETH_BLOCKS_SUBGRAPH_URL = _replay_urls(ETH_BLOCKS_SUBGRAPH_URL)
+    UNI_V2_SUBGRAPH_URL = _replay_urls(UNI_V2_SUBGRAPH_URL)
+    VISOR_SUBGRAPH_URL = _replay_urls(VISOR_SUBGRAPH_URL)
+    XGAMMA_SUBGRAPH_URL = _replay_urls(XGAMMA_SUBGRAPH_URL)
+    DEX_SUBGRAPH_URLS = _replay_urls(DEX_SUBGRAPH_URLS)
+    DEX_FEEGROWTH_SUBGRAPH_URLS = _replay_urls(DEX_FEEGROWTH_SUBGRAPH_URLS)
+    DEX_HYPEPOOL_SUBGRAPH_URLS = _replay_urls(DEX_HYPEPOOL_SUBGRAPH_URLS)
+    GAMMA_SUBGRAPH_URLS = _replay_urls(GAMMA_SUBGRAPH_URLS)
+    SUBGRAPH_ALTERNATE_URLS = _replay_urls(SUBGRAPH_ALTERNATE_URLS)
+
 EXCLUDED_HYPERVISORS = list(
     filter(None, os.environ.get("EXCLUDED_HYPES", "").split(","))
 )
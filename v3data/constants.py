@@ -24,5 +24,16 @@ BLOCK_TIME_SECONDS = {
     "celo": 5
 }
 
+# Blocks behind the subgraph head after which a block is treated as final
+BLOCK_FINALITY_DEPTH = {
+    "mainnet": 64,
+    "polygon": 256,
+    "optimism": 64,
+    "arbitrum": 64,
+    "celo": 64
+}
+# Unconfigured chains wait longer than any configured one
+DEFAULT_BLOCK_FINALITY_DEPTH = 1024
+
 PROTOCOL_UNISWAP_V3 = "uniswap_v3"
 PROTOCOL_QUICKSWAP = "quickswap"
@@ -201,6 +201,7 @@ class Dashboard:
             "uniswapFeesGenerated": top_level_data["fees_claimed"],
             "uniswapFeesBasedApr": f"{top_level_returns[self.period]['feeApr']:.0%}",
             "gammaPrice": gamma_price_usd,
+            "gammaPriceAge": gamma_prices["age"],
             "gammaInEth": gamma_in_eth,
             "gammaPerXgamma": rewards_info["gamma_per_xgamma"],
             "id": 2,
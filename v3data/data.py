@@ -1,32 +1,17 @@
 import asyncio
-import requests
 import datetime
 import numpy as np
 import pandas as pd
 
 from v3data import SubgraphClient
 from v3data.utils import sqrtPriceX96_to_priceDecimal
-from v3data.config import DEX_SUBGRAPH_URLS, TOKEN_LIST_URL
+from v3data.config import DEX_SUBGRAPH_URLS
 
 
 class UniV3Data(SubgraphClient):
     def __init__(self, protocol: str, chain: str):
         super().__init__(DEX_SUBGRAPH_URLS[protocol][chain])
 
-    def get_token_list(self):
-        response = requests.get(TOKEN_LIST_URL)
-        token_list = response.json()["tokens"]
-
-        token_addresses = {}
-        for token in token_list:
-            symbol = token["symbol"]
-            if token_addresses.get(symbol):
-                token_addresses[symbol].append(token["address"])
-            else:
-                token_addresses[symbol] = [token["address"]]
-
-        return token_addresses
-
     async def get_pools_by_tokens(self, token_addresses):
         query0 = """
         query whitelistPools($ids: [String!]!)
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import time
+from contextvars import ContextVar
+from email.utils import formatdate
+from functools import wraps
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi_cache.coder import JsonCoder, JsonEncoder, object_hook
+
+
+class SourceBlocks:
+    """Subgraph blocks the data of a response was computed from"""
+
+    def __init__(
+        self,
+        blocks: dict[str, int] | None = None,
+        pending: list[str] | None = None,
+        modified: float = 0.0,
+    ):
+        self.blocks = dict(blocks or {})
+        # Subgraphs whose responses did not tell the block they were served at
+        self.pending = set(pending or [])
+        self.modified = modified
+
+    def record(self, url: str, block: int | None = None) -> None:
+        if block is None:
+            self.pending.add(url)
+        else:
+            self.blocks[url] = max(int(block), self.blocks.get(url, 0))
+
+    def merge(self, other: "SourceBlocks") -> None:
+        for url, block in other.blocks.items():
+            self.record(url, block)
+        self.pending |= other.pending
+        self.modified = max(self.modified, other.modified)
+
+    def stamp(self) -> None:
+        """Note the time the data was computed, unless already noted"""
+        if not self.modified:
+            self.modified = time.time()
+
+    def etag(self) -> str | None:
+        """Tag of the blocks the data was served at, None when any subgraph
+        did not tell its block, as the data could then change untagged"""
+        if not self.blocks or self.pending:
+            return None
+        blocks = json.dumps(sorted(self.blocks.items()))
+        return f'"{hashlib.sha256(blocks.encode()).hexdigest()[:32]}"'
+
+    def last_modified(self) -> str | None:
+        if self.etag() is None or not self.modified:
+            return None
+        return formatdate(self.modified, usegmt=True)
+
+    def to_dict(self) -> dict:
+        return {
+            "blocks": self.blocks,
+            "pending": sorted(self.pending),
+            "modified": self.modified,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SourceBlocks":
+        return cls(data["blocks"], data["pending"], data["modified"])
+
+
+# Source blocks of the API request being served, or the prewarm in progress
+source_blocks: ContextVar[SourceBlocks | None] = ContextVar(
+    "source_blocks", default=None
+)
+
+
+def record_source(url: str, block: int | None = None) -> None:
+    """Note that the current request used data of the subgraph at url"""
+    sources = source_blocks.get()
+    if sources is not None:
+        sources.record(url, block)
+
+
+def tracks_source_blocks(func):
+    """Collect the blocks behind func's result before it returns, so that a
+    @cache decorator above stores them with the result"""
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = None
+        if source_blocks.get() is None:
+            token = source_blocks.set(SourceBlocks())
+        try:
+            result = await func(*args, **kwargs)
+            source_blocks.get().stamp()
+            return result
+        finally:
+            if token:
+                source_blocks.reset(token)
+
+    return wrapper
+
+
+class SourceBlocksJsonCoder(JsonCoder):
+    """JSON coder keeping the source blocks of a cached value with it, and
+    adding them to those of the request on cache hits"""
+
+    @classmethod
+    def encode(cls, value: Any) -> str:
+        sources = source_blocks.get()
+        return json.dumps(
+            {"sources": sources.to_dict() if sources else None, "value": value},
+            cls=JsonEncoder,
+        )
+
+    @classmethod
+    def decode(cls, value: Any) -> Any:
+        data = json.loads(value, object_hook=object_hook)
+        merge_sources(data["sources"])
+        return data["value"]
+
+
+def merge_sources(data: dict | None) -> None:
+    """Add source blocks stored with a cached value to those of the request"""
+    sources = source_blocks.get()
+    if sources is not None and data is not None:
+        sources.merge(SourceBlocks.from_dict(data))
+
+
+async def conditional_response(
+    request: Request, response: Response, sources: SourceBlocks
+) -> Response:
+    """Tag a successful GET response with the blocks it was computed from, or
+    answer 304 Not Modified when the client already holds that version,
+    comparing tags weakly"""
+    if request.method != "GET" or response.status_code != 200:
+        return response
+
+    sources.stamp()
+    etag = sources.etag()
+    if etag is None:
+        return response
+
+    # Weak, as the gzip, br and identity bodies of a version share the tag
+    headers = {"ETag": f"W/{etag}", "Last-Modified": sources.last_modified()}
+    if etag in _if_none_match(request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
+
+
+def _if_none_match(header: str) -> set[str]:
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import logging
+import os
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Cursor variables of SubgraphClient pagination
+PAGINATION_VARIABLES = ("paginate", "paginateEnd")
+
+
+class FixtureStore:
+    """Recorded subgraph responses, one JSON file per (url, query, variables)
+
+    Fixtures are keyed on the URL path rather than the full URL, so responses
+    recorded against The Graph can be replayed from any host. Queries built
+    from the current time never repeat their variables exactly, so lookups
+    fall back to the latest recording of the same query with any variables,
+    except for the pagination cursors, which must match.
+
+    The fixture directory is indexed once on creation, so lookups never list
+    or stat files. Fixtures written by other processes afterwards are not seen.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # Fixture file names by query key, latest recording first
+        self._index: dict[str, list[str]] = {}
+        self._build_index()
+
+    def _build_index(self) -> None:
+        try:
+            entries = [
+                entry
+                for entry in os.scandir(self.path)
+                if entry.is_file() and entry.name.endswith(".json")
+            ]
+        except OSError:
+            return
+
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            query_key = entry.name.split("-", 1)[0]
+            self._index.setdefault(query_key, []).insert(0, entry.name)
+
+    @staticmethod
+    def _digest(*parts: str) -> str:
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:24]
+
+    def _keys(self, url: str, query: str, variables) -> tuple[str, str]:
+        path = httpx.URL(url).path
+        query = " ".join(query.split())
+        # Pages of a paginated query only stand in for the same page
+        cursors = {
+            name: value
+            for name, value in (variables or {}).items()
+            if name in PAGINATION_VARIABLES
+        }
+        query_key = self._digest(path, query, json.dumps(cursors, sort_keys=True))
+        exact_key = self._digest(path, query, json.dumps(variables, sort_keys=True))
+        return query_key, exact_key
+
+    def save(self, url: str, query: str, variables, content: bytes) -> None:
+        query_key, exact_key = self._keys(url, query, variables)
+        fixture = {
+            "url": url,
+            "query": query,
+            "variables": variables,
+            "response": json.loads(content),
+        }
+        name = f"{query_key}-{exact_key}.json"
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with open(os.path.join(self.path, name), "w") as f:
+                json.dump(fixture, f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to record fixture for {url}: {e}")
+            return
+
+        names = self._index.setdefault(query_key, [])
+        if name in names:
+            names.remove(name)
+        names.insert(0, name)
+
+    def load(self, url: str, query: str, variables) -> dict | None:
+        query_key, exact_key = self._keys(url, query, variables)
+        names = self._index.get(query_key)
+        if not names:
+            return None
+
+        exact_name = f"{query_key}-{exact_key}.json"
+        name = exact_name if exact_name in names else names[0]
+        with open(os.path.join(self.path, name)) as f:
+            return json.load(f)["response"]
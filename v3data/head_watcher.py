@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import time
+
+from v3data import IndexNodeClient
+from v3data.config import (
+    DEX_FEEGROWTH_SUBGRAPH_URLS,
+    DEX_HYPEPOOL_SUBGRAPH_URLS,
+    DEX_SUBGRAPH_URLS,
+    GAMMA_SUBGRAPH_URLS,
+    HEAD_ADVANCE_BLOCKS,
+    HEAD_WATCH_INTERVAL,
+)
+from v3data.etag import source_blocks
+
+logger = logging.getLogger(__name__)
+
+# Heads not updated for this many intervals are considered unknown
+HEAD_MAX_MISSED_POLLS = 4
+
+
+def subgraph_chains() -> dict[str, str]:
+    """Chain of every configured subgraph URL"""
+    chains = {}
+    for urls in [
+        DEX_SUBGRAPH_URLS,
+        DEX_FEEGROWTH_SUBGRAPH_URLS,
+        DEX_HYPEPOOL_SUBGRAPH_URLS,
+        GAMMA_SUBGRAPH_URLS,
+    ]:
+        for protocol_urls in urls.values():
+            for chain, url in protocol_urls.items():
+                chains[url] = chain
+    return chains
+
+
+class HeadWatcher:
+    """Follow the latest block indexed by the Gamma subgraphs of each chain
+
+    Response cache entries are tagged with the heads of the chains their data
+    came from, and are current until one of those heads advances
+    HEAD_ADVANCE_BLOCKS past its tag.
+    """
+
+    def __init__(self, interval: int = HEAD_WATCH_INTERVAL):
+        self.interval = interval
+        self.heads: dict[str, int] = {}
+        self._updated_at: dict[str, float] = {}
+        self._chains = subgraph_chains()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.poll()
+            await asyncio.sleep(self.interval)
+
+    async def poll(self) -> None:
+        subgraphs = [
+            (protocol, chain)
+            for protocol, urls in GAMMA_SUBGRAPH_URLS.items()
+            for chain in urls
+        ]
+        statuses = await asyncio.gather(
+            *[
+                IndexNodeClient(protocol, chain).status()
+                for protocol, chain in subgraphs
+            ],
+            return_exceptions=True,
+        )
+        for (protocol, chain), status in zip(subgraphs, statuses):
+            if isinstance(status, Exception):
+                logger.warning(f"Head of {protocol} {chain} subgraph: {status}")
+                continue
+            self.observe(chain, status["latestBlock"])
+
+    def observe(self, chain: str, block: int) -> None:
+        self.heads[chain] = max(block, self.heads.get(chain, 0))
+        self._updated_at[chain] = time.monotonic()
+
+    def head(self, chain: str) -> int | None:
+        updated_at = self._updated_at.get(chain)
+        if updated_at is None:
+            return None
+        if time.monotonic() - updated_at > self.interval * HEAD_MAX_MISSED_POLLS:
+            return None
+        return self.heads[chain]
+
+    def tags(self) -> dict[str, int]:
+        """Current heads of the chains the data being computed came from"""
+        sources = source_blocks.get()
+        if sources is None:
+            return {}
+
+        tags = {}
+        for url in set(sources.blocks) | sources.pending:
+            chain = self._chains.get(url)
+            head = self.head(chain) if chain else None
+            if head is not None:
+                tags[chain] = head
+        return tags
+
+    def advanced(self, tags: dict[str, int]) -> bool | None:
+        """Whether a head advanced past its threshold since tags were taken,
+        or None when a head is unknown"""
+        advanced = False
+        for chain, tag in tags.items():
+            head = self.head(chain)
+            if head is None:
+                return None
+            if head - tag >= HEAD_ADVANCE_BLOCKS.get(chain, 1):
+                advanced = True
+        return advanced
+
+    def is_current(self, tags: dict[str, int], stale_at: float) -> bool:
+        """Whether a cache entry with tags, otherwise stale from stale_at on,
+        can still be served"""
+        advanced = self.advanced(tags) if tags else None
+        if advanced is None:
+            return time.time() < stale_at
+        return not advanced
+
+
+head_watcher = HeadWatcher()
@@ -0,0 +1,37 @@
+from collections import deque
+
+from v3data.config import SUBGRAPH_HEDGE_MIN_DELAY, SUBGRAPH_HEDGE_PERCENTILE
+
+LATENCY_WINDOW = 200
+MIN_SAMPLES = 20
+
+
+class LatencyTracker:
+    """Recent response latencies per endpoint, used to decide when to hedge"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: dict[str, deque] = {}
+
+    def record(self, url: str, seconds: float) -> None:
+        if url not in self._samples:
+            self._samples[url] = deque(maxlen=self.window)
+        self._samples[url].append(seconds)
+
+    def percentile(self, url: str, percentile: float) -> float | None:
+        samples = sorted(self._samples.get(url, []))
+        if len(samples) < MIN_SAMPLES:
+            return None
+        index = min(int(len(samples) * percentile / 100), len(samples) - 1)
+        return samples[index]
+
+    def hedge_delay(self, url: str) -> float:
+        """Seconds to wait for the primary before sending a hedged request"""
+        latency = self.percentile(url, SUBGRAPH_HEDGE_PERCENTILE)
+        if latency is None:
+            # Not enough history yet, only hedge clear stalls
+            return SUBGRAPH_HEDGE_MIN_DELAY * 10
+        return max(latency, SUBGRAPH_HEDGE_MIN_DELAY)
+
+
+latencies = LatencyTracker()
@@ -1,18 +1,144 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
 
-from v3data import HypePoolClient, LlamaClient
+from v3data import HypePoolClient
+from v3data.blocks import block_from_timestamp, block_index
 from v3data.constants import BLOCK_TIME_SECONDS, DAY_SECONDS
 from v3data.hype_fees.schema import (
-    FeesData,
+    FeesDataColumns,
+    FeesDataRow,
     HypervisorStaticInfo,
     Time,
-    _PositionData,
-    _TickData,
     _TokenPair,
-    _TokenPairDecimals,
 )
 from v3data.utils import estimate_block_from_timestamp_diff
 
+# Numeric strings of the snapshot query, converted while the response streams
+SNAPSHOT_CONVERTERS = {
+    **dict.fromkeys(
+        [
+            "number",
+            "timestamp",
+            "blockNumber",
+            "decimals",
+            "currentTick",
+            "tick",
+            "tickIdx",
+            "tvl0",
+            "tvl1",
+            "liquidity",
+            "tokensOwed0",
+            "tokensOwed1",
+            "feeGrowthGlobal0X128",
+            "feeGrowthGlobal1X128",
+            "feeGrowthInside0X128",
+            "feeGrowthInside1X128",
+            "feeGrowthOutside0X128",
+            "feeGrowthOutside1X128",
+        ],
+        int,
+    ),
+    **dict.fromkeys(["priceUSD", "price0", "price1", "tvlUSD"], float),
+}
+
+
+# Snapshots of one hypervisor per page of the snapshot queries
+SNAPSHOT_PAGE_SIZE = 1000
+# Selection of the feeSnapshots of the snapshot queries
+FEE_SNAPSHOT_FIELDS = """{
+    blockNumber
+    timestamp
+    currentBlock {
+        tick
+        feeGrowthGlobal0X128
+        feeGrowthGlobal1X128
+        price0
+        price1
+        tvl0
+        tvl1
+        tvlUSD
+        basePosition {
+            liquidity
+            tokensOwed0
+            tokensOwed1
+            feeGrowthInside0X128
+            feeGrowthInside1X128
+            tickLower {
+                tickIdx
+                feeGrowthOutside0X128
+                feeGrowthOutside1X128
+            }
+            tickUpper {
+                tickIdx
+                feeGrowthOutside0X128
+                feeGrowthOutside1X128
+            }
+        }
+        limitPosition {
+            liquidity
+            tokensOwed0
+            tokensOwed1
+            feeGrowthInside0X128
+            feeGrowthInside1X128
+            tickLower {
+                tickIdx
+                feeGrowthOutside0X128
+                feeGrowthOutside1X128
+            }
+            tickUpper {
+                tickIdx
+                feeGrowthOutside0X128
+                feeGrowthOutside1X128
+            }
+        }
+    }
+    previousBlock {
+        tick
+        feeGrowthGlobal0X128
+        feeGrowthGlobal1X128
+        price0
+        price1
+        tvl0
+        tvl1
+        tvlUSD
+        basePosition {
+            liquidity
+            tokensOwed0
+            tokensOwed1
+            feeGrowthInside0X128
+            feeGrowthInside1X128
+            tickLower {
+                tickIdx
+                feeGrowthOutside0X128
+                feeGrowthOutside1X128
+            }
+            tickUpper {
+                tickIdx
+                feeGrowthOutside0X128
+                feeGrowthOutside1X128
+            }
+        }
+        limitPosition {
+            liquidity
+            tokensOwed0
+            tokensOwed1
+            feeGrowthInside0X128
+            feeGrowthInside1X128
+            tickLower {
+                tickIdx
+                feeGrowthOutside0X128
+                feeGrowthOutside1X128
+            }
+            tickUpper {
+                tickIdx
+                feeGrowthOutside0X128
+                feeGrowthOutside1X128
+            }
+        }
+    }
+}"""
+
 
 class FeeGrowthDataABC(ABC):
     def __init__(self, protocol: str, chain: str) -> None:
@@ -20,6 +146,8 @@ class FeeGrowthDataABC(ABC):
         self.chain = chain
         self.fee_growth_client = HypePoolClient(protocol, chain)
         self.data = {}
+        # Backing store of the FeesDataRow views in data
+        self.columns = FeesDataColumns()
         self._static_data = {}
 
     @abstractmethod
@@ -37,68 +165,38 @@ class FeeGrowthDataABC(ABC):
         price_1: float,
         fee_growth_global_0: int,
         fee_growth_global_1: int,
-    ) -> FeesData:
-        return FeesData(
-            hypervisor=hypervisor_id,
-            symbol=self._static_data[hypervisor_id].symbol,
-            block=block,  # set to block
-            timestamp=timestamp,  # set to timestamp
-            currentTick=current_tick,
-            price=_TokenPairDecimals(price_0, price_1),
-            decimals=_TokenPair(
-                self._static_data[hypervisor_id].decimals.value0,
-                self._static_data[hypervisor_id].decimals.value1,
-            ),
-            tvl=_TokenPair(hypervisor["tvl0"], hypervisor["tvl1"]),
-            tvl_usd=hypervisor["tvlUSD"],
-            fee_growth_global=_TokenPair(fee_growth_global_0, fee_growth_global_1),
-            base_position=self._init_position_data(hypervisor, "basePosition"),
-            limit_position=self._init_position_data(hypervisor, "limitPosition"),
+    ) -> FeesDataRow:
+        return self.columns.append(
+            hypervisor=hypervisor,
+            hypervisor_id=hypervisor_id,
+            static_info=self._static_data[hypervisor_id],
+            block=block,
+            timestamp=timestamp,
+            current_tick=current_tick,
+            price_0=price_0,
+            price_1=price_1,
+            fee_growth_global_0=fee_growth_global_0,
+            fee_growth_global_1=fee_growth_global_1,
         )
 
-    def _init_position_data(
-        self, hypervisor: dict, position_type: str
-    ) -> _PositionData:
-        return _PositionData(
-            liquidity=hypervisor[position_type]["liquidity"],
-            tokens_owed=_TokenPair(
-                hypervisor[position_type]["tokensOwed0"],
-                hypervisor[position_type]["tokensOwed1"],
-            ),
-            fee_growth_inside=_TokenPair(
-                hypervisor[position_type]["feeGrowthInside0X128"],
-                hypervisor[position_type]["feeGrowthInside1X128"],
-            ),
-            tick_lower=self._init_tick_data(hypervisor, position_type, "tickLower"),
-            tick_upper=self._init_tick_data(hypervisor, position_type, "tickUpper"),
-        )
+    def _extract_static_data(self, hypervisor_static_data: dict) -> None:
+        self._static_data = {}
+        for hypervisor in hypervisor_static_data:
+            self._add_static_data(hypervisor)
 
-    def _init_tick_data(
-        self, hypervisor: dict, position_type: str, tick_type: str
-    ) -> _TickData:
-        return _TickData(
-            tick_index=hypervisor[position_type][tick_type]["tickIdx"],
-            fee_growth_outside=_TokenPair(
-                hypervisor[position_type][tick_type]["feeGrowthOutside0X128"],
-                hypervisor[position_type][tick_type]["feeGrowthOutside1X128"],
+    def _add_static_data(self, hypervisor: dict) -> None:
+        self._static_data[hypervisor["id"]] = HypervisorStaticInfo(
+            symbol=hypervisor["symbol"],
+            decimals=_TokenPair(
+                hypervisor["pool"]["token0"]["decimals"],
+                hypervisor["pool"]["token1"]["decimals"],
             ),
         )
 
-    def _extract_static_data(self, hypervisor_static_data: dict) -> None:
-        self._static_data = {
-            hypervisor["id"]: HypervisorStaticInfo(
-                symbol=hypervisor["symbol"],
-                decimals=_TokenPair(
-                    hypervisor["pool"]["token0"]["decimals"],
-                    hypervisor["pool"]["token1"]["decimals"],
-                ),
-            )
-            for hypervisor in hypervisor_static_data
-        }
-
 
 class FeeGrowthData(FeeGrowthDataABC):
     async def get_data(self) -> None:
+        self.columns = FeesDataColumns()
         self.data = self._transform_data(await self._query_data())
 
     async def _query_data(self) -> dict:
@@ -179,7 +277,7 @@ class FeeGrowthData(FeeGrowthDataABC):
         response = await self.fee_growth_client.query(query)
         return response["data"]
 
-    def _transform_data(self, query_data) -> dict[str, FeesData]:
+    def _transform_data(self, query_data) -> dict[str, FeesDataRow]:
         self._extract_static_data(query_data["static"])
         return {
             hypervisor["id"]: self._init_fees_data(
@@ -207,24 +305,45 @@ class FeeGrowthSnapshotData(FeeGrowthDataABC):
         chain: str,
     ) -> None:
         self.period_days = period_days
-        self.llama_client = LlamaClient(chain)
         super().__init__(protocol, chain)
 
     async def get_data(self) -> None:
         """Query data and tranfrom to FeesData Class"""
         await self._init_start_time()
-        self.data = self._transform_data(await self._query_data())
+
+        # Transform entities as the response streams in rather than decoding
+        # the full multi-megabyte response first
+        transformed_data = {}
+        self.columns = FeesDataColumns()
+        self._static_data = {}
+        self._meta = {}
+        # Block after which each hypervisor has another page of snapshots
+        self._next_pages = {}
+        async for field, entity in self._query_data():
+            self._transform_entity(transformed_data, field, entity)
+        self.data = transformed_data
+
+        # Page through the snapshots of hypervisors with more than one page
+        async def query_pages(hypervisor_id: str) -> None:
+            while hypervisor_id in self._next_pages:
+                block_after = self._next_pages.pop(hypervisor_id)
+                async for field, entity in self._query_snapshot_page(
+                    hypervisor_id, block_after
+                ):
+                    self._transform_entity(self.data, field, entity)
+
+        await asyncio.gather(
+            *[query_pages(hypervisor_id) for hypervisor_id in list(self._next_pages)]
+        )
 
     async def _init_start_time(self) -> None:
         self.end_time = await self._query_current_time()
 
         timestamp_start = self.end_time.timestamp - (self.period_days * DAY_SECONDS)
-        response = await self.llama_client.block_from_timestamp(timestamp_start, True)
+        initial_time = await block_from_timestamp(self.chain, timestamp_start)
 
-        if response:
-            self.initial_time = Time(
-                block=response["height"], timestamp=response["timestamp"]
-            )
+        if initial_time:
+            self.initial_time = initial_time
         else:
             # Estimate start time if not found
             self.initial_time = Time(
@@ -258,20 +377,31 @@ class FeeGrowthSnapshotData(FeeGrowthDataABC):
 
         response = await self.fee_growth_client.query(query)
 
-        return Time(
+        current_time = Time(
             block=response["data"]["_meta"]["block"]["number"],
             timestamp=response["data"]["_meta"]["block"]["timestamp"],
         )
+        block_index.observe(self.chain, [(current_time.block, current_time.timestamp)])
+        return current_time
 
-    async def _query_data(self) -> dict:
+    async def _query_data(self) -> AsyncIterator[tuple[str, dict]]:
+        """Stream (field, entity) pairs of the snapshot query, with _meta first
+        as rows of the other fields depend on it"""
         query = """
         query Snapshots(
             $blockStart: Int!
             $timestampStart: Int!
             $blockEnd: Int!
             $timestampEnd: Int!
+            $pageSize: Int!
         ) {
-            static: hypervisors(block: {number: $blockEnd}) {
+            _meta {
+                block {
+                number
+                timestamp
+                }
+            }
+            static: hypervisors(first: 1000, block: {number: $blockEnd}) {
                 id
                 symbol
                 pool {
@@ -285,7 +415,7 @@ class FeeGrowthSnapshotData(FeeGrowthDataABC):
                     }
                 }
             }
-            latest: hypervisors(block: {number: $blockEnd}) {
+            latest: hypervisors(first: 1000, block: {number: $blockEnd}) {
                 id
                 tvl0
                 tvl1
@@ -336,7 +466,7 @@ class FeeGrowthSnapshotData(FeeGrowthDataABC):
                     }
                 }
             }
-            initial: hypervisors(block: {number: $blockStart}) {
+            initial: hypervisors(first: 1000, block: {number: $blockStart}) {
                 id
                 tvl0
                 tvl1
@@ -387,182 +517,97 @@ class FeeGrowthSnapshotData(FeeGrowthDataABC):
                     }
                 }
             }
-            snapshots: hypervisors {
+            snapshots: hypervisors(first: 1000) {
                 id
                 feeSnapshots(
+                    first: $pageSize
+                    orderBy: blockNumber
+                    orderDirection: asc
                     where: {
                         timestamp_gte: $timestampStart
                         timestamp_lte: $timestampEnd
                     }
-                ) {
-                    blockNumber
-                    timestamp
-                    currentBlock {
-                        tick
-                        feeGrowthGlobal0X128
-                        feeGrowthGlobal1X128
-                        price0
-                        price1
-                        tvl0
-                        tvl1
-                        tvlUSD
-                        basePosition {
-                            liquidity
-                            tokensOwed0
-                            tokensOwed1
-                            feeGrowthInside0X128
-                            feeGrowthInside1X128
-                            tickLower {
-                                tickIdx
-                                feeGrowthOutside0X128
-                                feeGrowthOutside1X128
-                            }
-                            tickUpper {
-                                tickIdx
-                                feeGrowthOutside0X128
-                                feeGrowthOutside1X128
-                            }
-                        }
-                        limitPosition {
-                            liquidity
-                            tokensOwed0
-                            tokensOwed1
-                            feeGrowthInside0X128
-                            feeGrowthInside1X128
-                            tickLower {
-                                tickIdx
-                                feeGrowthOutside0X128
-                                feeGrowthOutside1X128
-                            }
-                            tickUpper {
-                                tickIdx
-                                feeGrowthOutside0X128
-                                feeGrowthOutside1X128
-                            }
-                        }
-                    }
-                    previousBlock {
-                        tick
-                        feeGrowthGlobal0X128
-                        feeGrowthGlobal1X128
-                        price0
-                        price1
-                        tvl0
-                        tvl1
-                        tvlUSD
-                        basePosition {
-                            liquidity
-                            tokensOwed0
-                            tokensOwed1
-                            feeGrowthInside0X128
-                            feeGrowthInside1X128
-                            tickLower {
-                                tickIdx
-                                feeGrowthOutside0X128
-                                feeGrowthOutside1X128
-                            }
-                            tickUpper {
-                                tickIdx
-                                feeGrowthOutside0X128
-                                feeGrowthOutside1X128
-                            }
-                        }
-                        limitPosition {
-                            liquidity
-                            tokensOwed0
-                            tokensOwed1
-                            feeGrowthInside0X128
-                            feeGrowthInside1X128
-                            tickLower {
-                                tickIdx
-                                feeGrowthOutside0X128
-                                feeGrowthOutside1X128
-                            }
-                            tickUpper {
-                                tickIdx
-                                feeGrowthOutside0X128
-                                feeGrowthOutside1X128
-                            }
-                        }
-                    }
-                }
-            }
-            _meta {
-                block {
-                number
-                timestamp
-                }
+                ) FEE_SNAPSHOT_FIELDS
             }
         }
-        """
+        """.replace("FEE_SNAPSHOT_FIELDS", FEE_SNAPSHOT_FIELDS)
 
         variables = {
             "blockStart": self.initial_time.block,
             "timestampStart": self.initial_time.timestamp,
             "blockEnd": self.end_time.block,
             "timestampEnd": self.end_time.timestamp,
+            "pageSize": SNAPSHOT_PAGE_SIZE,
         }
 
-        response = await self.fee_growth_client.query(query, variables)
-        return response["data"]
+        async for field, entity in self.fee_growth_client.query_stream(
+            query, variables, converters=SNAPSHOT_CONVERTERS
+        ):
+            yield field, entity
 
-    def _transform_data(self, query_data: dict) -> dict[str, list[FeesData]]:
-        transformed_data = {}
-        self._extract_static_data(query_data["static"])
-        # Add latest row
-        for hypervisor_latest in query_data["latest"]:
-            transformed_data[hypervisor_latest["id"]] = [
+    def _transform_entity(
+        self, transformed_data: dict[str, list[FeesDataRow]], field: str, entity: dict
+    ) -> None:
+        """Add the rows of one streamed entity to transformed_data"""
+        if field == "_meta":
+            self._meta = entity
+        elif field == "static":
+            self._add_static_data(entity)
+        elif field == "latest":
+            # Add latest row
+            transformed_data[entity["id"]] = [
                 self._init_fees_data(
-                    hypervisor=hypervisor_latest,
-                    hypervisor_id=hypervisor_latest["id"],
-                    block=query_data["_meta"]["block"]["number"],
-                    timestamp=query_data["_meta"]["block"]["timestamp"],
-                    current_tick=hypervisor_latest["pool"]["currentTick"],
-                    price_0=hypervisor_latest["pool"]["token0"]["priceUSD"],
-                    price_1=hypervisor_latest["pool"]["token1"]["priceUSD"],
-                    fee_growth_global_0=hypervisor_latest["pool"][
-                        "feeGrowthGlobal0X128"
-                    ],
-                    fee_growth_global_1=hypervisor_latest["pool"][
-                        "feeGrowthGlobal1X128"
-                    ],
+                    hypervisor=entity,
+                    hypervisor_id=entity["id"],
+                    block=self._meta["block"]["number"],
+                    timestamp=self._meta["block"]["timestamp"],
+                    current_tick=entity["pool"]["currentTick"],
+                    price_0=entity["pool"]["token0"]["priceUSD"],
+                    price_1=entity["pool"]["token1"]["priceUSD"],
+                    fee_growth_global_0=entity["pool"]["feeGrowthGlobal0X128"],
+                    fee_growth_global_1=entity["pool"]["feeGrowthGlobal1X128"],
                 )
             ]
+        elif field == "initial":
+            # Add initial row
+            if not transformed_data.get(entity["id"]):
+                return
 
-        # Add initial row
-        for hypervisor_initial in query_data["initial"]:
-            if not transformed_data.get(hypervisor_initial["id"]):
-                continue
-
-            transformed_data[hypervisor_initial["id"]].append(
+            transformed_data[entity["id"]].append(
                 self._init_fees_data(
-                    hypervisor=hypervisor_initial,
-                    hypervisor_id=hypervisor_initial["id"],
+                    hypervisor=entity,
+                    hypervisor_id=entity["id"],
                     block=self.initial_time.block,
                     timestamp=self.initial_time.timestamp,
-                    current_tick=hypervisor_initial["pool"]["currentTick"],
-                    price_0=hypervisor_initial["pool"]["token0"]["priceUSD"],
-                    price_1=hypervisor_initial["pool"]["token1"]["priceUSD"],
-                    fee_growth_global_0=hypervisor_initial["pool"][
-                        "feeGrowthGlobal0X128"
-                    ],
-                    fee_growth_global_1=hypervisor_initial["pool"][
-                        "feeGrowthGlobal1X128"
-                    ],
+                    current_tick=entity["pool"]["currentTick"],
+                    price_0=entity["pool"]["token0"]["priceUSD"],
+                    price_1=entity["pool"]["token1"]["priceUSD"],
+                    fee_growth_global_0=entity["pool"]["feeGrowthGlobal0X128"],
+                    fee_growth_global_1=entity["pool"]["feeGrowthGlobal1X128"],
                 )
             )
-
-        for hypervisor_snapshot in query_data["snapshots"]:
-            for snapshot in hypervisor_snapshot["feeSnapshots"]:
-                if not transformed_data.get(hypervisor_snapshot["id"]):
-                    continue
-
+        elif field == "snapshots":
+            if not transformed_data.get(entity["id"]):
+                return
+
+            if len(entity["feeSnapshots"]) == SNAPSHOT_PAGE_SIZE:
+                self._next_pages[entity["id"]] = entity["feeSnapshots"][-1][
+                    "blockNumber"
+                ]
+            block_index.observe(
+                self.chain,
+                (
+                    (snapshot["blockNumber"], snapshot["timestamp"])
+                    for snapshot in entity["feeSnapshots"]
+                ),
+            )
+            for snapshot in entity["feeSnapshots"]:
                 # Add current block
                 current_block = snapshot["currentBlock"]
-                transformed_data[hypervisor_snapshot["id"]].append(
+                transformed_data[entity["id"]].append(
                     self._init_fees_data(
                         hypervisor=current_block,
-                        hypervisor_id=hypervisor_snapshot["id"],
+                        hypervisor_id=entity["id"],
                         block=snapshot["blockNumber"],
                         timestamp=snapshot["timestamp"],
                         current_tick=current_block["tick"],
@@ -574,10 +619,10 @@ class FeeGrowthSnapshotData(FeeGrowthDataABC):
                 )
                 # Add previous block
                 previous_block = snapshot["previousBlock"]
-                transformed_data[hypervisor_snapshot["id"]].append(
+                transformed_data[entity["id"]].append(
                     self._init_fees_data(
                         hypervisor=previous_block,
-                        hypervisor_id=hypervisor_snapshot["id"],
+                        hypervisor_id=entity["id"],
                         block=int(snapshot["blockNumber"])
                         - 1,  # Previous block is 1 block before
                         timestamp=int(snapshot["timestamp"])
@@ -589,4 +634,170 @@ class FeeGrowthSnapshotData(FeeGrowthDataABC):
                         fee_growth_global_1=previous_block["feeGrowthGlobal1X128"],
                     )
                 )
-        return transformed_data
+
+    async def _query_snapshot_page(
+        self, hypervisor_id: str, block_after: int
+    ) -> AsyncIterator[tuple[str, dict]]:
+        query = """
+        query SnapshotPage(
+            $id: ID!
+            $blockAfter: Int!
+            $timestampStart: Int!
+            $timestampEnd: Int!
+            $pageSize: Int!
+        ) {
+            snapshots: hypervisor(id: $id) {
+                id
+                feeSnapshots(
+                    first: $pageSize
+                    orderBy: blockNumber
+                    orderDirection: asc
+                    where: {
+                        blockNumber_gt: $blockAfter
+                        timestamp_gte: $timestampStart
+                        timestamp_lte: $timestampEnd
+                    }
+                ) FEE_SNAPSHOT_FIELDS
+            }
+        }
+        """.replace("FEE_SNAPSHOT_FIELDS", FEE_SNAPSHOT_FIELDS)
+
+        variables = {
+            "id": hypervisor_id,
+            "blockAfter": block_after,
+            "timestampStart": self.initial_time.timestamp,
+            "timestampEnd": self.end_time.timestamp,
+            "pageSize": SNAPSHOT_PAGE_SIZE,
+        }
+
+        async for field, entity in self.fee_growth_client.query_stream(
+            query, variables, converters=SNAPSHOT_CONVERTERS
+        ):
+            yield field, entity
+
+
+class FeeGrowthSnapshotLogData(FeeGrowthSnapshotData):
+    """Fee growth snapshots taken after block_after, and no older than
+    period_days, with the latest state of each hypervisor first"""
+
+    def __init__(
+        self, block_after: int, period_days, protocol: str, chain: str
+    ) -> None:
+        self.block_after = block_after
+        super().__init__(period_days, protocol, chain)
+
+    async def _init_start_time(self) -> None:
+        self.end_time = await self._query_current_time()
+        self.initial_time = Time(
+            block=self.block_after,
+            timestamp=self.end_time.timestamp - (self.period_days * DAY_SECONDS),
+        )
+
+    async def _query_data(self) -> AsyncIterator[tuple[str, dict]]:
+        query = """
+        query SnapshotLog(
+            $blockAfter: Int!
+            $timestampStart: Int!
+            $blockEnd: Int!
+            $timestampEnd: Int!
+            $pageSize: Int!
+        ) {
+            _meta {
+                block {
+                number
+                timestamp
+                }
+            }
+            static: hypervisors(first: 1000, block: {number: $blockEnd}) {
+                id
+                symbol
+                pool {
+                    token0 {
+                        priceUSD
+                        decimals
+                    }
+                    token1 {
+                        priceUSD
+                        decimals
+                    }
+                }
+            }
+            latest: hypervisors(first: 1000, block: {number: $blockEnd}) {
+                id
+                tvl0
+                tvl1
+                tvlUSD
+                pool {
+                    currentTick
+                    feeGrowthGlobal0X128
+                    feeGrowthGlobal1X128
+                    token0 {
+                        priceUSD
+                    }
+                    token1 {
+                        priceUSD
+                    }
+                }
+                basePosition {
+                    liquidity
+                    tokensOwed0
+                    tokensOwed1
+                    feeGrowthInside0X128
+                    feeGrowthInside1X128
+                    tickLower {
+                        tickIdx
+                        feeGrowthOutside0X128
+                        feeGrowthOutside1X128
+                    }
+                    tickUpper {
+                        tickIdx
+                        feeGrowthOutside0X128
+                        feeGrowthOutside1X128
+                    }
+                }
+                limitPosition {
+                    liquidity
+                    tokensOwed0
+                    tokensOwed1
+                    feeGrowthInside0X128
+                    feeGrowthInside1X128
+                    tickLower {
+                        tickIdx
+                        feeGrowthOutside0X128
+                        feeGrowthOutside1X128
+                    }
+                    tickUpper {
+                        tickIdx
+                        feeGrowthOutside0X128
+                        feeGrowthOutside1X128
+                    }
+                }
+            }
+            snapshots: hypervisors(first: 1000) {
+                id
+                feeSnapshots(
+                    first: $pageSize
+                    orderBy: blockNumber
+                    orderDirection: asc
+                    where: {
+                        blockNumber_gt: $blockAfter
+                        timestamp_gte: $timestampStart
+                        timestamp_lte: $timestampEnd
+                    }
+                ) FEE_SNAPSHOT_FIELDS
+            }
+        }
+        """.replace("FEE_SNAPSHOT_FIELDS", FEE_SNAPSHOT_FIELDS)
+
+        variables = {
+            "blockAfter": self.initial_time.block,
+            "timestampStart": self.initial_time.timestamp,
+            "blockEnd": self.end_time.block,
+            "timestampEnd": self.end_time.timestamp,
+            "pageSize": SNAPSHOT_PAGE_SIZE,
+        }
+
+        async for field, entity in self.fee_growth_client.query_stream(
+            query, variables, converters=SNAPSHOT_CONVERTERS
+        ):
+            yield field, entity
@@ -1,7 +1,10 @@
 import logging
+from operator import attrgetter
+
 from v3data.utils import sub_in_256
 from v3data.hype_fees.schema import (
     FeesData,
+    FeesDataRow,
     UncollectedFees,
     UncollectedFeesUsd,
     _TokenPair,
@@ -128,13 +131,133 @@ class Fees:
         return _TokenPair(value0=uncollected_fees_0, value1=uncollected_fees_1)
 
 
+class FeesBatch:
+    """Fees of many FeesData at once, identical to Fees for each of them
+
+    Values are read with attrgetters, or straight from the columns behind
+    FeesDataRow views, and the uint256 fee growth arithmetic is inlined with
+    a mask, which equals sub_in_256 for the uint256 values of the contracts,
+    instead of going through Fees and _TokenPair per position.
+    """
+
+    def __init__(self, data: list[FeesData], protocol: str, chain: str):
+        self.data = data
+        self.protocol = protocol
+        self.chain = chain
+
+    def fee_amounts(self) -> list[UncollectedFees]:
+        return self._calc_all_fees()
+
+    def fee_usd(self) -> list[UncollectedFeesUsd]:
+        return [
+            UncollectedFeesUsd(
+                base=_TokenPairDecimals(
+                    uncollected_fees.base.value0
+                    * data.price.value0
+                    / 10**data.decimals.value0
+                    / X128,
+                    uncollected_fees.base.value1
+                    * data.price.value1
+                    / 10**data.decimals.value1
+                    / X128,
+                ),
+                limit=_TokenPairDecimals(
+                    uncollected_fees.limit.value0
+                    * data.price.value0
+                    / 10**data.decimals.value0
+                    / X128,
+                    uncollected_fees.limit.value1
+                    * data.price.value1
+                    / 10**data.decimals.value1
+                    / X128,
+                ),
+            )
+            for data, uncollected_fees in zip(self.data, self._calc_all_fees())
+        ]
+
+    def _calc_all_fees(self) -> list[UncollectedFees]:
+        results = []
+        for data in self.data:
+            try:
+                if isinstance(data, FeesDataRow):
+                    current_tick, global_0, global_1, base, limit = data.fee_fields()
+                else:
+                    current_tick, global_0, global_1, base, limit = _fees_fields(data)
+                    base, limit = _position_fields(base), _position_fields(limit)
+                results.append(
+                    UncollectedFees(
+                        base=_position_fees(current_tick, global_0, global_1, base),
+                        limit=_position_fees(current_tick, global_0, global_1, limit),
+                    )
+                )
+            except (IndexError, TypeError):
+                # Missing data, logged and zeroed as by Fees
+                results.append(Fees(data, self.protocol, self.chain).fee_amounts())
+        return results
+
+
+UINT256_MASK = 2**256 - 1
+
+_fees_fields = attrgetter(
+    "currentTick",
+    "fee_growth_global.value0",
+    "fee_growth_global.value1",
+    "base_position",
+    "limit_position",
+)
+_position_fields = attrgetter(
+    "liquidity",
+    "tick_lower.tick_index",
+    "tick_upper.tick_index",
+    "tick_lower.fee_growth_outside.value0",
+    "tick_lower.fee_growth_outside.value1",
+    "tick_upper.fee_growth_outside.value0",
+    "tick_upper.fee_growth_outside.value1",
+    "fee_growth_inside.value0",
+    "fee_growth_inside.value1",
+)
+
+
+def _position_fees(
+    current_tick: int, global_0: int, global_1: int, position_fields: tuple
+):
+    """Fees._calc_position_fees with sub_in_256 as a masked subtraction"""
+    (
+        liquidity,
+        tick_lower,
+        tick_upper,
+        lower_outside_0,
+        lower_outside_1,
+        upper_outside_0,
+        upper_outside_1,
+        inside_0,
+        inside_1,
+    ) = position_fields
+
+    if current_tick >= tick_lower:
+        below_0, below_1 = lower_outside_0, lower_outside_1
+    else:
+        below_0 = (global_0 - lower_outside_0) & UINT256_MASK
+        below_1 = (global_1 - lower_outside_1) & UINT256_MASK
+
+    if current_tick >= tick_upper:
+        above_0 = (global_0 - upper_outside_0) & UINT256_MASK
+        above_1 = (global_1 - upper_outside_1) & UINT256_MASK
+    else:
+        above_0, above_1 = upper_outside_0, upper_outside_1
+
+    accum_0 = (((global_0 - below_0) & UINT256_MASK) - above_0) & UINT256_MASK
+    accum_1 = (((global_1 - below_1) & UINT256_MASK) - above_1) & UINT256_MASK
+
+    return _TokenPair(
+        value0=liquidity * ((accum_0 - inside_0) & UINT256_MASK),
+        value1=liquidity * ((accum_1 - inside_1) & UINT256_MASK),
+    )
+
+
 async def fees_usd_all(protocol: str, chain: str):
     fees_data = FeeGrowthData(protocol, chain)
     await fees_data.get_data()
 
-    results = {}
-    for hypervisor_id, fees_data in fees_data.data.items():
-        fees = Fees(fees_data, protocol, chain)
-        results[hypervisor_id] = fees.fee_usd()
-
-    return results
+    fees = FeesBatch(list(fees_data.data.values()), protocol, chain)
+    return dict(zip(fees_data.data, fees.fee_usd()))
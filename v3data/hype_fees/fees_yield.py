@@ -1,11 +1,19 @@
 import logging
+from dataclasses import fields
+from operator import attrgetter
 
 import numpy as np
 from pandas import DataFrame
 
 from v3data.hype_fees.data import FeeGrowthSnapshotData
-from v3data.hype_fees.fees import Fees
-from v3data.hype_fees.schema import FeesData, FeesSnapshot, FeeYield
+from v3data.hype_fees.fees import Fees, FeesBatch
+from v3data.hype_fees.schema import (
+    FeesData,
+    FeesDataRow,
+    FeesSnapshot,
+    FeeYield,
+    UncollectedFees,
+)
 from v3data.constants import X128, DAY_SECONDS, YEAR_SECONDS
 
 logger = logging.getLogger(__name__)
@@ -20,88 +28,48 @@ class FeesYield:
         self.chain = chain
 
     def calculate_returns(self) -> FeeYield:
-        snapshots = [self.get_fees(entry) for entry in self.data]
-        df_snapshots = DataFrame(snapshots, dtype=np.float64)
+        fee_amounts = FeesBatch(self.data, self.protocol, self.chain).fee_amounts()
+        snapshots = [
+            self.get_fees(entry, fee_amounts_x128)
+            for entry, fee_amounts_x128 in zip(self.data, fee_amounts)
+        ]
+        return fee_yields([snapshots])[0]
 
-        #  Require at least two rows to calculate yield
-        if len(df_snapshots) < 2:
-            logger.info("No hypervisor data - skipping calculations")
-            return FeeYield(
-                apr=0,
-                apy=0,
-                status="Insufficient Data",
-            )
-
-        df_snapshots = df_snapshots.set_index("block").sort_index()
-        df_snapshots["elapsed_time"] = df_snapshots.timestamp.diff()
-        df_snapshots["fee0_growth"] = df_snapshots.total_fees_0.diff().clip(lower=0)
-        df_snapshots["fee1_growth"] = df_snapshots.total_fees_1.diff().clip(lower=0)
-
-        df_snapshots["fee_growth_usd"] = (
-            df_snapshots.fee0_growth * df_snapshots.price_0
-            + df_snapshots.fee1_growth * df_snapshots.price_1
-        )
-        df_snapshots["period_yield"] = (
-            df_snapshots.fee_growth_usd / df_snapshots.tvl_usd
-        )
-        df_snapshots["yield_per_day"] = (
-            df_snapshots.period_yield * YEAR_SECONDS / df_snapshots.elapsed_time
-        )
-
-        has_outlier = (df_snapshots.yield_per_day > YIELD_PER_DAY_MAX).any()
-        df_snapshots = df_snapshots[df_snapshots.yield_per_day < YIELD_PER_DAY_MAX]
-
-        df_snapshots["total_period_seconds"] = df_snapshots.elapsed_time.cumsum()
-        df_snapshots["cum_fee_return"] = (1 + df_snapshots.period_yield).cumprod() - 1
-
-        df_returns = df_snapshots[["total_period_seconds", "cum_fee_return"]].tail(1)
-
-        # This is a failsafe for if there are outliers
-        if df_returns.empty:
-            logger.info("Empty returns")
-            return FeeYield(
-                apr=0,
-                apy=0,
-                status="Insufficient good data",
-            )
+    def get_fees(
+        self,
+        fees_data: FeesData,
+        fee_amounts_x128: UncollectedFees | None = None,
+    ) -> FeesSnapshot:
+        if fee_amounts_x128 is None:
+            fees = Fees(fees_data, self.protocol, self.chain)
+            fee_amounts_x128 = fees.fee_amounts()
 
-        # Extrapolate linearly to annual rate
-        df_returns["fee_apr"] = df_returns.cum_fee_return * (
-            YEAR_SECONDS / df_returns.total_period_seconds
+        (
+            block,
+            timestamp,
+            tvl_usd,
+            price_0,
+            price_1,
+            decimals_0,
+            decimals_1,
+            base_owed_0,
+            base_owed_1,
+            limit_owed_0,
+            limit_owed_1,
+        ) = (
+            fees_data.snapshot_fields()
+            if isinstance(fees_data, FeesDataRow)
+            else _snapshot_fields(fees_data)
         )
 
-        # Extrapolate by compounding
-        df_returns["fee_apy"] = (
-            1
-            + df_returns.cum_fee_return
-            * (DAY_SECONDS / df_returns.total_period_seconds)
-        ) ** 365 - 1
-
-        df_returns = df_returns.fillna(0).replace({np.inf: 0, -np.inf: 0})
-
-        returns = df_returns.to_dict("records")[0]
-
-        returns["fee_apr"] = max(returns["fee_apr"], 0)
-        returns["fee_apy"] = max(returns["fee_apy"], 0)
-
-        return FeeYield(
-            apr=returns["fee_apr"] if returns["fee_apr"] else 0,
-            apy=returns["fee_apy"] if returns["fee_apy"] else 0,
-            status="Outlier removed" if has_outlier else "Good",
-        )
-
-    def get_fees(self, fees_data: FeesData) -> FeesSnapshot:
-        fees = Fees(fees_data, self.protocol, self.chain)
-        fee_amounts_x128 = fees.fee_amounts()
-
         total_fees_0 = (
             (
                 fee_amounts_x128.base.value0
                 + fee_amounts_x128.limit.value0
-                + fees_data.base_position.tokens_owed.value0
-                + fees_data.limit_position.tokens_owed.value0
+                + base_owed_0
+                + limit_owed_0
             )
-            / 10**fees_data.decimals.value0
+            / 10**decimals_0
             / X128
         )
 
@@ -109,36 +77,220 @@ class FeesYield:
             (
                 fee_amounts_x128.base.value1
                 + fee_amounts_x128.limit.value1
-                + fees_data.base_position.tokens_owed.value1
-                + fees_data.limit_position.tokens_owed.value1
+                + base_owed_1
+                + limit_owed_1
             )
-            / 10**fees_data.decimals.value1
+            / 10**decimals_1
             / X128
         )
 
         return FeesSnapshot(
-            block=fees_data.block,
-            timestamp=fees_data.timestamp,
-            tvl_usd=fees_data.tvl_usd,
+            block=block,
+            timestamp=timestamp,
+            tvl_usd=tvl_usd,
             total_fees_0=total_fees_0,
             total_fees_1=total_fees_1,
-            price_0=fees_data.price.value0,
-            price_1=fees_data.price.value1,
+            price_0=price_0,
+            price_1=price_1,
+        )
+
+
+_snapshot_fields = attrgetter(
+    "block",
+    "timestamp",
+    "tvl_usd",
+    "price.value0",
+    "price.value1",
+    "decimals.value0",
+    "decimals.value1",
+    "base_position.tokens_owed.value0",
+    "base_position.tokens_owed.value1",
+    "limit_position.tokens_owed.value0",
+    "limit_position.tokens_owed.value1",
+)
+
+
+def fee_yields(groups: list[list[FeesSnapshot]]) -> list[FeeYield]:
+    """Fee yield of every group of snapshots, in one frame for all groups
+
+    Differences, outlier removal and compounding are computed group-wise, so
+    the fixed cost of pandas operations is paid once rather than per group.
+    """
+    sizes = np.array([len(snapshots) for snapshots in groups], dtype=np.int64)
+    df_snapshots = DataFrame(
+        [snapshot for snapshots in groups for snapshot in snapshots],
+        columns=[field.name for field in fields(FeesSnapshot)],
+        dtype=np.float64,
+    )
+    df_snapshots["group"] = np.repeat(np.arange(len(groups)), sizes)
+    df_snapshots = df_snapshots.sort_values(["group", "block"], kind="mergesort")
+
+    by_group = df_snapshots.groupby("group", sort=False)
+    df_snapshots["elapsed_time"] = by_group.timestamp.diff()
+    df_snapshots["fee0_growth"] = by_group.total_fees_0.diff().clip(lower=0)
+    df_snapshots["fee1_growth"] = by_group.total_fees_1.diff().clip(lower=0)
+
+    df_snapshots["fee_growth_usd"] = (
+        df_snapshots.fee0_growth * df_snapshots.price_0
+        + df_snapshots.fee1_growth * df_snapshots.price_1
+    )
+    df_snapshots["period_yield"] = df_snapshots.fee_growth_usd / df_snapshots.tvl_usd
+    df_snapshots["yield_per_day"] = (
+        df_snapshots.period_yield * YEAR_SECONDS / df_snapshots.elapsed_time
+    )
+
+    has_outlier = (
+        (df_snapshots.yield_per_day > YIELD_PER_DAY_MAX)
+        .groupby(df_snapshots.group)
+        .any()
+    )
+    df_snapshots = df_snapshots[df_snapshots.yield_per_day < YIELD_PER_DAY_MAX]
+
+    by_group = df_snapshots.groupby("group", sort=False)
+    df_snapshots["total_period_seconds"] = by_group.elapsed_time.cumsum()
+    df_snapshots["cum_fee_return"] = (1 + df_snapshots.period_yield).groupby(
+        df_snapshots.group
+    ).cumprod() - 1
+
+    df_returns = df_snapshots.groupby("group")[
+        ["total_period_seconds", "cum_fee_return"]
+    ].last()
+
+    # Extrapolate linearly to annual rate
+    df_returns["fee_apr"] = df_returns.cum_fee_return * (
+        YEAR_SECONDS / df_returns.total_period_seconds
+    )
+
+    # Extrapolate by compounding
+    df_returns["fee_apy"] = (
+        1 + df_returns.cum_fee_return * (DAY_SECONDS / df_returns.total_period_seconds)
+    ) ** 365 - 1
+
+    df_returns = df_returns.fillna(0).replace({np.inf: 0, -np.inf: 0})
+    returns = df_returns[["fee_apr", "fee_apy"]].to_dict("index")
+
+    yields = []
+    for group, size in enumerate(sizes):
+        #  Require at least two rows to calculate yield
+        if size < 2:
+            logger.info("No hypervisor data - skipping calculations")
+            yields.append(FeeYield(apr=0, apy=0, status="Insufficient Data"))
+            continue
+
+        # This is a failsafe for if there are outliers
+        if group not in returns:
+            logger.info("Empty returns")
+            yields.append(FeeYield(apr=0, apy=0, status="Insufficient good data"))
+            continue
+
+        fee_apr = max(returns[group]["fee_apr"], 0)
+        fee_apy = max(returns[group]["fee_apy"], 0)
+        yields.append(
+            FeeYield(
+                apr=fee_apr if fee_apr else 0,
+                apy=fee_apy if fee_apy else 0,
+                status="Outlier removed" if has_outlier[group] else "Good",
+            )
         )
 
+    return yields
+
+
+def fee_snapshots(
+    data: list[FeesData], protocol: str, chain: str
+) -> list[FeesSnapshot]:
+    """FeesSnapshot of every FeesData, with fees computed in one batch"""
+    fees_yield = FeesYield(data, protocol, chain)
+    return [
+        fees_yield.get_fees(entry, fee_amounts_x128)
+        for entry, fee_amounts_x128 in zip(
+            data, FeesBatch(data, protocol, chain).fee_amounts()
+        )
+    ]
+
+
+def window_snapshots(
+    snapshots: list[FeesSnapshot], timestamp_start: int
+) -> list[FeesSnapshot]:
+    """Snapshots of the window starting at timestamp_start, from a snapshot
+    interpolated at its start between the two snapshots around it"""
+    snapshots = sorted(snapshots, key=lambda snapshot: snapshot.block)
+    inside = [
+        index
+        for index, snapshot in enumerate(snapshots)
+        if snapshot.timestamp > timestamp_start
+    ]
+    if not inside:
+        return snapshots[-1:]
+    if inside[0] == 0:
+        return snapshots
+
+    previous, current = snapshots[inside[0] - 1], snapshots[inside[0]]
+    if previous.timestamp == timestamp_start:
+        return snapshots[inside[0] - 1 :]
+
+    # Fees accrue linearly between snapshots
+    fraction = (timestamp_start - previous.timestamp) / (
+        current.timestamp - previous.timestamp
+    )
+    start = FeesSnapshot(
+        block=previous.block + int((current.block - previous.block) * fraction),
+        timestamp=timestamp_start,
+        tvl_usd=previous.tvl_usd,
+        total_fees_0=previous.total_fees_0
+        + (current.total_fees_0 - previous.total_fees_0) * fraction,
+        total_fees_1=previous.total_fees_1
+        + (current.total_fees_1 - previous.total_fees_1) * fraction,
+        price_0=previous.price_0,
+        price_1=previous.price_1,
+    )
+    return [start] + snapshots[inside[0] :]
+
 
 async def fee_returns_all(protocol: str, chain: str, days: int):
-    fees_data = FeeGrowthSnapshotData(days, protocol, chain)
+    return (await fee_returns_all_windows(protocol, chain, (days,)))[days]
+
+
+async def fee_returns_all_windows(
+    protocol: str, chain: str, windows: tuple[int, ...]
+) -> dict[int, dict]:
+    """Fee returns of every hypervisor over each window of days, derived from
+    the snapshots of the longest one"""
+    fees_data = FeeGrowthSnapshotData(max(windows), protocol, chain)
     await fees_data.get_data()
 
+    # One batch and one frame for the snapshots of all hypervisors and windows
+    snapshots = iter(
+        fee_snapshots(
+            [entry for entries in fees_data.data.values() for entry in entries],
+            protocol,
+            chain,
+        )
+    )
+    hypervisor_snapshots = [
+        [next(snapshots) for _ in entries] for entries in fees_data.data.values()
+    ]
+    groups = [
+        (
+            hypervisor
+            if days == max(windows)
+            else window_snapshots(
+                hypervisor, fees_data.end_time.timestamp - days * DAY_SECONDS
+            )
+        )
+        for days in windows
+        for hypervisor in hypervisor_snapshots
+    ]
+    yields = iter(fee_yields(groups))
+
     results = {}
-    for hypervisor_id, fees_data in fees_data.data.items():
-        fees_yield = FeesYield(fees_data, protocol, chain)
-        returns = fees_yield.calculate_returns()
-        results[hypervisor_id] = {
-            "symbol": fees_data[0].symbol,
-            "feeApr": returns.apr,
-            "feeApy": returns.apy,
-            "status": returns.status
-        }
+    for days in windows:
+        results[days] = {}
+        for (hypervisor_id, entries), returns in zip(fees_data.data.items(), yields):
+            results[days][hypervisor_id] = {
+                "symbol": entries[0].symbol,
+                "feeApr": returns.apr,
+                "feeApy": returns.apy,
+                "status": returns.status,
+            }
     return results
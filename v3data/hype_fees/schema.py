@@ -1,3 +1,4 @@
+from array import array
 from dataclasses import dataclass
 
 
@@ -76,6 +77,352 @@ class FeesData:
         self.tvl_usd = float(self.tvl_usd)
 
 
+class _TickColumns:
+    """Tick fields of one position of every row"""
+
+    def __init__(self):
+        self.tick_index = array("q")
+        # uint256, kept as Python ints
+        self.fee_growth_outside_0 = []
+        self.fee_growth_outside_1 = []
+
+    @staticmethod
+    def values(tick: dict) -> tuple:
+        return (
+            int(tick["tickIdx"]),
+            int(tick["feeGrowthOutside0X128"]),
+            int(tick["feeGrowthOutside1X128"]),
+        )
+
+    def append(self, values: tuple) -> None:
+        tick_index, fee_growth_outside_0, fee_growth_outside_1 = values
+        self.tick_index.append(tick_index)
+        self.fee_growth_outside_0.append(fee_growth_outside_0)
+        self.fee_growth_outside_1.append(fee_growth_outside_1)
+
+
+class _PositionColumns:
+    """Fields of the base or limit position of every row"""
+
+    def __init__(self):
+        # uint128 and uint256, kept as Python ints
+        self.liquidity = []
+        self.tokens_owed_0 = []
+        self.tokens_owed_1 = []
+        self.fee_growth_inside_0 = []
+        self.fee_growth_inside_1 = []
+        self.tick_lower = _TickColumns()
+        self.tick_upper = _TickColumns()
+
+    @staticmethod
+    def values(position: dict) -> tuple:
+        return (
+            int(position["liquidity"]),
+            int(position["tokensOwed0"]),
+            int(position["tokensOwed1"]),
+            int(position["feeGrowthInside0X128"]),
+            int(position["feeGrowthInside1X128"]),
+            _TickColumns.values(position["tickLower"]),
+            _TickColumns.values(position["tickUpper"]),
+        )
+
+    def append(self, values: tuple) -> None:
+        (
+            liquidity,
+            tokens_owed_0,
+            tokens_owed_1,
+            fee_growth_inside_0,
+            fee_growth_inside_1,
+            tick_lower,
+            tick_upper,
+        ) = values
+        self.liquidity.append(liquidity)
+        self.tokens_owed_0.append(tokens_owed_0)
+        self.tokens_owed_1.append(tokens_owed_1)
+        self.fee_growth_inside_0.append(fee_growth_inside_0)
+        self.fee_growth_inside_1.append(fee_growth_inside_1)
+        self.tick_lower.append(tick_lower)
+        self.tick_upper.append(tick_upper)
+
+    def fee_fields(self, index: int) -> tuple:
+        """Values Fees reads from the position of row index, in the order of
+        the _position_fields getter of FeesBatch"""
+        tick_lower, tick_upper = self.tick_lower, self.tick_upper
+        return (
+            self.liquidity[index],
+            tick_lower.tick_index[index],
+            tick_upper.tick_index[index],
+            tick_lower.fee_growth_outside_0[index],
+            tick_lower.fee_growth_outside_1[index],
+            tick_upper.fee_growth_outside_0[index],
+            tick_upper.fee_growth_outside_1[index],
+            self.fee_growth_inside_0[index],
+            self.fee_growth_inside_1[index],
+        )
+
+
+class FeesDataColumns:
+    """FeesData of many snapshots, stored as one array per field
+
+    Fixed width fields are kept in arrays, only the uint128 and uint256
+    values are Python ints. Rows are appended straight from subgraph
+    entities and read through FeesDataRow views, which have the attributes
+    of FeesData.
+    """
+
+    def __init__(self):
+        self.hypervisor: list[str] = []
+        self.symbol: list[str] = []
+        self.block = array("q")
+        self.timestamp = array("q")
+        self.current_tick = array("q")
+        self.price_0 = array("d")
+        self.price_1 = array("d")
+        self.decimals_0 = array("q")
+        self.decimals_1 = array("q")
+        self.tvl_0 = []
+        self.tvl_1 = []
+        self.tvl_usd = array("d")
+        self.fee_growth_global_0 = []
+        self.fee_growth_global_1 = []
+        self.base = _PositionColumns()
+        self.limit = _PositionColumns()
+
+    def __len__(self) -> int:
+        return len(self.block)
+
+    def __getitem__(self, index: int) -> "FeesDataRow":
+        if not -len(self) <= index < len(self):
+            raise IndexError("FeesDataColumns index out of range")
+        return FeesDataRow(self, index % len(self))
+
+    def append(
+        self,
+        hypervisor: dict,
+        hypervisor_id: str,
+        static_info: HypervisorStaticInfo,
+        block: int,
+        timestamp: int,
+        current_tick: int,
+        price_0: float,
+        price_1: float,
+        fee_growth_global_0: int,
+        fee_growth_global_1: int,
+    ) -> "FeesDataRow":
+        """Add the row of a hypervisor entity and return its view"""
+        # Convert every field first, so a malformed entity adds nothing
+        base = _PositionColumns.values(hypervisor["basePosition"])
+        limit = _PositionColumns.values(hypervisor["limitPosition"])
+        block, timestamp, current_tick = int(block), int(timestamp), int(current_tick)
+        price_0, price_1 = float(price_0), float(price_1)
+        tvl_0, tvl_1 = int(hypervisor["tvl0"]), int(hypervisor["tvl1"])
+        tvl_usd = float(hypervisor["tvlUSD"])
+        fee_growth_global_0 = int(fee_growth_global_0)
+        fee_growth_global_1 = int(fee_growth_global_1)
+
+        index = len(self)
+        self.hypervisor.append(hypervisor_id)
+        self.symbol.append(static_info.symbol)
+        self.block.append(block)
+        self.timestamp.append(timestamp)
+        self.current_tick.append(current_tick)
+        self.price_0.append(price_0)
+        self.price_1.append(price_1)
+        self.decimals_0.append(static_info.decimals.value0)
+        self.decimals_1.append(static_info.decimals.value1)
+        self.tvl_0.append(tvl_0)
+        self.tvl_1.append(tvl_1)
+        self.tvl_usd.append(tvl_usd)
+        self.fee_growth_global_0.append(fee_growth_global_0)
+        self.fee_growth_global_1.append(fee_growth_global_1)
+        self.base.append(base)
+        self.limit.append(limit)
+        return FeesDataRow(self, index)
+
+
+class _TickRow:
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self, columns: _TickColumns, index: int):
+        self._columns = columns
+        self._index = index
+
+    @property
+    def tick_index(self) -> int:
+        return self._columns.tick_index[self._index]
+
+    @property
+    def fee_growth_outside(self) -> _TokenPair:
+        return _TokenPair(
+            self._columns.fee_growth_outside_0[self._index],
+            self._columns.fee_growth_outside_1[self._index],
+        )
+
+
+class _PositionRow:
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self, columns: _PositionColumns, index: int):
+        self._columns = columns
+        self._index = index
+
+    @property
+    def liquidity(self) -> int:
+        return self._columns.liquidity[self._index]
+
+    @property
+    def tokens_owed(self) -> _TokenPair:
+        return _TokenPair(
+            self._columns.tokens_owed_0[self._index],
+            self._columns.tokens_owed_1[self._index],
+        )
+
+    @property
+    def fee_growth_inside(self) -> _TokenPair:
+        return _TokenPair(
+            self._columns.fee_growth_inside_0[self._index],
+            self._columns.fee_growth_inside_1[self._index],
+        )
+
+    @property
+    def tick_lower(self) -> _TickRow:
+        return _TickRow(self._columns.tick_lower, self._index)
+
+    @property
+    def tick_upper(self) -> _TickRow:
+        return _TickRow(self._columns.tick_upper, self._index)
+
+
+class FeesDataRow:
+    """View of one row of FeesDataColumns with the attributes of FeesData"""
+
+    __slots__ = ("columns", "index")
+
+    def __init__(self, columns: FeesDataColumns, index: int):
+        self.columns = columns
+        self.index = index
+
+    @property
+    def block(self) -> int:
+        return self.columns.block[self.index]
+
+    @property
+    def timestamp(self) -> int:
+        return self.columns.timestamp[self.index]
+
+    @property
+    def hypervisor(self) -> str:
+        return self.columns.hypervisor[self.index]
+
+    @property
+    def symbol(self) -> str:
+        return self.columns.symbol[self.index]
+
+    @property
+    def currentTick(self) -> int:
+        return self.columns.current_tick[self.index]
+
+    @property
+    def price(self) -> _TokenPairDecimals:
+        return _TokenPairDecimals(
+            self.columns.price_0[self.index], self.columns.price_1[self.index]
+        )
+
+    @property
+    def decimals(self) -> _TokenPair:
+        return _TokenPair(
+            self.columns.decimals_0[self.index], self.columns.decimals_1[self.index]
+        )
+
+    @property
+    def tvl(self) -> _TokenPair:
+        return _TokenPair(
+            self.columns.tvl_0[self.index], self.columns.tvl_1[self.index]
+        )
+
+    @property
+    def tvl_usd(self) -> float:
+        return self.columns.tvl_usd[self.index]
+
+    @property
+    def fee_growth_global(self) -> _TokenPair:
+        return _TokenPair(
+            self.columns.fee_growth_global_0[self.index],
+            self.columns.fee_growth_global_1[self.index],
+        )
+
+    @property
+    def base_position(self) -> _PositionRow:
+        return _PositionRow(self.columns.base, self.index)
+
+    @property
+    def limit_position(self) -> _PositionRow:
+        return _PositionRow(self.columns.limit, self.index)
+
+    def fee_fields(self) -> tuple:
+        """Values Fees reads from the row, in the order of the _fees_fields
+        getter of FeesBatch with positions expanded"""
+        columns, index = self.columns, self.index
+        return (
+            columns.current_tick[index],
+            columns.fee_growth_global_0[index],
+            columns.fee_growth_global_1[index],
+            columns.base.fee_fields(index),
+            columns.limit.fee_fields(index),
+        )
+
+    def snapshot_fields(self) -> tuple:
+        """Values FeesYield.get_fees reads from the row, in the order of its
+        _snapshot_fields getter"""
+        columns, index = self.columns, self.index
+        return (
+            columns.block[index],
+            columns.timestamp[index],
+            columns.tvl_usd[index],
+            columns.price_0[index],
+            columns.price_1[index],
+            columns.decimals_0[index],
+            columns.decimals_1[index],
+            columns.base.tokens_owed_0[index],
+            columns.base.tokens_owed_1[index],
+            columns.limit.tokens_owed_0[index],
+            columns.limit.tokens_owed_1[index],
+        )
+
+    def to_fees_data(self) -> FeesData:
+        position_rows = (self.base_position, self.limit_position)
+        base_position, limit_position = (
+            _PositionData(
+                liquidity=position.liquidity,
+                tokens_owed=position.tokens_owed,
+                fee_growth_inside=position.fee_growth_inside,
+                tick_lower=_TickData(
+                    position.tick_lower.tick_index,
+                    position.tick_lower.fee_growth_outside,
+                ),
+                tick_upper=_TickData(
+                    position.tick_upper.tick_index,
+                    position.tick_upper.fee_growth_outside,
+                ),
+            )
+            for position in position_rows
+        )
+        return FeesData(
+            block=self.block,
+            timestamp=self.timestamp,
+            hypervisor=self.hypervisor,
+            symbol=self.symbol,
+            currentTick=self.currentTick,
+            price=self.price,
+            decimals=self.decimals,
+            tvl=self.tvl,
+            tvl_usd=self.tvl_usd,
+            fee_growth_global=self.fee_growth_global,
+            base_position=base_position,
+            limit_position=limit_position,
+        )
+
+
 @dataclass
 class UncollectedFees:
     base: _TokenPair
@@ -0,0 +1,382 @@
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+import threading
+from dataclasses import astuple, dataclass
+
+from v3data.config import FEE_SNAPSHOT_STORE_ENABLED, FEE_SNAPSHOT_STORE_PATH
+from v3data.constants import DAY_SECONDS, YEAR_SECONDS
+from v3data.hype_fees.data import FeeGrowthSnapshotLogData
+from v3data.hype_fees.fees_yield import (
+    YIELD_PER_DAY_MAX,
+    fee_returns_all_windows,
+    fee_snapshots,
+)
+from v3data.hype_fees.schema import FeesSnapshot, FeeYield
+from v3data.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+WINDOW_DAYS = (1, 7, 30)
+# Periods older than the longest window are dropped once this many accumulate
+TRIM_PERIODS = 1000
+
+
+def _divide(numerator: float, denominator: float) -> float:
+    """numerator / denominator with IEEE results for a zero denominator"""
+    if denominator:
+        return numerator / denominator
+    if numerator == 0 or math.isnan(numerator):
+        return math.nan
+    return math.copysign(math.inf, numerator) * math.copysign(1, denominator)
+
+
+@dataclass
+class _Period:
+    """Fee yield between two consecutive snapshots"""
+
+    timestamp: int
+    elapsed: float
+    period_yield: float
+    log_return: float | None
+    outlier: bool
+
+    @classmethod
+    def between(cls, previous: FeesSnapshot, current: FeesSnapshot) -> "_Period":
+        elapsed = float(current.timestamp - previous.timestamp)
+        fee_growth_usd = (
+            max(current.total_fees_0 - previous.total_fees_0, 0) * current.price_0
+            + max(current.total_fees_1 - previous.total_fees_1, 0) * current.price_1
+        )
+        return cls.of(
+            current.timestamp, elapsed, _divide(fee_growth_usd, current.tvl_usd)
+        )
+
+    @classmethod
+    def of(cls, timestamp: int, elapsed: float, period_yield: float) -> "_Period":
+        yield_per_day = _divide(period_yield * YEAR_SECONDS, elapsed)
+        return cls(
+            timestamp=timestamp,
+            elapsed=elapsed,
+            period_yield=period_yield,
+            log_return=(
+                math.log1p(period_yield)
+                if yield_per_day < YIELD_PER_DAY_MAX and period_yield > -1
+                else None
+            ),
+            outlier=yield_per_day > YIELD_PER_DAY_MAX,
+        )
+
+    def since(self, timestamp: float) -> "_Period":
+        """The part of the period after timestamp, with fees accrued linearly
+        as between a snapshot interpolated at timestamp and the period end"""
+        fraction = (self.timestamp - timestamp) / self.elapsed
+        return _Period.of(
+            self.timestamp, self.elapsed * fraction, self.period_yield * fraction
+        )
+
+
+class _Window:
+    """Accumulated returns of the periods ending within a trailing window"""
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self.start = 0
+        self.periods = 0
+        self.kept = 0
+        self.outliers = 0
+        self.elapsed = 0.0
+        self.log_return = 0.0
+
+    def add(self, period: _Period, sign: int = 1) -> None:
+        self.periods += sign
+        self.outliers += sign * period.outlier
+        if period.log_return is not None:
+            self.kept += sign
+            self.elapsed += sign * period.elapsed
+            self.log_return += sign * period.log_return
+        if not self.kept:
+            # Clear rounding left over from removals
+            self.elapsed = self.log_return = 0.0
+
+
+class SnapshotLog:
+    """Fee snapshots of one hypervisor, in block order, with the fee return of
+    each trailing window updated as periods enter and leave it
+
+    A period straddling the start of a window counts pro rata, as if the
+    window started at a snapshot interpolated at its start.
+    """
+
+    def __init__(self, window_days=WINDOW_DAYS):
+        self.last: FeesSnapshot | None = None
+        self.periods: list[_Period] = []
+        # End of the windows, as of the last advance
+        self.timestamp: int | None = None
+        self.windows = {days: _Window(days * DAY_SECONDS) for days in window_days}
+
+    @property
+    def block(self) -> int:
+        return self.last.block if self.last else 0
+
+    def extend(self, snapshots: list[FeesSnapshot]) -> None:
+        for snapshot in sorted(snapshots, key=lambda snapshot: snapshot.block):
+            if self.last and snapshot.block <= self.last.block:
+                continue
+            if self.last:
+                period = _Period.between(self.last, snapshot)
+                self.periods.append(period)
+                for window in self.windows.values():
+                    window.add(period)
+            self.last = snapshot
+
+    def advance(self, timestamp: int) -> None:
+        """Drop periods ending before the windows ending at timestamp"""
+        self.timestamp = timestamp
+        for window in self.windows.values():
+            while (
+                window.start < len(self.periods)
+                and self.periods[window.start].timestamp <= timestamp - window.seconds
+            ):
+                window.add(self.periods[window.start], -1)
+                window.start += 1
+
+        trimmed = min(window.start for window in self.windows.values())
+        if trimmed >= TRIM_PERIODS:
+            del self.periods[:trimmed]
+            for window in self.windows.values():
+                window.start -= trimmed
+
+    def returns(self, days: int, latest: FeesSnapshot | None = None) -> FeeYield:
+        """Fee yield over the window of days, up to the latest state when it is
+        newer than the log"""
+        window = self.windows[days]
+        periods, kept, outliers = window.periods, window.kept, window.outliers
+        elapsed, log_return = window.elapsed, window.log_return
+
+        # Only count the part of the first period inside the window
+        first = self.periods[window.start] if window.periods else None
+        if first and first.log_return is not None and self.timestamp is not None:
+            window_start = self.timestamp - window.seconds
+            if first.elapsed > 0 and first.timestamp - first.elapsed < window_start:
+                part = first.since(window_start)
+                if part.log_return is not None:
+                    elapsed += part.elapsed - first.elapsed
+                    log_return += part.log_return - first.log_return
+        if latest and self.last and latest.block > self.last.block:
+            period = _Period.between(self.last, latest)
+            periods += 1
+            outliers += period.outlier
+            if period.log_return is not None:
+                kept += 1
+                elapsed += period.elapsed
+                log_return += period.log_return
+
+        #  Require at least two rows to calculate yield
+        if not periods:
+            return FeeYield(apr=0, apy=0, status="Insufficient Data")
+        if not kept:
+            return FeeYield(apr=0, apy=0, status="Insufficient good data")
+
+        cum_fee_return = math.expm1(log_return)
+        # Extrapolate linearly to annual rate and by compounding
+        fee_apr = _finite(cum_fee_return * _divide(YEAR_SECONDS, elapsed))
+        try:
+            fee_apy = _finite(
+                (1 + cum_fee_return * _divide(DAY_SECONDS, elapsed)) ** 365 - 1
+            )
+        except OverflowError:
+            fee_apy = 0
+        return FeeYield(
+            apr=max(fee_apr, 0),
+            apy=max(fee_apy, 0),
+            status="Outlier removed" if outliers else "Good",
+        )
+
+
+def _finite(value: float) -> float:
+    return value if math.isfinite(value) else 0
+
+
+class FeeSnapshotStore:
+    """Persistent fee snapshot logs of every hypervisor
+
+    Snapshots are kept in a local SQLite file shared by all workers. Each
+    refresh loads the snapshots other workers stored, then queries the
+    subgraph for snapshots after the last stored block only, so its cost
+    scales with new blocks rather than with the length of the windows. File
+    access runs in a thread, one at a time, to keep it off the event loop.
+    """
+
+    def __init__(self, path: str, window_days=WINDOW_DAYS):
+        self.path = path
+        self.window_days = window_days
+        self._connection = None
+        self._lock = threading.Lock()
+        self._logs: dict[tuple[str, str], dict[str, SnapshotLog]] = {}
+        self._latest: dict[tuple[str, str], dict[str, FeesSnapshot]] = {}
+        self._symbols: dict[str, str] = {}
+        self._refreshes = SingleFlight()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS fee_snapshots (
+                    protocol TEXT NOT NULL,
+                    chain TEXT NOT NULL,
+                    hypervisor TEXT NOT NULL,
+                    block INTEGER NOT NULL,
+                    timestamp INTEGER NOT NULL,
+                    tvl_usd REAL NOT NULL,
+                    total_fees_0 REAL NOT NULL,
+                    total_fees_1 REAL NOT NULL,
+                    price_0 REAL NOT NULL,
+                    price_1 REAL NOT NULL,
+                    PRIMARY KEY (protocol, chain, hypervisor, block)
+                )
+                """)
+        return self._connection
+
+    async def returns(self, protocol: str, chain: str, days: int) -> dict:
+        """Fee returns over days of every hypervisor, as fee_returns_all"""
+        return (await self.returns_windows(protocol, chain, (days,)))[days]
+
+    async def returns_windows(
+        self, protocol: str, chain: str, windows: tuple[int, ...]
+    ) -> dict[int, dict]:
+        """Fee returns of every hypervisor over each window, from one refresh"""
+        await self._refreshes.do(
+            (protocol, chain), lambda: self.refresh(protocol, chain)
+        )
+
+        logs = self._logs.get((protocol, chain), {})
+        latest = self._latest.get((protocol, chain), {})
+        results = {}
+        for days in windows:
+            results[days] = {}
+            for hypervisor_id, hypervisor_latest in latest.items():
+                log = logs.get(hypervisor_id) or SnapshotLog(self.window_days)
+                returns = log.returns(days, hypervisor_latest)
+                results[days][hypervisor_id] = {
+                    "symbol": self._symbols.get(hypervisor_id),
+                    "feeApr": returns.apr,
+                    "feeApy": returns.apy,
+                    "status": returns.status,
+                }
+        return results
+
+    async def refresh(self, protocol: str, chain: str) -> None:
+        logs = self._logs.setdefault((protocol, chain), {})
+        await self._load(protocol, chain, logs)
+
+        block_after = max((log.block for log in logs.values()), default=0)
+        fees_data = FeeGrowthSnapshotLogData(
+            block_after, max(self.window_days), protocol, chain
+        )
+        await fees_data.get_data()
+
+        # The first row of every hypervisor is its latest state, not logged
+        data = [entry for entries in fees_data.data.values() for entry in entries]
+        snapshots = iter(fee_snapshots(data, protocol, chain))
+        latest = {}
+        new = {}
+        for hypervisor_id, entries in fees_data.data.items():
+            self._symbols[hypervisor_id] = entries[0].symbol
+            latest[hypervisor_id] = next(snapshots)
+            new[hypervisor_id] = [next(snapshots) for _ in entries[1:]]
+        self._latest[(protocol, chain)] = latest
+
+        await asyncio.to_thread(self._store, protocol, chain, new)
+        for hypervisor_id, snapshots in new.items():
+            logs.setdefault(hypervisor_id, SnapshotLog(self.window_days)).extend(
+                snapshots
+            )
+        for log in logs.values():
+            log.advance(fees_data.end_time.timestamp)
+
+    async def _load(
+        self, protocol: str, chain: str, logs: dict[str, SnapshotLog]
+    ) -> None:
+        """Add snapshots stored by other workers since the logs were extended"""
+        block_after = max((log.block for log in logs.values()), default=0)
+        rows = await asyncio.to_thread(self._read, protocol, chain, block_after)
+
+        snapshots = {}
+        for hypervisor_id, *values in rows:
+            snapshots.setdefault(hypervisor_id, []).append(FeesSnapshot(*values))
+        for hypervisor_id, hypervisor_snapshots in snapshots.items():
+            logs.setdefault(hypervisor_id, SnapshotLog(self.window_days)).extend(
+                hypervisor_snapshots
+            )
+
+    def _read(self, protocol: str, chain: str, block_after: int) -> list[tuple]:
+        try:
+            with self._lock:
+                return self.connection.execute(
+                    "SELECT hypervisor, block, timestamp, tvl_usd, total_fees_0,"
+                    " total_fees_1, price_0, price_1 FROM fee_snapshots"
+                    " WHERE protocol = ? AND chain = ? AND block > ? ORDER BY block",
+                    (protocol, chain, block_after),
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Fee snapshot read failed: {e}")
+            return []
+
+    def _store(
+        self, protocol: str, chain: str, snapshots: dict[str, list[FeesSnapshot]]
+    ) -> None:
+        rows = [
+            (protocol, chain, hypervisor_id, *astuple(snapshot))
+            for hypervisor_id, hypervisor_snapshots in snapshots.items()
+            for snapshot in hypervisor_snapshots
+        ]
+        if not rows:
+            return
+
+        # Keep twice the longest window, older snapshots are never read
+        oldest = max(row[4] for row in rows) - max(self.window_days) * DAY_SECONDS * 2
+        with self._lock:
+            try:
+                self.connection.execute("BEGIN")
+                self.connection.executemany(
+                    "INSERT OR IGNORE INTO fee_snapshots"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self.connection.execute(
+                    "DELETE FROM fee_snapshots"
+                    " WHERE protocol = ? AND chain = ? AND timestamp < ?",
+                    (protocol, chain, oldest),
+                )
+                self.connection.execute("COMMIT")
+            except sqlite3.Error as e:
+                logger.warning(f"Fee snapshot write failed: {e}")
+                if self.connection.in_transaction:
+                    self.connection.execute("ROLLBACK")
+
+
+fee_snapshot_store = FeeSnapshotStore(FEE_SNAPSHOT_STORE_PATH)
+
+# Coalesces concurrent pulls of the same windows when the store is disabled
+_window_returns = SingleFlight()
+
+
+async def fee_returns_windows(
+    protocol: str, chain: str, windows: tuple[int, ...] = WINDOW_DAYS
+) -> dict[int, dict]:
+    """Fee returns of every hypervisor over each window of days, all from one
+    snapshot set: the store's when enabled, else one pull of the longest"""
+    if FEE_SNAPSHOT_STORE_ENABLED and set(windows) <= set(WINDOW_DAYS):
+        return await fee_snapshot_store.returns_windows(protocol, chain, windows)
+    return await _window_returns.do(
+        (protocol, chain, windows),
+        lambda: fee_returns_all_windows(protocol, chain, windows),
+    )
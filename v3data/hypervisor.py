@@ -1,21 +1,31 @@
 import logging
 import math
+from array import array
 import numpy as np
 from datetime import timedelta
-from pandas import DataFrame
+from pandas import DataFrame, concat
 
 from v3data import GammaClient, UniswapV3Client
 from v3data.utils import timestamp_ago, timestamp_to_date
 from v3data.constants import DAYS_IN_PERIOD, SECONDS_IN_DAYS
 from v3data.config import EXCLUDED_HYPERVISORS, FALLBACK_DAYS
 from v3data.hypes.fees_yield import FeesYield
-from v3data.hype_fees.fees_yield import fee_returns_all
+from v3data.hype_fees.snapshot_store import fee_returns_windows
 
 
 DAY_SECONDS = 24 * 60 * 60
 YEAR_SECONDS = 365 * DAY_SECONDS
 X128 = math.pow(2, 128)
 
+REBALANCE_USD_FIELDS = [
+    "grossFeesUSD",
+    "protocolFeesUSD",
+    "netFeesUSD",
+    "totalAmountUSD",
+]
+REBALANCE_COLUMNS = ["timestamp", *REBALANCE_USD_FIELDS]
+REBALANCE_CONVERTERS = {field: float for field in REBALANCE_COLUMNS}
+
 logger = logging.getLogger(__name__)
 
 
@@ -77,53 +87,75 @@ class HypervisorData:
         return response["data"]["uniswapV3Rebalances"]
 
     async def _get_all_rebalance_data(self, time_delta):
-        query = """
-        query allRebalances($timestamp_start: Int!){
+        hypervisors_query = """
+        query hypervisors($paginate: String!){
             uniswapV3Hypervisors(
                 first: 1000
+                orderBy: id
+                where: { id_gt: $paginate }
             ){
                 id
-                rebalances(
-                    first: 1000
-                    where: { timestamp_gte: $timestamp_start }
-                    orderBy: timestamp
-                    orderDirection: desc
-                ) {
-                    id
-                    hypervisor {id}
-                    timestamp
-                    grossFeesUSD
-                    protocolFeesUSD
-                    netFeesUSD
-                    totalAmountUSD
+            }
+        }
+        """
+        rebalances_query = """
+        query allRebalances($timestamp_start: Int!, $paginate: String!){
+            uniswapV3Rebalances(
+                first: 1000
+                orderBy: id
+                where: {
+                    timestamp_gte: $timestamp_start
+                    id_gt: $paginate
                 }
+            ) {
+                id
+                hypervisor {id}
+                timestamp
+                grossFeesUSD
+                protocolFeesUSD
+                netFeesUSD
+                totalAmountUSD
             }
         }
         """
-        variables = {"timestamp_start": timestamp_ago(time_delta)}
-        response = await self.gamma_client.query(query, variables)
+        columns = {}
+        async for page in self.gamma_client.iter_entities(hypervisors_query):
+            for hypervisor in page:
+                columns[hypervisor["id"]] = {
+                    field: array("d") for field in REBALANCE_COLUMNS
+                }
 
-        for hypervisor in response["data"]["uniswapV3Hypervisors"]:
-            if hypervisor["id"] == "0x0ec4a47065bf52e1874d2491d4deeed3c638c75f":
-                for rebalance in hypervisor["rebalances"]:
-                    if (
-                        rebalance["id"]
-                        == "0x9144d5c6a7e8ffd335c837c5877397e96ea3abbc77c9598b07255add6db3fc13-15"
-                    ):
-                        rebalance["grossFeesUSD"] = str(
-                            float(rebalance["grossFeesUSD"]) * 0.08
-                        )
-                        rebalance["protocolFeesUSD"] = str(
-                            float(rebalance["protocolFeesUSD"]) * 0.08
-                        )
-                        rebalance["netFeesUSD"] = str(
-                            float(rebalance["netFeesUSD"]) * 0.08
-                        )
-                        rebalance["totalAmountUSD"] = str(
-                            float(rebalance["totalAmountUSD"]) * 0.08
-                        )
-
-        self.all_rebalance_data = response["data"]["uniswapV3Hypervisors"]
+        # Stream each page of rebalances into the float columns needed for
+        # returns instead of keeping the decoded response
+        variables = {"timestamp_start": timestamp_ago(time_delta)}
+        async for page in self.gamma_client.iter_entities(
+            rebalances_query, variables=variables, converters=REBALANCE_CONVERTERS
+        ):
+            for rebalance in page:
+                hypervisor_columns = columns.get(rebalance["hypervisor"]["id"])
+                if hypervisor_columns is None:
+                    continue
+
+                scale = (
+                    0.08
+                    if rebalance["id"]
+                    == "0x9144d5c6a7e8ffd335c837c5877397e96ea3abbc77c9598b07255add6db3fc13-15"
+                    else 1
+                )
+                hypervisor_columns["timestamp"].append(rebalance["timestamp"])
+                for field in REBALANCE_USD_FIELDS:
+                    hypervisor_columns[field].append(rebalance[field] * scale)
+
+        self.all_rebalance_data = [
+            {
+                "id": hypervisor_id,
+                "rebalances": {
+                    field: np.frombuffer(values, dtype=np.float64)
+                    for field, values in hypervisor_columns.items()
+                },
+            }
+            for hypervisor_id, hypervisor_columns in columns.items()
+        ]
 
     async def _get_hypervisor_data(self, hypervisor_address):
         query = """
@@ -180,9 +212,11 @@ class HypervisorData:
 
     async def _get_all_data(self):
         query_basics = """
-        {
+        query basics($paginate: String!){
             uniswapV3Hypervisors(
-                first:1000
+                first: 1000
+                orderBy: id
+                where: { id_gt: $paginate }
             ){
                 id
                 created
@@ -219,23 +253,10 @@ class HypervisorData:
         }
         """
 
-        basics_response = await self.gamma_client.query(query_basics)
-
-        for hypervisor in basics_response["data"]["uniswapV3Hypervisors"]:
-            if hypervisor["id"] == "0x0ec4a47065bf52e1874d2491d4deeed3c638c75f":
-                hypervisor["grossFeesClaimedUSD"] = str(
-                    float(hypervisor["grossFeesClaimedUSD"]) - 238300
-                )
-                hypervisor["feesReinvestedUSD"] = str(
-                    float(hypervisor["feesReinvestedUSD"]) - 214470
-                )
-
-        basics = basics_response["data"]["uniswapV3Hypervisors"]
-        pool_addresses = [hypervisor["pool"]["id"] for hypervisor in basics]
-
         query_pool = """
         query slot0($pools: [String!]!){
             pools(
+                first: 1000
                 where: {
                     id_in: $pools
                 }
@@ -249,10 +270,30 @@ class HypervisorData:
             }
         }
         """
-        variables = {"pools": pool_addresses}
-        pools_response = await self.uniswap_client.query(query_pool, variables)
-        pools_data = pools_response["data"]["pools"]
-        pools = {pool.pop("id"): pool for pool in pools_data}
+
+        # Look up the pools of each page of hypervisors as it arrives
+        basics = []
+        pools = {}
+        async for page in self.gamma_client.iter_entities(query_basics):
+            for hypervisor in page:
+                if hypervisor["id"] == "0x0ec4a47065bf52e1874d2491d4deeed3c638c75f":
+                    hypervisor["grossFeesClaimedUSD"] = str(
+                        float(hypervisor["grossFeesClaimedUSD"]) - 238300
+                    )
+                    hypervisor["feesReinvestedUSD"] = str(
+                        float(hypervisor["feesReinvestedUSD"]) - 214470
+                    )
+
+            variables = {
+                "pools": list(
+                    dict.fromkeys(hypervisor["pool"]["id"] for hypervisor in page)
+                )
+            }
+            pools_response = await self.uniswap_client.query(query_pool, variables)
+            pools.update(
+                {pool.pop("id"): pool for pool in pools_response["data"]["pools"]}
+            )
+            basics += page
 
         self.basics_data = basics
         self.pools_data = pools
@@ -270,27 +311,17 @@ class HypervisorInfo(HypervisorData):
 
     def _calculate_returns(self, rebalance_data, uncollected_fees_data=None):
         # Calculations require more than 1 rebalance
+        # rebalance_data is either a list of rebalances or a dict of columns
+        df_rebalances = DataFrame(rebalance_data)
+        if uncollected_fees_data:
+            df_rebalances = concat(
+                [df_rebalances, DataFrame([uncollected_fees_data])], ignore_index=True
+            )
 
-        if rebalance_data:
-            data = rebalance_data.copy()
-            if uncollected_fees_data:
-                data.append(uncollected_fees_data)
-        else:
-            data = [uncollected_fees_data]
-
-        if (not data) or (len(data) < 2):
+        if len(df_rebalances) < 2:
             return self.empty_returns()
 
-        df_rebalances = DataFrame(data)
-        df_rebalances = df_rebalances[
-            [
-                "timestamp",
-                "grossFeesUSD",
-                "protocolFeesUSD",
-                "netFeesUSD",
-                "totalAmountUSD",
-            ]
-        ].astype(np.float64)
+        df_rebalances = df_rebalances[REBALANCE_COLUMNS].astype(np.float64)
         df_rebalances = df_rebalances[df_rebalances.totalAmountUSD > 0]
 
         if df_rebalances.empty:
@@ -408,7 +439,8 @@ class HypervisorInfo(HypervisorData):
         basics = self.basics_data
         pools = self.pools_data
 
-        fee_yield_output = await fee_returns_all(self.protocol, self.chain, 1)
+        # Shares the snapshots of the feeReturns routes
+        fee_yield_output = (await fee_returns_windows(self.protocol, self.chain))[1]
 
         returns = {
             hypervisor: {
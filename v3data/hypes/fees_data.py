@@ -1,4 +1,3 @@
-import asyncio
 from dataclasses import dataclass
 
 from v3data import GammaClient, DexFeeGrowthClient
@@ -60,9 +59,11 @@ class FeesData:
         """
 
         hypervisor_all_query = """
-        {
+        query hypervisors($paginate: String!){
             uniswapV3Hypervisors(
                 first: 1000
+                orderBy: id
+                where: { id_gt: $paginate }
             ){
                 id
                 symbol
@@ -98,87 +99,80 @@ class FeesData:
         if hypervisors:
             variables = {"ids": [hypervisor.lower() for hypervisor in hypervisors]}
             response = await self.gamma_client.query(hypervisor_list_query, variables)
-        else:
-            response = await self.gamma_client.query(hypervisor_all_query)
+            return {
+                hypervisor["id"]: hypervisor
+                for hypervisor in response["data"]["uniswapV3Hypervisors"]
+            }
 
         return {
             hypervisor["id"]: hypervisor
-            for hypervisor in response["data"]["uniswapV3Hypervisors"]
+            async for page in self.gamma_client.iter_entities(hypervisor_all_query)
+            for hypervisor in page
         }
 
     async def _get_pool_data(self, pools_params):
-        pool_query = """
-        query pool(
-            $poolAddress: String!
-            $baseLower: Int!
-            $baseUpper: Int!
-            $limitLower: Int!
-            $limitUpper: Int!
+        pool_template = """
+        ${prefix}pool: pool(id: $poolAddress){
+            id
+            tick
+            feeGrowthGlobal0X128
+            feeGrowthGlobal1X128
+        }
+        ${prefix}baseLower: ticks(
+            where: {
+            pool: $poolAddress
+            tickIdx: $baseLower
+            }
         ){
-            pool(id: $poolAddress){
-                id
-                tick
-                feeGrowthGlobal0X128
-                feeGrowthGlobal1X128
+            tickIdx
+            feeGrowthOutside0X128
+            feeGrowthOutside1X128
+        },
+        ${prefix}baseUpper: ticks(
+            where: {
+            pool: $poolAddress
+            tickIdx: $baseUpper
             }
-            baseLower: ticks(
-                where: {
-                pool: $poolAddress
-                tickIdx: $baseLower
-                }
-            ){
-                tickIdx
-                feeGrowthOutside0X128
-                feeGrowthOutside1X128
-            },
-            baseUpper: ticks(
-                where: {
-                pool: $poolAddress
-                tickIdx: $baseUpper
-                }
-            ){
-                tickIdx
-                feeGrowthOutside0X128
-                feeGrowthOutside1X128
-            },
-            limitLower: ticks(
-                where: {
-                pool: $poolAddress
-                tickIdx: $limitLower
-                }
-            ){
-                tickIdx
-                feeGrowthOutside0X128
-                feeGrowthOutside1X128
-            },
-            limitUpper: ticks(
-                where: {
-                pool: $poolAddress
-                tickIdx: $limitUpper
-                }
-            ){
-                tickIdx
-                feeGrowthOutside0X128
-                feeGrowthOutside1X128
+        ){
+            tickIdx
+            feeGrowthOutside0X128
+            feeGrowthOutside1X128
+        },
+        ${prefix}limitLower: ticks(
+            where: {
+            pool: $poolAddress
+            tickIdx: $limitLower
+            }
+        ){
+            tickIdx
+            feeGrowthOutside0X128
+            feeGrowthOutside1X128
+        },
+        ${prefix}limitUpper: ticks(
+            where: {
+            pool: $poolAddress
+            tickIdx: $limitUpper
             }
+        ){
+            tickIdx
+            feeGrowthOutside0X128
+            feeGrowthOutside1X128
         }
         """
 
-        pool_requests = [
-            self.uniswap_client.query(
-                pool_query,
+        responses = await self.uniswap_client.batch_query(
+            pool_template,
+            [
                 {
                     "poolAddress": params.address,
-                    "baseLower": params.baseLower,
-                    "baseUpper": params.baseUpper,
-                    "limitLower": params.limitLower,
-                    "limitUpper": params.limitUpper,
-                },
-            )
-            for params in pools_params
-        ]
-
-        responses = await asyncio.gather(*pool_requests)
+                    "baseLower": int(params.baseLower),
+                    "baseUpper": int(params.baseUpper),
+                    "limitLower": int(params.limitLower),
+                    "limitUpper": int(params.limitUpper),
+                }
+                for params in pools_params
+            ],
+        )
 
         return {
             self.tick_id(
@@ -197,7 +191,7 @@ class FeesData:
                 else 0,
             ): response["data"]
             for response in responses
-            if response["data"].get("pool", {}).get("id")
+            if (response["data"].get("pool") or {}).get("id")
         }
 
     async def _get_data(self, hypervisors=None):
@@ -1,12 +1,70 @@
 import asyncio
 from datetime import timedelta
 
-from v3data import GammaClient, DexFeeGrowthClient, LlamaClient
+from v3data import GammaClient, DexFeeGrowthClient
+from v3data.blocks import block_from_timestamp, block_index
 from v3data.utils import timestamp_ago, estimate_block_from_timestamp_diff
 from v3data.constants import BLOCK_TIME_SECONDS
 
 
 class YieldData:
+    # Pool and tick lookup at a block, batched with aliases by batch_query
+    pool_data_template = """
+        ${prefix}pool: pool(
+            id: $poolAddress
+            block: {number: $block}
+        ){
+            id
+            tick
+            feeGrowthGlobal0X128
+            feeGrowthGlobal1X128
+        }
+        ${prefix}baseLower: ticks(
+            block: {number: $block}
+            where: {
+            pool: $poolAddress
+            tickIdx: $baseLower
+            }
+        ){
+            tickIdx
+            feeGrowthOutside0X128
+            feeGrowthOutside1X128
+        },
+        ${prefix}baseUpper: ticks(
+            block: {number: $block}
+            where: {
+            pool: $poolAddress
+            tickIdx: $baseUpper
+            }
+        ){
+            tickIdx
+            feeGrowthOutside0X128
+            feeGrowthOutside1X128
+        },
+        ${prefix}limitLower: ticks(
+            block: {number: $block}
+            where: {
+            pool: $poolAddress
+            tickIdx: $limitLower
+            }
+        ){
+            tickIdx
+            feeGrowthOutside0X128
+            feeGrowthOutside1X128
+        },
+        ${prefix}limitUpper: ticks(
+            block: {number: $block}
+            where: {
+            pool: $poolAddress
+            tickIdx: $limitUpper
+            }
+        ){
+            tickIdx
+            feeGrowthOutside0X128
+            feeGrowthOutside1X128
+        }
+    """
+
     def __init__(
         self,
         period_days,
@@ -19,7 +77,6 @@ class YieldData:
         self.chain = chain
         self.gamma_client = GammaClient(protocol, chain)
         self.uniswap_client = DexFeeGrowthClient(protocol, chain)
-        self.llama_client = LlamaClient(chain)
         self.delay_buffer_seconds = (
             delay_buffer_seconds  # Buffer to account for subgraph being slightly behind
         )
@@ -73,18 +130,25 @@ class YieldData:
 
         variables = {"block": int(block), "ids": hypervisors}
 
-        response = await self.gamma_client.query(query, variables)
+        response = await self.gamma_client.query(
+            query, variables, pinned_block=int(block)
+        )
 
         return response
 
     async def _get_transition_data(self, period_days):
         transition_query = """
-        query transitions($timestamp_start: Int!, $timestamp_end: Int!){
+        query transitions(
+            $timestamp_start: Int!, $timestamp_end: Int!, $paginate: String!
+        ){
             uniswapV3Hypervisors(
                 first: 1000
+                orderBy: id
+                where: { id_gt: $paginate }
             ){
                 id
                 withdraws(
+                    first: 1000
                     where: {
                         timestamp_gt: $timestamp_start
                         timestamp_lt: $timestamp_end
@@ -94,6 +158,7 @@ class YieldData:
                     timestamp
                 }
                 rebalances(
+                    first: 1000
                     where: {
                         timestamp_gt: $timestamp_start
                         timestamp_lt: $timestamp_end
@@ -103,6 +168,7 @@ class YieldData:
                     timestamp
                 }
                 deposits(
+                    first: 1000
                     where: {
                         timestamp_gt: $timestamp_start
                         timestamp_lt: $timestamp_end
@@ -112,33 +178,24 @@ class YieldData:
                     timestamp
                 }
             }
-            _meta {
-                block {
-                    number
-                }
-            }
         }
         """
 
-        variables = {
-            "timestamp_start": timestamp_ago(
-                timedelta(days=period_days)
-                + timedelta(seconds=self.delay_buffer_seconds)
-            ),
-            "timestamp_end": timestamp_ago(
-                timedelta(seconds=self.delay_buffer_seconds)
-            ),
-        }
-        response = await self.gamma_client.query(transition_query, variables)
-
-        self._transition_data = response["data"]
+        await self._get_hypervisor_transactions(transition_query, period_days)
 
     async def _get_fee_update_data(self, period_days):
         query = """
-        query transitions($timestamp_start: Int!, $timestamp_end: Int!){
-            uniswapV3Hypervisors(first: 1000) {
+        query transitions(
+            $timestamp_start: Int!, $timestamp_end: Int!, $paginate: String!
+        ){
+            uniswapV3Hypervisors(
+                first: 1000
+                orderBy: id
+                where: { id_gt: $paginate }
+            ) {
                 id
                 feeUpdates(
+                    first: 1000
                     where: {
                         timestamp_gt: $timestamp_start
                         timestamp_lt: $timestamp_end}
@@ -147,14 +204,13 @@ class YieldData:
                     timestamp
                 }
             }
-            _meta {
-                block {
-                    number
-                }
-            }
         }
         """
 
+        await self._get_hypervisor_transactions(query, period_days)
+
+    async def _get_hypervisor_transactions(self, query, period_days):
+        """Page through the transactions of every hypervisor in the period"""
         variables = {
             "timestamp_start": timestamp_ago(
                 timedelta(days=period_days)
@@ -164,100 +220,46 @@ class YieldData:
                 timedelta(seconds=self.delay_buffer_seconds)
             ),
         }
-        response = await self.gamma_client.query(query, variables)
 
-        self._transition_data = response["data"]
-
-    async def _get_pool_data_at_block(
-        self, block, pool_address, base_lower, base_upper, limit_lower, limit_upper
-    ):
-        pool_query = """
-        query pool(
-            $block: Int!
-            $poolAddress: String!
-            $baseLower: Int!
-            $baseUpper: Int!
-            $limitLower: Int!
-            $limitUpper: Int!
-        ){
-            pool(
-                id: $poolAddress
-                block: {number: $block}
-            ){
-                id
-                tick
-                feeGrowthGlobal0X128
-                feeGrowthGlobal1X128
-            }
-            baseLower: ticks(
-                block: {number: $block}
-                where: {
-                pool: $poolAddress
-                tickIdx: $baseLower
-                }
-            ){
-                tickIdx
-                feeGrowthOutside0X128
-                feeGrowthOutside1X128
-            },
-            baseUpper: ticks(
-                block: {number: $block}
-                where: {
-                pool: $poolAddress
-                tickIdx: $baseUpper
-                }
-            ){
-                tickIdx
-                feeGrowthOutside0X128
-                feeGrowthOutside1X128
-            },
-            limitLower: ticks(
-                block: {number: $block}
-                where: {
-                pool: $poolAddress
-                tickIdx: $limitLower
-                }
-            ){
-                tickIdx
-                feeGrowthOutside0X128
-                feeGrowthOutside1X128
-            },
-            limitUpper: ticks(
-                block: {number: $block}
-                where: {
-                pool: $poolAddress
-                tickIdx: $limitUpper
-                }
-            ){
-                tickIdx
-                feeGrowthOutside0X128
-                feeGrowthOutside1X128
-            }
-        }
-        """
+        async def hypervisors():
+            return [
+                hypervisor
+                async for page in self.gamma_client.iter_entities(
+                    query, variables=variables
+                )
+                for hypervisor in page
+            ]
 
-        variables = {
-            "block": int(block),
-            "poolAddress": pool_address,
-            "baseLower": base_lower,
-            "baseUpper": base_upper,
-            "limitLower": limit_lower,
-            "limitUpper": limit_upper,
+        hypervisors, latest_block = await asyncio.gather(
+            hypervisors(), self.gamma_client.latest_block()
+        )
+        self._transition_data = {
+            "uniswapV3Hypervisors": hypervisors,
+            "_meta": {"block": {"number": latest_block}},
         }
 
-        response = await self.uniswap_client.query(pool_query, variables)
-
-        return response["data"]
-
     async def _get_block_timestamps(self):
         initial_timestamp = timestamp_ago(timedelta(days=self.period_days))
         current_timestamp = timestamp_ago(
             timedelta(seconds=self.delay_buffer_seconds)
         )  # Buffer as subgraph may not be indexed to latest
-        initial_block, current_block = await asyncio.gather(
-            self.llama_client.block_from_timestamp(initial_timestamp),
-            self.llama_client.block_from_timestamp(current_timestamp),
+
+        # Transactions in the window anchor the local block index
+        block_index.observe(
+            self.chain,
+            (
+                (tx["block"], tx["timestamp"])
+                for hypervisor in self._transition_data["uniswapV3Hypervisors"]
+                for tx_type in ["deposits", "withdraws", "rebalances", "feeUpdates"]
+                for tx in hypervisor.get(tx_type, [])
+            ),
         )
+        initial_time, current_time = await asyncio.gather(
+            block_from_timestamp(self.chain, initial_timestamp),
+            block_from_timestamp(self.chain, current_timestamp),
+        )
+        initial_block = initial_time.block if initial_time else None
+        current_block = current_time.block if current_time else None
 
         if not current_block:
             current_block = (
@@ -341,25 +343,28 @@ class YieldData:
 
     async def _get_pool_data_for_all_blocks(self):
         pool_query_params = [
-            {"block": block, "hypervisor": hypervisor}
+            {"block": int(block), "hypervisor": hypervisor}
             for block, hypervisors in self._hypervisor_data_by_blocks.items()
             for hypervisor in hypervisors
+            if (hypervisor.get("pool") or {}).get("id")
         ]
 
-        pool_requests = [
-            self._get_pool_data_at_block(
-                int(params["block"]),
-                params["hypervisor"]["pool"]["id"],
-                params["hypervisor"]["baseLower"],
-                params["hypervisor"]["baseUpper"],
-                params["hypervisor"]["limitLower"],
-                params["hypervisor"]["limitUpper"],
-            )
-            for params in pool_query_params
-            if params["hypervisor"].get("pool", {}).get("id")
-        ]
-
-        pool_responses = await asyncio.gather(*pool_requests)
+        pool_responses = await self.uniswap_client.batch_query(
+            self.pool_data_template,
+            [
+                {
+                    "block": params["block"],
+                    "poolAddress": params["hypervisor"]["pool"]["id"],
+                    "baseLower": int(params["hypervisor"]["baseLower"]),
+                    "baseUpper": int(params["hypervisor"]["baseUpper"]),
+                    "limitLower": int(params["hypervisor"]["limitLower"]),
+                    "limitUpper": int(params["hypervisor"]["limitUpper"]),
+                }
+                for params in pool_query_params
+            ],
+            pinned_blocks=[params["block"] for params in pool_query_params],
+        )
+        pool_data = [response["data"] for response in pool_responses]
 
         self._pool_data = {
             self.tick_id(
@@ -370,8 +375,8 @@ class YieldData:
                 response["limitLower"][0]["tickIdx"] if response["limitLower"] else 0,
                 response["limitUpper"][0]["tickIdx"] if response["limitUpper"] else 0,
             ): response
-            for index, response in enumerate(pool_responses)
-            if response.get("pool", {}).get("id")
+            for index, response in enumerate(pool_data)
+            if (response.get("pool") or {}).get("id")
         }
 
     async def get_data(self):
@@ -10,6 +10,63 @@ from v3data.hypes.fees_yield import FeesYield
 
 
 class ImpermanentDivergence(FeesYield):
+    # Pool and tick lookup at a block, batched with aliases by batch_query
+    pool_data_template = """
+        ${prefix}pool: pool(
+            id: $poolAddress
+            block: {number: $block}
+        ){
+            id
+            tick
+            feeGrowthGlobal0X128
+            feeGrowthGlobal1X128
+        }
+        ${prefix}baseLower: ticks(
+            block: {number: $block}
+            where: {
+            poolAddress: $poolAddress
+            tickIdx: $baseLower
+            }
+        ){
+            tickIdx
+            feeGrowthOutside0X128
+            feeGrowthOutside1X128
+        },
+        ${prefix}baseUpper: ticks(
+            block: {number: $block}
+            where: {
+            poolAddress: $poolAddress
+            tickIdx: $baseUpper
+            }
+        ){
+            tickIdx
+            feeGrowthOutside0X128
+            feeGrowthOutside1X128
+        },
+        ${prefix}limitLower: ticks(
+            block: {number: $block}
+            where: {
+            poolAddress: $poolAddress
+            tickIdx: $limitLower
+            }
+        ){
+            tickIdx
+            feeGrowthOutside0X128
+            feeGrowthOutside1X128
+        },
+        ${prefix}limitUpper: ticks(
+            block: {number: $block}
+            where: {
+            poolAddress: $poolAddress
+            tickIdx: $limitUpper
+            }
+        ){
+            tickIdx
+            feeGrowthOutside0X128
+            feeGrowthOutside1X128
+        }
+    """
+
     async def _get_hypervisor_data_at_block(self, block, hypervisors=None):
 
         if hypervisors:
@@ -110,91 +167,12 @@ class ImpermanentDivergence(FeesYield):
                     """
             variables = {"block": int(block)}
 
-        response = await self.gamma_client.query(query, variables)
+        response = await self.gamma_client.query(
+            query, variables, pinned_block=int(block)
+        )
 
         return response
 
-    async def _get_pool_data_at_block(
-        self, block, pool_address, base_lower, base_upper, limit_lower, limit_upper
-    ):
-        pool_query = """
-        query pool(
-            $block: Int!
-            $poolAddress: String!
-            $baseLower: Int!
-            $baseUpper: Int!
-            $limitLower: Int!
-            $limitUpper: Int!
-        ){
-            pool(
-                id: $poolAddress
-                block: {number: $block}
-            ){
-                id
-                tick
-                feeGrowthGlobal0X128
-                feeGrowthGlobal1X128
-            }
-            baseLower: ticks(
-                block: {number: $block}
-                where: {
-                poolAddress: $poolAddress
-                tickIdx: $baseLower
-                }
-            ){
-                tickIdx
-                feeGrowthOutside0X128
-                feeGrowthOutside1X128
-            },
-            baseUpper: ticks(
-                block: {number: $block}
-                where: {
-                poolAddress: $poolAddress
-                tickIdx: $baseUpper
-                }
-            ){
-                tickIdx
-                feeGrowthOutside0X128
-                feeGrowthOutside1X128
-            },
-            limitLower: ticks(
-                block: {number: $block}
-                where: {
-                poolAddress: $poolAddress
-                tickIdx: $limitLower
-                }
-            ){
-                tickIdx
-                feeGrowthOutside0X128
-                feeGrowthOutside1X128
-            },
-            limitUpper: ticks(
-                block: {number: $block}
-                where: {
-                poolAddress: $poolAddress
-                tickIdx: $limitUpper
-                }
-            ){
-                tickIdx
-                feeGrowthOutside0X128
-                feeGrowthOutside1X128
-            }
-        }
-        """
-
-        variables = {
-            "block": int(block),
-            "poolAddress": pool_address,
-            "baseLower": base_lower,
-            "baseUpper": base_upper,
-            "limitLower": limit_lower,
-            "limitUpper": limit_upper,
-        }
-
-        response = await self.uniswap_client.query(pool_query, variables)
-
-        return response["data"]
-
     async def get_impermanent_data(self, get_data=True):
 
         if get_data:
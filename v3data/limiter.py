@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+import httpx
+
+from v3data.config import (
+    SUBGRAPH_CONCURRENCY_INITIAL,
+    SUBGRAPH_CONCURRENCY_MAX,
+    SUBGRAPH_CONCURRENCY_MIN,
+    SUBGRAPH_LATENCY_SPIKE_FACTOR,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit for one endpoint
+
+    The limit grows by one for every limit's worth of healthy responses and is
+    halved on throttling, server errors, timeouts or latency spikes. Spikes are
+    measured against the smoothed latency of the same query, as cheap _meta
+    probes and heavy snapshot queries share an endpoint. Callers over the
+    limit wait in FIFO order.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int = SUBGRAPH_CONCURRENCY_INITIAL,
+        minimum: int = SUBGRAPH_CONCURRENCY_MIN,
+        maximum: int = SUBGRAPH_CONCURRENCY_MAX,
+        spike_factor: float = SUBGRAPH_LATENCY_SPIKE_FACTOR,
+    ):
+        self.name = name
+        self.minimum = minimum
+        self.maximum = maximum
+        self.spike_factor = spike_factor
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self.latency = None  # Smoothed latency of all responses
+        self.latencies: dict[str, float] = {}  # Smoothed latency by query
+        self.decreases = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over just before cancellation, pass it on
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def on_success(self, elapsed: float, query: str = "") -> None:
+        baseline = self.latencies.get(query)
+        spike = baseline is not None and elapsed > baseline * self.spike_factor
+        # Spikes move the baseline too, more slowly, so a lasting change in
+        # latency stops counting as a spike after a few responses
+        weight = 0.05 if spike else 0.2
+        self.latencies[query] = (
+            elapsed if baseline is None else (1 - weight) * baseline + weight * elapsed
+        )
+        self.latency = (
+            elapsed if self.latency is None else 0.8 * self.latency + 0.2 * elapsed
+        )
+        if spike:
+            self.on_overload(f"latency spike {elapsed:.2f}s on {query or 'request'}")
+            return
+
+        self.limit = min(self.limit + 1 / self.limit, self.maximum)
+        self._wake()
+
+    def on_overload(self, reason: str) -> None:
+        # Requests already in flight when the limit is cut report the same
+        # overload, so back off at most once per smoothed round trip
+        now = time.monotonic()
+        if now - self._last_decrease < (self.latency or 0):
+            return
+
+        self._last_decrease = now
+        self.limit = max(self.limit / 2, self.minimum)
+        self.decreases += 1
+        logger.warning(
+            f"Backing off {self.name} to {int(self.limit)} concurrent requests: {reason}"
+        )
+
+    async def request(self, send, *args, query: str = "", **kwargs) -> httpx.Response:
+        """Send a request within the limit, send being e.g. async_client.post
+
+        query names the kind of request, e.g. its metrics query label, to
+        compare its latency with earlier ones of the same kind.
+        """
+        await self.acquire()
+        start = time.monotonic()
+        try:
+            response = await send(*args, **kwargs)
+        except (httpx.TimeoutException, httpx.NetworkError) as e:
+            self.on_overload(type(e).__name__)
+            raise
+        finally:
+            self.release()
+
+        if response.status_code == 429 or response.status_code >= 500:
+            self.on_overload(f"HTTP {response.status_code}")
+        else:
+            self.on_success(time.monotonic() - start, query)
+
+        return response
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        query: str = "",
+        **kwargs,
+    ):
+        """Stream a response within the limit, holding the slot until it is read"""
+        await self.acquire()
+        start = time.monotonic()
+        try:
+            async with client.stream(method, url, **kwargs) as response:
+                if response.status_code == 429 or response.status_code >= 500:
+                    self.on_overload(f"HTTP {response.status_code}")
+                else:
+                    self.on_success(time.monotonic() - start, query)
+                yield response
+        except (httpx.TimeoutException, httpx.NetworkError) as e:
+            self.on_overload(type(e).__name__)
+            raise
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "inFlight": self.in_flight,
+            "queued": self.queued,
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "decreases": self.decreases,
+        }
+
+
+_limiters: dict[str, AdaptiveLimiter] = {}
+
+
+def limiter_for(name: str) -> AdaptiveLimiter:
+    """Limiter for an endpoint, shared by all clients in the worker
+
+    name is logged and served by the status endpoint, so it must not contain
+    credentials such as API keys in RPC URLs.
+    """
+    if name not in _limiters:
+        _limiters[name] = AdaptiveLimiter(name)
+    return _limiters[name]
+
+
+def limiter_stats() -> dict:
+    return {name: limiter.stats() for name, limiter in _limiters.items()}
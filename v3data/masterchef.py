@@ -1,5 +1,6 @@
 from v3data import GammaClient, MasterChefContract
 from v3data.constants import YEAR_SECONDS
+from v3data.multicall import Multicall
 from v3data.pricing import token_price_from_address
 
 
@@ -134,13 +135,23 @@ class UserRewards(MasterchefData):
         if not self.data:
             return {}
 
+        pending_rewards = await self._get_pending_rewards(
+            [
+                (
+                    pool["masterChefPool"]["masterChef"]["id"],
+                    int(pool["masterChefPool"]["poolId"]),
+                )
+                for pool in self.data["masterChefPoolAccounts"]
+            ]
+        )
+
         info = {}
-        for pool in self.data["masterChefPoolAccounts"]:
+        for pool, pending_reward in zip(
+            self.data["masterChefPoolAccounts"], pending_rewards
+        ):
             hypervisor_id = pool["masterChefPool"]["hypervisor"]["id"]
             hypervisor_symbol = pool["masterChefPool"]["hypervisor"]["symbol"]
             hypervisor_decimal = 18
-            masterchef_id = pool["masterChefPool"]["masterChef"]["id"]
-            pool_id = int(pool["masterChefPool"]["poolId"])
             reward_token_id = pool["masterChefPool"]["masterChef"]["rewardToken"]["id"]
             reward_token_symbol = pool["masterChefPool"]["masterChef"]["rewardToken"][
                 "symbol"
@@ -153,16 +164,23 @@ class UserRewards(MasterchefData):
                 info[hypervisor_id] = {"hypervisorSymbol": hypervisor_symbol}
             info[hypervisor_id][reward_token_id] = {
                 "stakedAmount": int(pool["amount"]) / 10**hypervisor_decimal,
-                "pendingRewards": self._get_pending_reward(
-                    masterchef_id,
-                    pool_id,
-                )
-                / 10**reward_decimals,
+                "pendingRewards": (
+                    pending_reward / 10**reward_decimals
+                    if pending_reward is not None
+                    else None
+                ),
                 "rewardTokenSymbol": reward_token_symbol,
             }
 
         return info
 
-    def _get_pending_reward(self, masterchef, pool_id):
-        masterchef_contract = MasterChefContract(masterchef, self.chain)
-        return masterchef_contract.pending_rewards(pool_id, self.user_address).call()
+    async def _get_pending_rewards(self, pools: list[tuple[str, int]]) -> list:
+        """Pending rewards of (masterchef, pool_id) pairs in one multicall"""
+        return await Multicall(self.chain).call(
+            [
+                MasterChefContract(masterchef, self.chain).pending_rewards(
+                    pool_id, self.user_address
+                )
+                for masterchef, pool_id in pools
+            ]
+        )
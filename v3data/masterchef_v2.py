@@ -1,4 +1,4 @@
-from v3data import GammaClient, RewarderContract
+from v3data import GammaClient
 from v3data.constants import YEAR_SECONDS
 from v3data.pricing import token_price_from_address
 from v3data.config import DISABLE_POOL_APR
@@ -288,7 +288,3 @@ class UserRewardsV2(MasterchefV2Data):
                 )
 
         return {"stakes": info}
-
-    def _get_pending_reward(self, rewarder, pool_id):
-        masterchef_contract = RewarderContract(rewarder, self.chain)
-        return masterchef_contract.pending_rewards(pool_id, self.user_address).call()
@@ -0,0 +1,108 @@
+import os
+import re
+from contextvars import ContextVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from starlette.routing import Match
+
+# Route template of the API request being served, e.g. /hypervisors/allData
+current_route: ContextVar[str] = ContextVar("current_route", default="")
+
+LABELS = ["service", "chain", "protocol", "query", "route"]
+
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_seconds",
+    "Latency of requests to subgraphs and price/block APIs",
+    LABELS,
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 180),
+)
+UPSTREAM_BYTES = Counter(
+    "upstream_response_bytes",
+    "Bytes received from subgraphs and price/block APIs",
+    LABELS,
+)
+UPSTREAM_ERRORS = Counter(
+    "upstream_errors",
+    "Failed requests to subgraphs and price/block APIs",
+    [*LABELS, "error"],
+)
+SUBGRAPH_PAGES = Counter(
+    "subgraph_pages",
+    "Pages fetched by paginated subgraph queries",
+    LABELS,
+)
+PREWARM_SECONDS = Histogram(
+    "prewarm_refresh_seconds",
+    "Duration of background refreshes of cached routes",
+    ["route"],
+    buckets=(1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+RESPONSE_CACHE_LOOKUPS = Counter(
+    "response_cache_lookups",
+    "Response cache lookups by result, hit or miss",
+    ["result"],
+)
+RESPONSE_CACHE_EVICTIONS = Counter(
+    "response_cache_evictions",
+    "Response cache entries evicted, by reason",
+    ["reason"],
+)
+
+_operation_name = re.compile(r"^\s*(?:query|subscription)\s+(\w+)")
+# First top level field, skipping its alias, as aliases such as those of
+# batched lookups (b0_pool, b1_pool, ...) would make label values unbounded
+_first_field = re.compile(r"\{\s*(?:\w+\s*:\s*)?(\w+)")
+
+
+def query_name(query: str) -> str:
+    """Logical name of a GraphQL query, its operation name or first field"""
+    match = _operation_name.match(query) or _first_field.search(query)
+    return match.group(1) if match else "unknown"
+
+
+def labels(service: str, chain: str = "", protocol: str = "", query: str = "") -> dict:
+    return {
+        "service": service,
+        "chain": chain,
+        "protocol": protocol,
+        "query": query,
+        "route": current_route.get(),
+    }
+
+
+def record_request(
+    request_labels: dict, seconds: float, size: int, error: str | None = None
+) -> None:
+    UPSTREAM_LATENCY.labels(**request_labels).observe(seconds)
+    UPSTREAM_BYTES.labels(**request_labels).inc(size)
+    if error:
+        record_error(request_labels, error)
+
+
+def record_error(request_labels: dict, error: str) -> None:
+    UPSTREAM_ERRORS.labels(**request_labels, error=error).inc()
+
+
+def route_template(app, scope) -> str:
+    """Route path template matching the request, to keep label values bounded"""
+    for route in app.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+def latest_metrics() -> tuple[bytes, str]:
+    """Metrics of all workers when running multiprocess under gunicorn"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
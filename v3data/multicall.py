@@ -0,0 +1,57 @@
+import logging
+
+from eth_abi import decode_abi, encode_abi
+from eth_utils import function_signature_to_4byte_selector
+from web3.contract import ContractFunction
+
+from v3data import RpcClient
+
+logger = logging.getLogger(__name__)
+
+# Multicall3, deployed at the same address on all supported chains
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+TRY_AGGREGATE_SELECTOR = function_signature_to_4byte_selector(
+    "tryAggregate(bool,(address,bytes)[])"
+)
+
+
+class Multicall:
+    """Batch contract reads into a single eth_call through Multicall3"""
+
+    def __init__(self, chain: str):
+        self.chain = chain
+        self.rpc_client = RpcClient(chain)
+
+    async def call(self, functions: list[ContractFunction], block="latest") -> list:
+        """Results of the contract functions in order, None for reverted calls
+
+        Functions are built from web3 contracts with their arguments, e.g.
+        contract.functions.pendingToken(pool_id, user), and are not called.
+        """
+        if not functions:
+            return []
+
+        calls = [
+            (function.address, bytes.fromhex(function._encode_transaction_data()[2:]))
+            for function in functions
+        ]
+        data = TRY_AGGREGATE_SELECTOR + encode_abi(
+            ["bool", "(address,bytes)[]"], [False, calls]
+        )
+        result = await self.rpc_client.eth_call(
+            MULTICALL3_ADDRESS, "0x" + data.hex(), block
+        )
+        (returns,) = decode_abi(["(bool,bytes)[]"], bytes.fromhex(result[2:]))
+
+        results = []
+        for function, (success, return_data) in zip(functions, returns):
+            if not success:
+                logger.warning(f"{function.fn_name} reverted on {function.address}")
+                results.append(None)
+                continue
+
+            output_types = [output["type"] for output in function.abi["outputs"]]
+            values = decode_abi(output_types, return_data)
+            results.append(values[0] if len(values) == 1 else values)
+
+        return results
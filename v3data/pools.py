@@ -1,14 +1,18 @@
 import datetime
 from urllib import response
 from v3data import UniswapV3Client
+from v3data.config import SUBGRAPH_PAGINATE_SHARDS
+from v3data.constants import PROTOCOL_UNISWAP_V3
 from v3data.data import UniV3Data
+from v3data.token_list import token_list
 from v3data.utils import sqrtPriceX96_to_priceDecimal
 
 
 async def pools_from_symbol(symbol):
-    client = UniV3Data()
-    token_list = client.get_token_list()
-    token_addresses = token_list.get(symbol.upper())
+    client = UniV3Data(PROTOCOL_UNISWAP_V3, "mainnet")
+    token_addresses = await token_list.addresses(symbol)
+    if not token_addresses:
+        return []
     pool_list = await client.get_pools_by_tokens(token_addresses)
 
     pools = [
@@ -32,7 +36,12 @@ class Pool:
 
     async def swap_prices(self, pool_address, time_delta=None):
         query = """
-        query poolPrices($pool: String!, $timestampStart: Int!, $paginate: String!){
+        query poolPrices(
+            $pool: String!
+            $timestampStart: Int!
+            $paginate: String!
+            $paginateEnd: String!
+        ){
             swaps(
                 first: 1000
                 pool: $pool
@@ -41,6 +50,7 @@ class Pool:
                 where: {
                     timestamp_gte: $timestampStart
                     id_gt: $paginate
+                    id_lt: $paginateEnd
                 }
             ){
                 id
@@ -61,9 +71,13 @@ class Pool:
         variables = {
             "pool": pool_address,
             "timestampStart": timestamp_start,
-            "paginate": "",
         }
-        data = await self.client.paginate_query(query, "id", variables)
+        data = await self.client.paginate_query(
+            query,
+            "id",
+            variables,
+            shards=self.client.id_shards(SUBGRAPH_PAGINATE_SHARDS),
+        )
         return data
 
     async def hourly_prices(self, pools, hours):
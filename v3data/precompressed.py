@@ -0,0 +1,93 @@
+import gzip
+import json
+import struct
+from contextvars import ContextVar
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from fastapi_cache.coder import Coder
+
+from v3data.etag import merge_sources, source_blocks
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Accept-Encoding of the API request being served
+accepted_encodings: ContextVar[str] = ContextVar("accepted_encodings", default="")
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+_header = struct.Struct("!IIII")
+
+
+def parse_accept_encoding(header: str) -> set[str]:
+    """Encodings accepted by a client, ignoring those with q=0"""
+    encodings = set()
+    for item in header.lower().split(","):
+        encoding, _, params = item.partition(";")
+        params = params.replace(" ", "")
+        try:
+            quality = float(params[2:]) if params.startswith("q=") else 1
+        except ValueError:
+            quality = 0
+        if encoding.strip() and quality > 0:
+            encodings.add(encoding.strip())
+    return encodings
+
+
+class PrecompressedJsonCoder(Coder):
+    """Cache route responses as final JSON bytes with gzip and brotli variants
+
+    Cache hits are returned as a Response carrying the variant matching the
+    request's Accept-Encoding, so identical payloads are neither re-serialized
+    nor re-compressed. The source blocks of the response are kept alongside.
+    Only for route endpoints, cached functions called from other code need a
+    coder decoding to Python objects.
+    """
+
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        sources = source_blocks.get()
+        sources = json.dumps(sources.to_dict() if sources else None).encode()
+        body = JSONResponse(jsonable_encoder(value)).body
+        gzipped = gzip.compress(body, GZIP_LEVEL)
+        brotlied = brotli.compress(body, quality=BROTLI_QUALITY) if brotli else b""
+        return (
+            _header.pack(len(sources), len(body), len(gzipped), len(brotlied))
+            + sources
+            + body
+            + gzipped
+            + brotlied
+        )
+
+    @classmethod
+    def decode(cls, value: bytes) -> Response:
+        sources_size, body_size, gzip_size, brotli_size = _header.unpack_from(value)
+        offset = _header.size + sources_size
+        merge_sources(json.loads(value[_header.size : offset]))
+
+        variants = {}
+        for encoding, size in [
+            ("identity", body_size),
+            ("gzip", gzip_size),
+            ("br", brotli_size),
+        ]:
+            if size:
+                variants[encoding] = value[offset : offset + size]
+            offset += size
+
+        encodings = parse_accept_encoding(accepted_encodings.get())
+        headers = {"Vary": "Accept-Encoding"}
+        for encoding in ["br", "gzip"]:
+            if encoding in encodings and encoding in variants:
+                headers["Content-Encoding"] = encoding
+                return Response(
+                    variants[encoding], media_type="application/json", headers=headers
+                )
+
+        return Response(
+            variants["identity"], media_type="application/json", headers=headers
+        )
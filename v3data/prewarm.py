@@ -0,0 +1,200 @@
+import asyncio
+import fcntl
+import inspect
+import logging
+import os
+import time
+
+from fastapi import FastAPI, Request, Response
+from fastapi.routing import APIRoute
+from fastapi_cache import FastAPICache
+
+from v3data.cache_backend import CacheSettings
+from v3data.config import PREWARM_CONCURRENCY, PREWARM_TTL_FRACTION
+from v3data.etag import SourceBlocks, source_blocks
+from v3data.head_watcher import HeadWatcher
+from v3data.metrics import PREWARM_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Cached routes too slow to compute on a user request, for every chain router
+PREWARM_PATHS = [
+    "/hypervisors/allData",
+    "/hypervisors/feeReturns/daily",
+    "/hypervisors/feeReturns/weekly",
+    "/hypervisors/feeReturns/monthly",
+    "/dashboard",
+    "/charts/baseRange/all",
+]
+LEADER_RETRY_SECONDS = 30
+
+
+class Prewarmer:
+    """Recompute expensive cached routes before their cache entries expire
+
+    Each route is refreshed every PREWARM_TTL_FRACTION of its cache TTL with
+    its default parameters, and the result is written under the same key the
+    @cache decorator reads, so requests keep getting the previous value until
+    the new one replaces it. With a shared cache backend only the worker
+    holding lock_path refreshes.
+
+    Given a HeadWatcher, routes are also refreshed as soon as the heads of
+    the chains their data came from advance. Backends keep serving the keys
+    of refreshed routes until their TTL meanwhile, rather than treating them
+    as stale when the heads advance.
+    """
+
+    def __init__(
+        self,
+        app: FastAPI,
+        lock_path: str | None = None,
+        heads: HeadWatcher | None = None,
+    ):
+        self.app = app
+        self.lock_path = lock_path
+        self.heads = heads
+        self.stats = {}
+        # Heads of the chains the last result of each route came from
+        self._tags: dict[str, dict[str, int]] = {}
+        self._lock_file = None
+        self._semaphore = asyncio.Semaphore(PREWARM_CONCURRENCY)
+        self._tasks: list[asyncio.Task] = []
+
+    def routes(self) -> list[APIRoute]:
+        return [
+            route
+            for route in self.app.routes
+            if isinstance(route, APIRoute)
+            and any(route.path.endswith(path) for path in PREWARM_PATHS)
+            and not route.param_convertors
+            and hasattr(route.endpoint, "cache_settings")
+        ]
+
+    def start(self) -> None:
+        self._tasks.append(asyncio.ensure_future(self._lead()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _lead(self) -> None:
+        while not self._acquire_leadership():
+            await asyncio.sleep(LEADER_RETRY_SECONDS)
+
+        routes = self.routes()
+        logger.info(f"Prewarming {len(routes)} routes")
+        self._tasks.extend(asyncio.ensure_future(self._run(route)) for route in routes)
+
+    def _acquire_leadership(self) -> bool:
+        if not self.lock_path:
+            return True
+
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        lock_file = open(self.lock_path, "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        # Held until the worker exits
+        self._lock_file = lock_file
+        return True
+
+    def keys(self) -> set[str]:
+        """Cache keys of the routes refreshed with their default parameters"""
+        return {cache_key(route.endpoint) for route in self.routes()}
+
+    async def _run(self, route: APIRoute) -> None:
+        interval = _expire(route.endpoint.cache_settings) * PREWARM_TTL_FRACTION
+        while True:
+            await self.refresh(route)
+            await self._wait(route, interval)
+
+    async def _wait(self, route: APIRoute, interval: float) -> None:
+        """Sleep until interval has passed, or until the heads of the chains
+        the last result of route came from advance"""
+        deadline = time.monotonic() + interval
+        tags = self._tags.get(route.path)
+        if not self.heads or not tags:
+            await asyncio.sleep(interval)
+            return
+
+        while time.monotonic() < deadline:
+            await asyncio.sleep(
+                min(self.heads.interval, max(deadline - time.monotonic(), 0))
+            )
+            if self.heads.advanced(tags):
+                return
+
+    async def refresh(self, route: APIRoute) -> None:
+        """Compute route with default parameters and store it in the cache"""
+        func = route.endpoint.__wrapped__
+        kwargs = _default_kwargs(func)
+        call_kwargs = dict(kwargs)
+        for name, parameter in inspect.signature(func).parameters.items():
+            if parameter.annotation is Response:
+                call_kwargs[name] = Response()
+
+        async with self._semaphore:
+            start = time.monotonic()
+            # Collects the source blocks stored with the result
+            sources_token = source_blocks.set(SourceBlocks())
+            try:
+                result = await func(**call_kwargs)
+                await cache_result(route.endpoint, result, kwargs)
+                if self.heads:
+                    self._tags[route.path] = self.heads.tags()
+                error = None
+            except Exception as e:
+                logger.warning(f"Prewarming {route.path} failed: {e}")
+                error = str(e)
+            finally:
+                source_blocks.reset(sources_token)
+            seconds = time.monotonic() - start
+
+        PREWARM_SECONDS.labels(route=route.path).observe(seconds)
+        self.stats[route.path] = {
+            "seconds": seconds,
+            "refreshedAt": int(time.time()),
+            "error": error,
+        }
+
+
+async def cache_result(endpoint, result, kwargs: dict | None = None) -> None:
+    """Store result under the key the @cache decorator of endpoint reads when
+    called with kwargs, by default its default parameters"""
+    settings: CacheSettings = endpoint.cache_settings
+    coder = settings.coder or FastAPICache.get_coder()
+    key = cache_key(endpoint, kwargs)
+    # Serializing and compressing large payloads would block requests
+    value = await asyncio.to_thread(coder.encode, result)
+    await FastAPICache.get_backend().set(key, value, _expire(settings))
+
+
+def cache_key(endpoint, kwargs: dict | None = None) -> str:
+    """Key the @cache decorator of endpoint reads when called with kwargs, by
+    default its default parameters"""
+    settings: CacheSettings = endpoint.cache_settings
+    func = endpoint.__wrapped__
+    if kwargs is None:
+        kwargs = _default_kwargs(func)
+    key_builder = settings.key_builder or FastAPICache.get_key_builder()
+    return key_builder(
+        func, settings.namespace, request=None, response=None, args=(), kwargs=kwargs
+    )
+
+
+def _default_kwargs(func) -> dict:
+    """Default values of the parameters of func that are part of its cache key"""
+    return {
+        name: parameter.default
+        for name, parameter in inspect.signature(func).parameters.items()
+        if parameter.annotation not in (Request, Response)
+    }
+
+
+def _expire(settings: CacheSettings) -> int:
+    return int(settings.expire or FastAPICache.get_expire())
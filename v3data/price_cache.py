@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+from v3data.config import PRICE_CACHE_MAX_STALE, PRICE_CACHE_TTL
+from v3data.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class PriceCache:
+    """Prices shared across requests, keyed by (chain, token)
+
+    A price younger than ttl is served as is. Up to max_stale seconds past
+    that it is still served while a single background fetch refreshes it,
+    older prices are fetched before returning. Concurrent fetches of the
+    same key are coalesced. Callers may give a key its own ttl and max_stale,
+    e.g. shorter ones for fallback sources.
+    """
+
+    def __init__(
+        self, ttl: float = PRICE_CACHE_TTL, max_stale: float = PRICE_CACHE_MAX_STALE
+    ):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._prices: dict[Hashable, tuple[Any, float]] = {}
+        self._fetches = SingleFlight()
+        self._background: set[asyncio.Task] = set()
+
+    async def get(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable],
+        ttl: float | None = None,
+        max_stale: float | None = None,
+    ) -> tuple[Any, float]:
+        """(price, age in seconds) of key, calling fetch when it is missing or stale"""
+        ttl = self.ttl if ttl is None else ttl
+        max_stale = self.max_stale if max_stale is None else max_stale
+        cached = self._prices.get(key)
+        if cached:
+            price, fetched_at = cached
+            age = time.time() - fetched_at
+            if age < ttl:
+                return price, age
+            if age < ttl + max_stale:
+                self._revalidate(key, fetch)
+                return price, age
+
+        price = await self._fetch(key, fetch)
+        return price, time.time() - self._prices[key][1]
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable]):
+        async def fetch_and_store():
+            price = await fetch()
+            self._prices[key] = (price, time.time())
+            return price
+
+        return await self._fetches.do(key, fetch_and_store)
+
+    def _revalidate(self, key: Hashable, fetch: Callable[[], Awaitable]) -> None:
+        task = asyncio.ensure_future(self._fetch(key, fetch))
+        self._background.add(task)
+        task.add_done_callback(self._revalidated)
+
+    def _revalidated(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Price refresh failed: {task.exception()}")
+
+
+prices = PriceCache()
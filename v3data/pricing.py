@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 
 from v3data import UniswapV3Client
+from v3data.price_cache import prices
 from v3data.utils import sqrtPriceX96_to_priceDecimal
 
 
@@ -152,7 +153,8 @@ async def token_price(token: str):
         return None
 
     pricing = UniV3Price("mainnet", "uniswap_v3", pool_address)
-    return await pricing.output()
+    price, age = await prices.get(("mainnet", token), pricing.output)
+    return {**price, "age": age}
 
 
 async def token_price_from_address(chain: str, token_address: str):
@@ -204,7 +206,11 @@ async def token_price_from_address(chain: str, token_address: str):
 
     if config:
         pricing = UniV3Price(chain, config["protocol"], config["pool_address"])
-        price = await pricing.output(inverse=config["inverse"])
+        price, age = await prices.get(
+            (chain, token_address),
+            lambda: pricing.output(inverse=config["inverse"]),
+        )
+        price = {**price, "age": age}
     else:
         price = {
             "token_in_usdc": 0,
@@ -0,0 +1,59 @@
+"""Local stand-in for The Graph serving recorded subgraph responses
+
+Record fixtures by running the service with SUBGRAPH_RECORD=true, then serve
+them with
+
+    uvicorn v3data.replay:app --port 8001
+
+and point the service at it with SUBGRAPH_REPLAY_URL=http://localhost:8001.
+REPLAY_LATENCY_MS and REPLAY_JITTER_MS add a delay to every response.
+"""
+
+import asyncio
+import logging
+import random
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from v3data.config import REPLAY_JITTER_MS, REPLAY_LATENCY_MS, SUBGRAPH_FIXTURE_DIR
+from v3data.fixtures import FixtureStore
+
+logger = logging.getLogger(__name__)
+
+
+def create_app(
+    fixture_dir: str = SUBGRAPH_FIXTURE_DIR,
+    latency_ms: float = REPLAY_LATENCY_MS,
+    jitter_ms: float = REPLAY_JITTER_MS,
+) -> FastAPI:
+    replay_app = FastAPI()
+    fixtures = FixtureStore(fixture_dir)
+
+    @replay_app.post("/{path:path}")
+    async def replay(path: str, request: Request):
+        body = await request.json()
+
+        delay_ms = latency_ms + random.uniform(0, jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+
+        response = await asyncio.to_thread(
+            fixtures.load,
+            str(request.url),
+            body.get("query", ""),
+            body.get("variables"),
+        )
+        if response is None:
+            logger.warning(f"No fixture recorded for /{path}")
+            return JSONResponse(
+                {"errors": [{"message": f"No fixture recorded for /{path}"}]},
+                status_code=404,
+            )
+
+        return JSONResponse(response)
+
+    return replay_app
+
+
+app = create_app()
@@ -4,8 +4,13 @@ import v3data.common.hypervisor
 import v3data.common.users
 
 from fastapi import APIRouter, Response
-from fastapi_cache.decorator import cache
-from v3data.config import APY_CACHE_TIMEOUT, ALLDATA_CACHE_TIMEOUT
+from v3data.cache_backend import cache
+from v3data.config import (
+    APY_CACHE_TIMEOUT,
+    ALLDATA_CACHE_TIMEOUT,
+    CHARTS_CACHE_TIMEOUT,
+)
+from v3data.precompressed import PrecompressedJsonCoder
 from v3data.constants import PROTOCOL_UNISWAP_V3
 
 CHAIN_ARBITRUM = "arbitrum"
@@ -31,7 +36,7 @@ async def bollingerbands_chart(poolAddress: str, periodHours: int = 24):
 
 
 @router.get("/charts/baseRange/all")
-# @cache(expire=CHARTS_CACHE_TIMEOUT)
+@cache(expire=CHARTS_CACHE_TIMEOUT, coder=PrecompressedJsonCoder)
 async def base_range_chart_all(days: int = 20):
     return await v3data.common.charts.base_range_chart_all(
         PROTOCOL_UNISWAP_V3, CHAIN_ARBITRUM, days
@@ -93,7 +98,7 @@ async def hypervisors_return():
 
 
 @router.get("/hypervisors/allData")
-@cache(expire=ALLDATA_CACHE_TIMEOUT)
+@cache(expire=ALLDATA_CACHE_TIMEOUT, coder=PrecompressedJsonCoder)
 async def hypervisors_all():
     return await v3data.common.hypervisor.hypervisors_all(
         PROTOCOL_UNISWAP_V3, CHAIN_ARBITRUM
@@ -4,9 +4,10 @@ import v3data.common.hypervisor
 import v3data.common.users
 
 from fastapi import APIRouter, Response, status
-from fastapi_cache.decorator import cache
+from v3data.cache_backend import cache
 from v3data.config import (
     APY_CACHE_TIMEOUT,
+    CHARTS_CACHE_TIMEOUT,
     DASHBOARD_CACHE_TIMEOUT,
     DEFAULT_TIMEZONE,
 )
@@ -14,6 +15,7 @@ from v3data.dashboard import Dashboard
 from v3data.eth import EthDistribution
 
 from v3data.gamma import GammaDistribution, GammaInfo, GammaYield
+from v3data.precompressed import PrecompressedJsonCoder
 from v3data.constants import PROTOCOL_UNISWAP_V3
 
 
@@ -44,7 +46,7 @@ async def bollingerbands_chart(poolAddress: str, periodHours: int = 24):
 
 
 @router.get("/charts/baseRange/all")
-# @cache(expire=CHARTS_CACHE_TIMEOUT)
+@cache(expire=CHARTS_CACHE_TIMEOUT, coder=PrecompressedJsonCoder)
 async def base_range_chart_all(days: int = 20):
     return await v3data.common.charts.base_range_chart_all(
         PROTOCOL_UNISWAP_V3, CHAIN_MAINNET, days
@@ -117,7 +119,7 @@ async def hypervisors_return():
 
 
 @router.get("/hypervisors/allData")
-@cache(expire=APY_CACHE_TIMEOUT)
+@cache(expire=APY_CACHE_TIMEOUT, coder=PrecompressedJsonCoder)
 async def hypervisors_all():
     return await v3data.common.hypervisor.hypervisors_all(
         PROTOCOL_UNISWAP_V3, CHAIN_MAINNET
@@ -135,7 +137,7 @@ async def uncollected_fees_all():
 @cache(expire=APY_CACHE_TIMEOUT)
 async def fee_returns_daily():
     return await v3data.common.hypervisor.fee_returns_fg(
-        PROTOCOL_UNISWAP_V3, CHAIN_MAINNET, 1
+        PROTOCOL_UNISWAP_V3, CHAIN_MAINNET, 1, FEE_RETURN_ROUTES
     )
 
 
@@ -143,7 +145,7 @@ async def fee_returns_daily():
 @cache(expire=APY_CACHE_TIMEOUT)
 async def fee_returns_weekly():
     return await v3data.common.hypervisor.fee_returns_fg(
-        PROTOCOL_UNISWAP_V3, CHAIN_MAINNET, 7
+        PROTOCOL_UNISWAP_V3, CHAIN_MAINNET, 7, FEE_RETURN_ROUTES
     )
 
 
@@ -151,10 +153,18 @@ async def fee_returns_weekly():
 @cache(expire=APY_CACHE_TIMEOUT)
 async def fee_returns_monthly():
     return await v3data.common.hypervisor.fee_returns_fg(
-        PROTOCOL_UNISWAP_V3, CHAIN_MAINNET, 30
+        PROTOCOL_UNISWAP_V3, CHAIN_MAINNET, 30, FEE_RETURN_ROUTES
     )
 
 
+# Computing any fee returns window caches the others from the same snapshots
+FEE_RETURN_ROUTES = {
+    1: fee_returns_daily,
+    7: fee_returns_weekly,
+    30: fee_returns_monthly,
+}
+
+
 @router.get("/allRewards")
 async def all_rewards():
     return await v3data.common.masterchef.info(
@@ -229,7 +239,7 @@ async def token_distributions(
 
 
 @router.get("/dashboard")
-@cache(expire=DASHBOARD_CACHE_TIMEOUT)
+@cache(expire=DASHBOARD_CACHE_TIMEOUT, coder=PrecompressedJsonCoder)
 async def dashboard(period: str = "weekly"):
     dashboard = Dashboard(period.lower())
 
@@ -4,8 +4,13 @@ import v3data.common.hypervisor
 import v3data.common.users
 
 from fastapi import APIRouter, Response
-from fastapi_cache.decorator import cache
-from v3data.config import APY_CACHE_TIMEOUT, ALLDATA_CACHE_TIMEOUT
+from v3data.cache_backend import cache
+from v3data.config import (
+    APY_CACHE_TIMEOUT,
+    ALLDATA_CACHE_TIMEOUT,
+    CHARTS_CACHE_TIMEOUT,
+)
+from v3data.precompressed import PrecompressedJsonCoder
 from v3data.constants import PROTOCOL_UNISWAP_V3
 
 CHAIN_OPTIMISM = "optimism"
@@ -31,7 +36,7 @@ async def bollingerbands_chart(poolAddress: str, periodHours: int = 24):
 
 
 @router.get("/charts/baseRange/all")
-# @cache(expire=CHARTS_CACHE_TIMEOUT)
+@cache(expire=CHARTS_CACHE_TIMEOUT, coder=PrecompressedJsonCoder)
 async def base_range_chart_all(days: int = 20):
     return await v3data.common.charts.base_range_chart_all(
         PROTOCOL_UNISWAP_V3, CHAIN_OPTIMISM, days
@@ -93,7 +98,7 @@ async def hypervisors_return():
 
 
 @router.get("/hypervisors/allData")
-@cache(expire=ALLDATA_CACHE_TIMEOUT)
+@cache(expire=ALLDATA_CACHE_TIMEOUT, coder=PrecompressedJsonCoder)
 async def hypervisors_all():
     return await v3data.common.hypervisor.hypervisors_all(
         PROTOCOL_UNISWAP_V3, CHAIN_OPTIMISM
@@ -111,7 +116,7 @@ async def uncollected_fees_all():
 @cache(expire=APY_CACHE_TIMEOUT)
 async def fee_returns_daily():
     return await v3data.common.hypervisor.fee_returns_fg(
-        PROTOCOL_UNISWAP_V3, CHAIN_OPTIMISM, 1
+        PROTOCOL_UNISWAP_V3, CHAIN_OPTIMISM, 1, FEE_RETURN_ROUTES
     )
 
 
@@ -119,7 +124,7 @@ async def fee_returns_daily():
 @cache(expire=APY_CACHE_TIMEOUT)
 async def fee_returns_weekly():
     return await v3data.common.hypervisor.fee_returns_fg(
-        PROTOCOL_UNISWAP_V3, CHAIN_OPTIMISM, 7
+        PROTOCOL_UNISWAP_V3, CHAIN_OPTIMISM, 7, FEE_RETURN_ROUTES
     )
 
 
@@ -127,10 +132,18 @@ async def fee_returns_weekly():
 @cache(expire=APY_CACHE_TIMEOUT)
 async def fee_returns_monthly():
     return await v3data.common.hypervisor.fee_returns_fg(
-        PROTOCOL_UNISWAP_V3, CHAIN_OPTIMISM, 30
+        PROTOCOL_UNISWAP_V3, CHAIN_OPTIMISM, 30, FEE_RETURN_ROUTES
     )
 
 
+# Computing any fee returns window caches the others from the same snapshots
+FEE_RETURN_ROUTES = {
+    1: fee_returns_daily,
+    7: fee_returns_weekly,
+    30: fee_returns_monthly,
+}
+
+
 @router.get("/allRewards")
 async def all_rewards():
     return await v3data.common.masterchef.info(PROTOCOL_UNISWAP_V3, CHAIN_OPTIMISM)
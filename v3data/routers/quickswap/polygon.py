@@ -6,8 +6,13 @@ import v3data.common.masterchef
 import v3data.common.masterchef_v2
 
 from fastapi import APIRouter, Response
-from fastapi_cache.decorator import cache
-from v3data.config import APY_CACHE_TIMEOUT, ALLDATA_CACHE_TIMEOUT
+from v3data.cache_backend import cache
+from v3data.config import (
+    APY_CACHE_TIMEOUT,
+    ALLDATA_CACHE_TIMEOUT,
+    CHARTS_CACHE_TIMEOUT,
+)
+from v3data.precompressed import PrecompressedJsonCoder
 from v3data.constants import PROTOCOL_QUICKSWAP
 
 
@@ -34,7 +39,7 @@ async def bollingerbands_chart(poolAddress: str, periodHours: int = 24):
 
 
 @router.get("/charts/baseRange/all")
-# @cache(expire=CHARTS_CACHE_TIMEOUT)
+@cache(expire=CHARTS_CACHE_TIMEOUT, coder=PrecompressedJsonCoder)
 async def base_range_chart_all(days: int = 20):
     return await v3data.common.charts.base_range_chart_all(
         PROTOCOL_QUICKSWAP, CHAIN_POLYGON, days
@@ -96,7 +101,7 @@ async def hypervisors_return():
 
 
 @router.get("/hypervisors/allData")
-@cache(expire=ALLDATA_CACHE_TIMEOUT)
+@cache(expire=ALLDATA_CACHE_TIMEOUT, coder=PrecompressedJsonCoder)
 async def hypervisors_all():
     return await v3data.common.hypervisor.hypervisors_all(
         PROTOCOL_QUICKSWAP, CHAIN_POLYGON
@@ -114,7 +119,7 @@ async def uncollected_fees_all():
 @cache(expire=APY_CACHE_TIMEOUT)
 async def fee_returns_daily():
     return await v3data.common.hypervisor.fee_returns_fg(
-        PROTOCOL_QUICKSWAP, CHAIN_POLYGON, 1
+        PROTOCOL_QUICKSWAP, CHAIN_POLYGON, 1, FEE_RETURN_ROUTES
     )
 
 
@@ -122,7 +127,7 @@ async def fee_returns_daily():
 @cache(expire=APY_CACHE_TIMEOUT)
 async def fee_returns_weekly():
     return await v3data.common.hypervisor.fee_returns_fg(
-        PROTOCOL_QUICKSWAP, CHAIN_POLYGON, 7
+        PROTOCOL_QUICKSWAP, CHAIN_POLYGON, 7, FEE_RETURN_ROUTES
     )
 
 
@@ -130,10 +135,18 @@ async def fee_returns_weekly():
 @cache(expire=APY_CACHE_TIMEOUT)
 async def fee_returns_monthly():
     return await v3data.common.hypervisor.fee_returns_fg(
-        PROTOCOL_QUICKSWAP, CHAIN_POLYGON, 30
+        PROTOCOL_QUICKSWAP, CHAIN_POLYGON, 30, FEE_RETURN_ROUTES
     )
 
 
+# Computing any fee returns window caches the others from the same snapshots
+FEE_RETURN_ROUTES = {
+    1: fee_returns_daily,
+    7: fee_returns_weekly,
+    30: fee_returns_monthly,
+}
+
+
 @router.get("/allRewards")
 async def all_rewards():
     return await v3data.common.masterchef.info(PROTOCOL_QUICKSWAP, CHAIN_POLYGON)
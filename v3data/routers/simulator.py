@@ -1,4 +1,4 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from v3data.constants import PROTOCOL_UNISWAP_V3
 from v3data.simulator import SimulatorInfo
 
@@ -12,6 +12,15 @@ async def token_list():
     return tokens
 
 
+@router.get("/tokenSearch")
+async def token_search(query: str, limit: int = Query(20, ge=1, le=100)):
+    tokens = await SimulatorInfo(PROTOCOL_UNISWAP_V3, "mainnet").token_search(
+        query, limit
+    )
+
+    return tokens
+
+
 @router.get("/poolTicks")
 async def pool_ticks(poolAddress: str):
     ticks = await SimulatorInfo(
@@ -1,5 +1,6 @@
 from xmlrpc.client import Boolean
 from v3data import UniswapV3Client
+from v3data.token_list import token_list
 
 
 class SimulatorData:
@@ -107,6 +108,18 @@ class SimulatorInfo(SimulatorData):
 
         return self.token_data
 
+    async def token_search(self, query: str, limit: int = 20):
+        """Tokens of the token list whose symbol or address starts with query"""
+        return [
+            {
+                "id": token["address"].lower(),
+                "name": token["name"],
+                "symbol": token["symbol"],
+                "decimals": token["decimals"],
+            }
+            for token in await token_list.search(query, limit)
+        ]
+
     async def pool_ticks(self, poolAddress: str, get_data: bool = True):
         if get_data:
             await self._get_pool_ticks(poolAddress)
@@ -0,0 +1,34 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one in-flight call
+
+    The first caller for a key starts the call, callers arriving while it is
+    still running await the same result. Once the call completes the key is
+    released so later callers trigger a fresh call.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable]):
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.coalesced += 1
+            logger.debug(f"Coalesced in-flight call for {key}")
+
+        # Shield so a cancelled caller does not cancel the call for other waiters
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,211 @@
+import codecs
+import json
+import re
+from typing import Any, Callable
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_STRING_END = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR_END = re.compile(r"[,:\]}\s]")
+
+
+class IncompleteDocument(ValueError):
+    pass
+
+
+class GraphQLStreamDecoder:
+    """Incremental decoder for GraphQL responses
+
+    Bytes are fed as they arrive and every entity of a top level list in "data"
+    is returned as soon as it is complete, so a large response never has to be
+    held in memory as a whole, neither as text nor as nested dicts. Fields that
+    are not lists are returned whole. Fields named in converters are converted
+    while decoding, at any nesting depth, e.g. {"timestamp": int}.
+
+    feed() and close() return (field, value) events in document order, with
+    errors collected on the decoder. A value is only decoded once it is
+    complete, and the scan for its end resumes where the previous chunk ended,
+    so an entity split over many chunks is read in linear time.
+    """
+
+    def __init__(self, converters: dict[str, Callable[[Any], Any]] | None = None):
+        self.converters = converters or {}
+        self.errors = []
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        # Stream offset of the start of the buffer
+        self._offset = 0
+        # Scan for the end of the value starting at _scan_start (stream offset)
+        self._scan_start = None
+        self._scan_pos = 0
+        self._depth = 0
+        self._state = "document"
+        self._field = None
+        self._top_key = None
+
+    def feed(self, chunk: bytes) -> list[tuple[str, Any]]:
+        self._offset += self._pos
+        self._buffer = self._buffer[self._pos :] + self._text.decode(chunk)
+        self._pos = 0
+        return self._parse(final=False)
+
+    def close(self) -> list[tuple[str, Any]]:
+        self._offset += self._pos
+        self._buffer = self._buffer[self._pos :] + self._text.decode(b"", final=True)
+        self._pos = 0
+        events = self._parse(final=True)
+        if self._state != "done":
+            raise IncompleteDocument("Response ended before the document was complete")
+        return events
+
+    def _parse(self, final: bool) -> list[tuple[str, Any]]:
+        events = []
+        while self._state != "done":
+            start = self._pos
+            try:
+                self._step(events, final)
+            except IncompleteDocument:
+                # Resume the step from its start once more data has arrived
+                self._pos = start
+                if final:
+                    raise
+                break
+        return events
+
+    def _step(self, events: list, final: bool) -> None:
+        if self._state == "document":
+            self._expect("{")
+            self._state = "top_key"
+
+        elif self._state == "top_key":
+            if self._peek() == "}":
+                self._pos += 1
+                self._state = "done"
+                return
+            self._top_key = self._key()
+            if self._top_key == "data" and self._peek() == "{":
+                self._pos += 1
+                self._state = "field"
+            else:
+                value = self._value(final)
+                if self._top_key == "errors":
+                    self.errors = value or []
+                self._state = "top_next"
+
+        elif self._state == "top_next":
+            self._state = "top_key" if self._separator("}") else "done"
+
+        elif self._state == "field":
+            if self._peek() == "}":
+                self._pos += 1
+                self._state = "top_next"
+                return
+            self._field = self._key()
+            if self._peek() == "[":
+                self._pos += 1
+                self._state = "entity"
+            else:
+                events.append((self._field, self._convert(self._value(final))))
+                self._state = "field_next"
+
+        elif self._state == "field_next":
+            self._state = "field" if self._separator("}") else "top_next"
+
+        elif self._state == "entity":
+            if self._peek() == "]":
+                self._pos += 1
+                self._state = "field_next"
+                return
+            events.append((self._field, self._convert(self._value(final))))
+            self._state = "entity_next"
+
+        elif self._state == "entity_next":
+            self._state = "entity" if self._separator("]") else "field_next"
+
+    def _skip_whitespace(self) -> None:
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+            self._pos += 1
+
+    def _peek(self) -> str:
+        self._skip_whitespace()
+        if self._pos >= len(self._buffer):
+            raise IncompleteDocument()
+        return self._buffer[self._pos]
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ValueError(f"Expected {char!r} at {self._pos} in response")
+        self._pos += 1
+
+    def _separator(self, closing: str) -> bool:
+        """Consume "," returning True, or the closing bracket returning False"""
+        char = self._peek()
+        if char not in (",", closing):
+            raise ValueError(f"Unexpected {char!r} at {self._pos} in response")
+        self._pos += 1
+        return char == ","
+
+    def _key(self) -> str:
+        key = self._value(final=False)
+        self._expect(":")
+        return key
+
+    def _value(self, final: bool) -> Any:
+        self._skip_whitespace()
+        if not self._value_complete() and not final:
+            raise IncompleteDocument()
+
+        value, self._pos = _decoder.raw_decode(self._buffer, self._pos)
+        return value
+
+    def _value_complete(self) -> bool:
+        """Whether the buffer holds the whole value starting at _pos"""
+        start = self._offset + self._pos
+        if self._scan_start != start:
+            self._scan_start, self._scan_pos, self._depth = start, start, 0
+
+        buffer = self._buffer
+        pos = self._scan_pos - self._offset
+        if self._depth == 0 and buffer[pos : pos + 1] not in ('"', "[", "{"):
+            # A number or literal, which may continue in the next chunk
+            return _SCALAR_END.search(buffer, pos) is not None
+
+        depth = self._depth
+        while match := _STRUCTURE.search(buffer, pos):
+            if match.group() == '"':
+                string_end = _STRING_END.match(buffer, match.end())
+                if string_end is None:
+                    # Rescan the string from its opening quote
+                    pos = match.start()
+                    break
+                pos = string_end.end()
+            else:
+                depth += 1 if match.group() in "[{" else -1
+                pos = match.end()
+            if depth <= 0:
+                return True
+        else:
+            pos = len(buffer)
+
+        self._scan_pos, self._depth = self._offset + pos, depth
+        return False
+
+    def _convert(self, value: Any) -> Any:
+        if not self.converters:
+            return value
+        if isinstance(value, list):
+            return [self._convert(item) for item in value]
+        if isinstance(value, dict):
+            for key, item in value.items():
+                converter = self.converters.get(key)
+                if (
+                    converter
+                    and item is not None
+                    and not isinstance(item, (dict, list))
+                ):
+                    value[key] = converter(item)
+                else:
+                    value[key] = self._convert(item)
+        return value
@@ -0,0 +1,131 @@
+import logging
+import time
+from bisect import bisect_left
+
+from v3data import TokenListClient
+from v3data.config import TOKEN_LIST_REFRESH_SECONDS, TOKEN_LIST_RETRY_SECONDS
+from v3data.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class TokenList:
+    """Token list held in memory, indexed by symbol, address and symbol prefix
+
+    The list is refreshed on use once older than refresh_seconds, with a
+    conditional request so an unchanged list is not downloaded again. A
+    failed refresh, or one returning an invalid list, keeps serving the
+    previous list, and is not retried for retry_seconds.
+    """
+
+    def __init__(
+        self,
+        client: TokenListClient | None = None,
+        refresh_seconds: float = TOKEN_LIST_REFRESH_SECONDS,
+        retry_seconds: float = TOKEN_LIST_RETRY_SECONDS,
+    ):
+        self.client = client or TokenListClient()
+        self.refresh_seconds = refresh_seconds
+        self.retry_seconds = retry_seconds
+        self.tokens: list[dict] = []
+        self._by_symbol: dict[str, list[str]] = {}
+        self._by_address: dict[str, dict] = {}
+        self._symbols: list[tuple[str, str]] = []
+        self._addresses: list[str] = []
+        self._etag = None
+        self._last_modified = None
+        self._fetched_at = 0.0
+        self._failed_at = None
+        self._refreshes = SingleFlight()
+
+    async def refresh(self) -> None:
+        await self._refreshes.do("refresh", self._refresh)
+
+    async def _refresh(self) -> None:
+        try:
+            response = await self.client.get_tokens(self._etag, self._last_modified)
+        except Exception as e:
+            logger.warning(f"Token list refresh failed: {e}")
+            self._failed_at = time.monotonic()
+            return
+
+        if response.status_code == 304:
+            self._fetched_at = time.monotonic()
+            self._failed_at = None
+            return
+        if response.status_code != 200:
+            logger.warning(f"Token list refresh failed: HTTP {response.status_code}")
+            self._failed_at = time.monotonic()
+            return
+
+        try:
+            self._index(response.json()["tokens"])
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Token list refresh returned an invalid list: {e!r}")
+            self._failed_at = time.monotonic()
+            return
+
+        self._etag = response.headers.get("ETag")
+        self._last_modified = response.headers.get("Last-Modified")
+        self._fetched_at = time.monotonic()
+        self._failed_at = None
+
+    def _index(self, tokens: list[dict]) -> None:
+        by_symbol = {}
+        by_address = {}
+        for token in tokens:
+            by_symbol.setdefault(token["symbol"].upper(), []).append(token["address"])
+            by_address[token["address"].lower()] = token
+
+        self.tokens = tokens
+        self._by_symbol = by_symbol
+        self._by_address = by_address
+        self._symbols = sorted(
+            (token["symbol"].upper(), token["address"].lower()) for token in tokens
+        )
+        self._addresses = sorted(by_address)
+
+    async def _ensure_fresh(self) -> None:
+        now = time.monotonic()
+        if now - self._fetched_at <= self.refresh_seconds:
+            return
+        if self._failed_at is not None and now - self._failed_at < self.retry_seconds:
+            return
+        await self.refresh()
+
+    async def addresses(self, symbol: str) -> list[str]:
+        """Addresses of tokens with symbol, case insensitive"""
+        await self._ensure_fresh()
+        return self._by_symbol.get(symbol.upper(), [])
+
+    async def token(self, address: str) -> dict | None:
+        await self._ensure_fresh()
+        return self._by_address.get(address.lower())
+
+    async def search(self, text: str, limit: int = 20) -> list[dict]:
+        """Tokens whose symbol, or address when text starts with 0x, starts
+        with text"""
+        await self._ensure_fresh()
+        text = text.strip()
+        if not text:
+            return []
+
+        if text.lower().startswith("0x"):
+            prefix = text.lower()
+            keys = self._addresses
+            start = bisect_left(keys, prefix)
+            matches = ((address, address) for address in keys[start : start + limit])
+        else:
+            prefix = text.upper()
+            keys = self._symbols
+            start = bisect_left(keys, (prefix,))
+            matches = keys[start : start + limit]
+
+        return [
+            self._by_address[address]
+            for key, address in matches
+            if key.startswith(prefix)
+        ]
+
+
+token_list = TokenList()
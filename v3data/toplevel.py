@@ -22,9 +22,11 @@ class TopLevelData:
     async def get_hypervisor_data(self):
         """Get hypervisor IDs"""
         query = """
-        {
+        query hypervisors($paginate: String!){
             uniswapV3Hypervisors(
                 first: 1000
+                orderBy: id
+                where: { id_gt: $paginate }
             ){
                 id
                 grossFeesClaimedUSD
@@ -32,81 +34,86 @@ class TopLevelData:
             }
         }
         """
-        response = await self.gamma_client.query(query)
-        return response["data"]["uniswapV3Hypervisors"]
+        return [
+            hypervisor
+            async for page in self.gamma_client.iter_entities(query)
+            for hypervisor in page
+        ]
 
     async def get_pool_data(self):
         query = """
-        {
+        query pools($paginate: String!){
             uniswapV3Pools(
                 first: 1000
+                orderBy: id
+                where: { id_gt: $paginate }
             ){
                 id
             }
         }
         """
-        response = await self.gamma_client.query(query)
-        return response["data"]["uniswapV3Pools"]
+        return [
+            pool
+            async for page in self.gamma_client.iter_entities(query)
+            for pool in page
+        ]
 
     async def _get_all_returns_data(self, time_delta):
         query = """
-        query allRebalances($timestampStart: Int!){
-            uniswapV3Hypervisors(
+        query allRebalances($timestampStart: Int!, $paginate: String!){
+            uniswapV3Rebalances(
                 first: 1000
-            ){
-                id
-                grossFeesClaimedUSD
-                tvlUSD
-                rebalances(
-                    first: 1000
-                    where: { timestamp_gte: $timestampStart }
-                    orderBy: timestamp
-                    orderDirection: desc
-                ) {
-                    id
-                    timestamp
-                    grossFeesUSD
-                    protocolFeesUSD
-                    netFeesUSD
-                    totalAmountUSD
+                orderBy: id
+                where: {
+                    timestamp_gte: $timestampStart
+                    id_gt: $paginate
                 }
+            ) {
+                id
+                hypervisor {id}
+                timestamp
+                grossFeesUSD
+                protocolFeesUSD
+                netFeesUSD
+                totalAmountUSD
             }
         }
         """
+        hypervisors = {
+            hypervisor["id"]: {**hypervisor, "rebalances": []}
+            for hypervisor in await self.get_hypervisor_data()
+        }
+
         variables = {"timestampStart": timestamp_ago(time_delta)}
-        response = await self.gamma_client.query(query, variables)
-        self.all_returns_data = response["data"]["uniswapV3Hypervisors"]
+        async for page in self.gamma_client.iter_entities(query, variables=variables):
+            for rebalance in page:
+                hypervisor = hypervisors.get(rebalance.pop("hypervisor")["id"])
+                if hypervisor:
+                    hypervisor["rebalances"].append(rebalance)
+
+        self.all_returns_data = list(hypervisors.values())
 
     async def _get_all_stats_data(self):
-        query = """
-        {
-            uniswapV3Hypervisors(
-                first: 1000
-            ){
-                id
-                grossFeesClaimedUSD
-                tvlUSD
-            }
-            uniswapV3Pools(
-                first: 1000
-            ){
-                id
-            }
+        hypervisors, pools = await asyncio.gather(
+            self.get_hypervisor_data(), self.get_pool_data()
+        )
+        self.all_stats_data = {
+            "uniswapV3Hypervisors": hypervisors,
+            "uniswapV3Pools": pools,
         }
-        """
-
-        response = await self.gamma_client.query(query)
-        self.all_stats_data = response["data"]
 
     async def get_recent_rebalance_data(self, hours=24):
         query = """
-        query rebalances($timestamp_start: Int!){
+        query rebalances($timestamp_start: Int!, $paginate: String!){
             uniswapV3Rebalances(
                 first: 1000
+                orderBy: id
                 where: {
                     timestamp_gte: $timestamp_start
+                    id_gt: $paginate
                 }
             ) {
+                id
                 grossFeesUSD
                 protocolFeesUSD
                 netFeesUSD
@@ -115,8 +122,13 @@ class TopLevelData:
         """
         timestamp_start = timestamp_ago(timedelta(hours=hours))
         variables = {"timestamp_start": timestamp_start}
-        response = await self.gamma_client.query(query, variables)
-        return response["data"]["uniswapV3Rebalances"]
+        return [
+            {key: value for key, value in rebalance.items() if key != "id"}
+            async for page in self.gamma_client.iter_entities(
+                query, variables=variables
+            )
+            for rebalance in page
+        ]
 
     def _all_stats(self):
         """
@@ -158,7 +170,7 @@ class TopLevelData:
         data, gamma_prices = await asyncio.gather(
             self.get_recent_rebalance_data(hours), token_price("GAMMA")
         )
-        gamma_price_usd = gamma_prices["gamma_in_usdc"]
+        gamma_price_usd = gamma_prices["token_in_usdc"]
         df_fees = DataFrame(data, dtype=np.float64)
 
         df_fees["grossFeesGAMMA"] = df_fees.grossFeesUSD / gamma_price_usd